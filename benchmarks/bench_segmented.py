@@ -0,0 +1,126 @@
+"""Benchmark and check the segmented downloader against a local Range server.
+
+Serves a random file from a local HTTP server that supports Range requests
+and throttles every connection, the way YouTube throttles a single stream.
+Downloads it on one connection and on several, checks the contents, then
+interrupts a segmented download, drops connections mid-segment and checks
+that resuming fetches only the missing bytes. Run from the repository root:
+
+    python benchmarks/bench_segmented.py
+"""
+
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path.cwd()))
+
+# Keep fifu's log and config out of the real home directory
+os.environ["HOME"] = tempfile.mkdtemp()
+
+from fifu.services.downloader import DownloadService
+
+FILE_SIZE = 16 * 1024 * 1024
+PER_CONNECTION_RATE = 4 * 1024 * 1024
+CONNECTIONS = 4
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serve one file with Range support and a per-connection speed limit."""
+
+    payload = b""
+    # Drop this many connections halfway through their range, to exercise retries
+    drops_left = 0
+    lock = threading.Lock()
+    served = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        size = len(self.payload)
+        start, end = 0, size - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2) or end), end)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+        with RangeHandler.lock:
+            drop = RangeHandler.drops_left > 0 and end - start > 1
+            RangeHandler.drops_left -= drop
+        stop_at = start + (end - start) // 2 if drop else end + 1
+
+        position, chunk = start, 64 * 1024
+        began = time.monotonic()
+        try:
+            while position <= end:
+                if position >= stop_at:
+                    return
+                data = self.payload[position:min(position + chunk, end + 1, stop_at)]
+                self.wfile.write(data)
+                position += len(data)
+                with RangeHandler.lock:
+                    RangeHandler.served += len(data)
+                # Throttle this connection
+                ahead = (position - start) / PER_CONNECTION_RATE - (time.monotonic() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def download(service: DownloadService, url: str, out: Path, stop_check=None):
+    start = time.perf_counter()
+    result = service.download_video(url, out, quality="best", stop_check=stop_check)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    RangeHandler.payload = os.urandom(FILE_SIZE)
+    expected = hashlib.sha256(RangeHandler.payload).hexdigest()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/video.mp4"
+
+    print(f"{FILE_SIZE // (1024 * 1024)} MiB file, {PER_CONNECTION_RATE // (1024 * 1024)} MiB/s per connection")
+    for connections in (1, CONNECTIONS):
+        out = Path(tempfile.mkdtemp())
+        result, elapsed = download(DownloadService(segmented_connections=connections), url, out)
+        ok = result.success and hashlib.sha256((out / "video.mp4").read_bytes()).hexdigest() == expected
+        print(f"  {connections} connection(s): {elapsed:6.2f}s  {'ok' if ok else 'MISMATCH'}")
+
+    # Interrupt halfway, then resume with dropped connections along the way
+    out = Path(tempfile.mkdtemp())
+    service = DownloadService(segmented_connections=CONNECTIONS)
+    stop_at = time.monotonic() + 0.5 * FILE_SIZE / (PER_CONNECTION_RATE * CONNECTIONS)
+    result, _ = download(service, url, out, stop_check=lambda: time.monotonic() > stop_at)
+    print(f"  interrupted: {result.error}")
+
+    RangeHandler.served = 0
+    RangeHandler.drops_left = 2
+    result, elapsed = download(service, url, out)
+    ok = result.success and hashlib.sha256((out / "video.mp4").read_bytes()).hexdigest() == expected
+    print(
+        f"  resumed with 2 dropped connections: {elapsed:6.2f}s, "
+        f"fetched {RangeHandler.served * 100 // FILE_SIZE}% of the file  {'ok' if ok else 'MISMATCH'}"
+    )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
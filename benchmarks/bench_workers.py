@@ -0,0 +1,152 @@
+"""Benchmark and check `fifu worker` processes sharing one queue database.
+
+Serves files from a local HTTP server that throttles every connection, the
+way YouTube throttles a single stream, queues them as a shared job and times
+1, 2 and 4 worker processes working through the same backlog, end to end and
+in steady state, i.e. past each process's start-up. Then kills a worker
+mid-download and checks that another one takes over its videos once their
+lease expires. Run from the repository root:
+
+    python benchmarks/bench_workers.py
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+# Add project root to path
+sys.path.insert(0, str(Path.cwd()))
+
+from fifu.services.journal import DownloadQueue
+from fifu.services.youtube import VideoInfo
+
+FILE_SIZE = 512 * 1024
+PER_CONNECTION_RATE = 512 * 1024
+VIDEOS = 48
+WORKER_COUNTS = (1, 2, 4)
+
+
+class ThrottledHandler(BaseHTTPRequestHandler):
+    """Serve the same payload under any path at a per-connection speed limit."""
+
+    payload = b""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(self.payload)))
+        self.end_headers()
+        position, chunk = 0, 32 * 1024
+        began = time.monotonic()
+        try:
+            while position < len(self.payload):
+                self.wfile.write(self.payload[position:position + chunk])
+                position += chunk
+                ahead = position / PER_CONNECTION_RATE - (time.monotonic() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def make_home() -> Path:
+    """A home directory whose settings download each file on one connection."""
+    home = Path(tempfile.mkdtemp())
+    config = home / ".config" / "fifu"
+    config.mkdir(parents=True)
+    (config / "data.json").write_text(json.dumps({"settings": {"segmented_connections": 1}}))
+    return home
+
+
+def enqueue(db: Path, base_url: str, output_dir: Path) -> None:
+    queue = DownloadQueue(db)
+    job_id = queue.create_job("bench", "bench", base_url, output_dir, "best", shared=True)
+    queue.add_items(job_id, [
+        VideoInfo(id=f"video{i}", title=f"video{i}", url=f"{base_url}/video{i}.mp4")
+        for i in range(VIDEOS)
+    ])
+    queue.mark_listing_complete(job_id)
+    queue.close()
+
+
+def start_worker(home: Path, db: Path, *args: str, log: Optional[Path] = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "fifu", "worker", "--jobs", "1", "--queue", str(db), "--json", *args],
+        env={**os.environ, "HOME": str(home)},
+        stdout=open(log, "w") if log else subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def steady_rate(logs: list[Path]) -> float:
+    """Videos per second between the first and the last finished download, past start-up."""
+    finished = sorted(
+        event["time"]
+        for log in logs
+        for event in map(json.loads, log.read_text().splitlines())
+        if event["event"] == "downloaded"
+    )
+    if len(finished) < 2:
+        return 0.0
+    return (len(finished) - 1) / (finished[-1] - finished[0])
+
+
+def downloaded(output_dir: Path) -> int:
+    return len(list(output_dir.glob("video*.mp4")))
+
+
+def main() -> None:
+    ThrottledHandler.payload = os.urandom(FILE_SIZE)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottledHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    home = make_home()
+
+    print(f"{VIDEOS} videos of {FILE_SIZE // 1024} KiB at {PER_CONNECTION_RATE // 1024} KiB/s, one download per worker")
+    baseline = None
+    for count in WORKER_COUNTS:
+        db = home / f"queue-{count}.db"
+        output_dir = home / f"out-{count}"
+        enqueue(db, base_url, output_dir)
+        logs = [home / f"worker-{count}-{i}.jsonl" for i in range(count)]
+        start = time.perf_counter()
+        workers = [start_worker(home, db, "--exit-when-empty", log=log) for log in logs]
+        for worker in workers:
+            worker.wait()
+        elapsed = time.perf_counter() - start
+        rate = steady_rate(logs)
+        baseline = baseline or (elapsed, rate)
+        print(
+            f"  {count} worker(s): {elapsed:6.2f}s  {baseline[0] / elapsed:4.1f}x  "
+            f"steady {rate:4.2f} videos/s  {rate / baseline[1]:4.1f}x  "
+            f"{downloaded(output_dir)}/{VIDEOS} files"
+        )
+
+    # Kill a worker mid-download; the survivor takes over once the lease expires
+    db = home / "queue-lease.db"
+    output_dir = home / "out-lease"
+    enqueue(db, base_url, output_dir)
+    victim = start_worker(home, db, "--lease", "5")
+    time.sleep(3)
+    victim.send_signal(signal.SIGKILL)
+    victim.wait()
+    survivor = start_worker(home, db, "--lease", "5", "--exit-when-empty")
+    survivor.wait()
+    remaining = DownloadQueue(db).shared_unfinished()
+    print(f"  killed worker: {downloaded(output_dir)}/{VIDEOS} files, {remaining} left in the queue")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Micro-benchmark: fresh YoutubeDL per call vs. pooled, pre-warmed instances.
+
+Measures only the per-call setup cost (construction, extractor lookup and
+teardown), not network time. Run from the repository root:
+
+    python benchmarks/bench_ydl_pool.py
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path.cwd()))
+
+import yt_dlp
+
+from fifu.services.pool import YoutubeDLPool
+
+OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "extract_flat": True,
+}
+CALLS = 200
+
+
+def per_call_fresh() -> float:
+    start = time.perf_counter()
+    with yt_dlp.YoutubeDL(OPTS) as ydl:
+        ydl.get_info_extractor("YoutubeTab")
+    return time.perf_counter() - start
+
+
+def per_call_pooled(pool: YoutubeDLPool) -> float:
+    start = time.perf_counter()
+    with pool.acquire(OPTS) as ydl:
+        ydl.get_info_extractor("YoutubeTab")
+    return time.perf_counter() - start
+
+
+def report(name: str, samples: list[float]) -> None:
+    ms = [s * 1000 for s in samples]
+    print(f"{name:<8} mean {statistics.mean(ms):8.3f} ms   median {statistics.median(ms):8.3f} ms   "
+          f"p95 {sorted(ms)[int(len(ms) * 0.95)]:8.3f} ms")
+
+
+def main() -> None:
+    # Import-time costs are paid once in either mode; exclude them
+    per_call_fresh()
+
+    fresh = [per_call_fresh() for _ in range(CALLS)]
+
+    pool = YoutubeDLPool()
+    pool.prewarm(OPTS, 1)
+    pooled = [per_call_pooled(pool) for _ in range(CALLS)]
+    pool.close()
+
+    print(f"{CALLS} calls each")
+    report("fresh", fresh)
+    report("pooled", pooled)
+    print(f"speedup  {statistics.mean(fresh) / statistics.mean(pooled):.0f}x per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,257 @@
 """CLI entry point for Fifu."""
 
+import multiprocessing
+import sys
+from pathlib import Path
+
 import click
+from yt_dlp.utils import parse_bytes
+
+from fifu import headless, server
+from fifu.services.config import ConfigService
+from fifu.services.downloader import QUALITY_FORMATS
+from fifu.services.scheduling import LISTING, ORDERINGS
+
+
+def _parse_rate(ctx, param, value):
+    """Parse a byte rate such as 500K or 4.2M."""
+    if value is None:
+        return None
+    rate = parse_bytes(value)
+    if not rate:
+        raise click.BadParameter(f"'{value}' is not a byte rate such as 500K or 4.2M")
+    return rate
 
-from fifu.app import FifuApp
 
+def download_options(command):
+    """Options shared by the headless download commands."""
+    options = [
+        click.option("--jobs", "-j", type=click.IntRange(min=1), help="Most downloads to run at once."),
+        click.option("--quality", "-q", type=click.Choice(list(QUALITY_FORMATS)), default="best", show_default=True),
+        click.option("--max", "max_videos", type=click.IntRange(min=1), default=9999, help="Most videos to queue per channel."),
+        click.option("--subtitles/--no-subtitles", default=False, help="Download and embed subtitles."),
+        click.option("--order", type=click.Choice(ORDERINGS), default=None, help="Which queued videos start first."),
+        click.option("--json", "json_output", is_flag=True, help="Print progress as one JSON object per line."),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
 
-@click.command()
-def main():
+
+@click.group(invoke_without_command=True)
+@click.option(
+    "--limit-rate", "-r",
+    metavar="RATE",
+    callback=_parse_rate,
+    help="Cap the combined speed of all downloads in bytes/s, e.g. 500K or 4.2M.",
+)
+@click.option(
+    "--process-workers/--thread-workers",
+    default=None,
+    help="Run downloads in separate worker processes instead of threads.",
+)
+@click.pass_context
+def main(ctx, limit_rate, process_workers):
     """Fifu - YouTube Channel Video Downloader TUI"""
-    app = FifuApp()
-    app.run()
+    ctx.obj = {"limit_rate": limit_rate, "process_workers": process_workers}
+    if ctx.invoked_subcommand is None:
+        # Textual is only imported for the TUI, not for the headless commands
+        from fifu.app import FifuApp
+        app = FifuApp(limit_rate=limit_rate, process_workers=process_workers)
+        app.run()
+
+
+def _read_targets(targets, target_file):
+    """Targets given as arguments and in a --file, without duplicates."""
+    targets = list(targets)
+    if target_file:
+        for line in target_file:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                targets.append(line)
+    if not targets:
+        raise click.UsageError("Give channels or playlists to download, or --file.")
+    return list(dict.fromkeys(targets))
+
+
+def queue_option(command):
+    """The --queue option of the shared queue commands."""
+    return click.option(
+        "--queue", "queue_path",
+        type=click.Path(dir_okay=False, path_type=Path),
+        envvar="FIFU_QUEUE",
+        help="Queue database shared by the workers, e.g. on a network drive. Defaults to fifu's own.",
+    )(command)
+
+
+def _order(order):
+    """The --order option, else the configured default order."""
+    if order:
+        return order
+    return ConfigService().get_setting("download_order", LISTING)
+
+
+@main.command()
+@click.argument("channel_or_url")
+@download_options
+@click.option("--new-only", is_flag=True, help="Only uploads newer than the last sync of the channel.")
+@click.pass_obj
+def download(obj, channel_or_url, jobs, quality, max_videos, subtitles, order, json_output, new_only):
+    """Download a channel or playlist without the TUI.
+
+    CHANNEL_OR_URL is a channel or playlist URL, or a search query whose
+    top channel is downloaded.
+    """
+    sys.exit(headless.download(
+        channel_or_url,
+        jobs=jobs,
+        quality=QUALITY_FORMATS[quality],
+        max_videos=max_videos,
+        subtitles=subtitles,
+        new_only=new_only,
+        order=_order(order),
+        json_output=json_output,
+        **obj,
+    ))
+
+
+@main.command("sync-favorites")
+@download_options
+@click.pass_obj
+def sync_favorites(obj, jobs, quality, max_videos, subtitles, order, json_output):
+    """Download new uploads of every favorite channel."""
+    sys.exit(headless.sync_favorites(
+        jobs=jobs,
+        quality=QUALITY_FORMATS[quality],
+        max_videos=max_videos,
+        subtitles=subtitles,
+        order=_order(order),
+        json_output=json_output,
+        **obj,
+    ))
+
+
+@main.command()
+@click.argument("targets", nargs=-1)
+@click.option(
+    "--file", "-f", "target_file",
+    type=click.File("r"),
+    help="Read channels and playlists from a file, one per line; lines starting with '#' are skipped.",
+)
+@download_options
+@click.option("--new-only", is_flag=True, help="Only uploads newer than the last sync of each channel.")
+@click.pass_obj
+def batch(obj, targets, target_file, jobs, quality, max_videos, subtitles, order, json_output, new_only):
+    """Download several channels and playlists at once.
+
+    Each of TARGETS is a channel or playlist URL or a search query. Their
+    videos take turns for the download slots, so large channels don't
+    hold back small ones.
+    """
+    sys.exit(headless.batch(
+        _read_targets(targets, target_file),
+        jobs=jobs,
+        quality=QUALITY_FORMATS[quality],
+        max_videos=max_videos,
+        subtitles=subtitles,
+        new_only=new_only,
+        order=_order(order),
+        json_output=json_output,
+        **obj,
+    ))
+
+
+@main.command()
+@click.option("--interval", type=click.FloatRange(min=1), metavar="MINUTES", help="Minutes between checks of each favorite.")
+@click.option("--jitter", type=click.FloatRange(0, 0.5), help="Vary each interval by up to this fraction, e.g. 0.1.")
+@download_options
+@click.pass_obj
+def daemon(obj, interval, jitter, jobs, quality, max_videos, subtitles, order, json_output):
+    """Keep downloading new uploads of every favorite channel."""
+    sys.exit(headless.daemon(
+        interval=interval,
+        jitter=jitter,
+        jobs=jobs,
+        quality=QUALITY_FORMATS[quality],
+        max_videos=max_videos,
+        subtitles=subtitles,
+        order=_order(order),
+        json_output=json_output,
+        **obj,
+    ))
+
+
+@main.command()
+@click.argument("targets", nargs=-1)
+@click.option(
+    "--file", "-f", "target_file",
+    type=click.File("r"),
+    help="Read channels and playlists from a file, one per line; lines starting with '#' are skipped.",
+)
+@click.option("--quality", "-q", type=click.Choice(list(QUALITY_FORMATS)), default="best", show_default=True)
+@click.option("--max", "max_videos", type=click.IntRange(min=1), default=9999, help="Most videos to queue per channel.")
+@click.option("--subtitles/--no-subtitles", default=False, help="Download and embed subtitles.")
+@click.option("--new-only", is_flag=True, help="Only uploads newer than the last sync of each channel.")
+@queue_option
+@click.option("--json", "json_output", is_flag=True, help="Print progress as one JSON object per line.")
+def enqueue(targets, target_file, quality, max_videos, subtitles, new_only, queue_path, json_output):
+    """Queue channels and playlists for fifu worker processes.
+
+    The videos are listed now and downloaded by whichever workers share the
+    queue database.
+    """
+    sys.exit(headless.enqueue(
+        _read_targets(targets, target_file),
+        quality=QUALITY_FORMATS[quality],
+        max_videos=max_videos,
+        subtitles=subtitles,
+        new_only=new_only,
+        queue_path=queue_path,
+        json_output=json_output,
+    ))
+
+
+@main.command()
+@click.option("--jobs", "-j", type=click.IntRange(min=1), help="Most downloads this worker runs at once.")
+@click.option(
+    "--lease",
+    type=click.FloatRange(min=5),
+    default=60.0,
+    show_default=True,
+    help="Seconds before the videos of a worker that stopped responding go to other workers.",
+)
+@click.option("--exit-when-empty", is_flag=True, help="Exit once every queued video is done instead of waiting for more.")
+@queue_option
+@click.option("--json", "json_output", is_flag=True, help="Print progress as one JSON object per line.")
+@click.pass_obj
+def worker(obj, jobs, lease, exit_when_empty, queue_path, json_output):
+    """Download videos queued with fifu enqueue, alongside other workers."""
+    sys.exit(headless.worker(
+        jobs=jobs,
+        lease=lease,
+        exit_when_empty=exit_when_empty,
+        queue_path=queue_path,
+        json_output=json_output,
+        **obj,
+    ))
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to listen on; 0.0.0.0 for every interface.")
+@click.option("--port", "-p", type=click.IntRange(0, 65535), default=8787, show_default=True)
+@click.option("--jobs", "-j", type=click.IntRange(min=1), help="Most downloads to run at once across all jobs.")
+@click.option("--json", "json_output", is_flag=True, help="Print the log as one JSON object per line.")
+@click.pass_obj
+def serve(obj, host, port, jobs, json_output):
+    """Serve search, listings and downloads as an HTTP/JSON API.
+
+    The mobile app and other clients can use it in place of apps/api.
+    Lookups are answered from one warm, cached YouTube service.
+    """
+    sys.exit(server.serve(host=host, port=port, jobs=jobs, json_output=json_output, **obj))
 
 
 if __name__ == "__main__":
+    # Lets worker processes of frozen builds start before click parses argv
+    multiprocessing.freeze_support()
     main()
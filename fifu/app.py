@@ -2,10 +2,8 @@
 
 import asyncio
 import sys
-import os
 from pathlib import Path
 from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
 
 from textual.app import App
 from textual.binding import Binding
@@ -16,20 +14,12 @@ from fifu.screens.download import DownloadScreen
 from fifu.screens.options import OptionsScreen
 from fifu.screens.video_select import VideoSelectScreen
 from fifu.screens.loading import LoadingScreen
+from fifu.screens.resume import ResumePromptScreen
 from fifu.services.youtube import YouTubeService, ChannelInfo, VideoInfo, PlaylistInfo
-from fifu.services.downloader import DownloadService, DownloadProgress
 from fifu.services.config import ConfigService
-
-
-async def asyncio_gather_safe(*tasks):
-    """Gather tasks and ensure all are cancelled if one fails or is cancelled."""
-    try:
-        await asyncio.gather(*tasks)
-    except (asyncio.CancelledError, Exception):
-        for task in tasks:
-            if not task.done():
-                task.cancel()
-        raise
+from fifu.services.journal import DownloadQueue, QueueJob
+from fifu.services.runner import DownloadRequest, DownloadRunner, create_download_service, iterate_in_executor
+from fifu.services.scheduling import LISTING
 
 
 class FifuApp(App):
@@ -52,9 +42,11 @@ class FifuApp(App):
         """Handle quit action with comprehensive cleanup and robust exit."""
         self.stop_downloads()
         self.youtube_service.shutdown()
+        self.download_service.shutdown()
+        self.download_queue.close()
         
-        # Shutdown executor and cancel pending futures
-        self._download_executor.shutdown(wait=False, cancel_futures=True)
+        # Shutdown executors and cancel pending futures
+        self.download_runner.shutdown()
         
         # Cancel the main download loop task
         if self._download_task:
@@ -66,23 +58,65 @@ class FifuApp(App):
         # Graceful exit to allow Textual to restore terminal state
         self.exit()
 
-    def __init__(self):
+    def __init__(self, limit_rate: Optional[float] = None, process_workers: Optional[bool] = None):
         super().__init__()
-        self.youtube_service = YouTubeService()
-        self.download_service = DownloadService()
         self.config_service = ConfigService()
-        self._download_executor = ThreadPoolExecutor(max_workers=5)
+        max_downloads = max(1, self.config_service.get_setting("max_concurrent_downloads", 8))
+        self.youtube_service = YouTubeService()
+        self.download_service = create_download_service(
+            self.config_service, max_downloads, process_workers, limit_rate
+        )
+        self.download_queue = DownloadQueue()
+        self.download_runner = DownloadRunner(
+            self.config_service,
+            self.youtube_service,
+            self.download_service,
+            self.download_queue,
+            max_downloads,
+        )
         self._download_task: Optional[asyncio.Task] = None
-        self._stop_downloads = False
         self._current_channel: Optional[ChannelInfo] = None
         self._videos: list[VideoInfo] = []
         self._download_quality = "best"
         self._max_videos = 9999
         self._download_subtitles = False
+        self._new_only = False
+        self._download_order = self.config_service.get_setting("download_order", LISTING)
+        self._resume_job: Optional[QueueJob] = None
 
     def on_mount(self) -> None:
         """Initialize the application."""
         self.push_screen(SearchScreen())
+        self.offer_resume()
+
+    def offer_resume(self) -> None:
+        """Offer to resume the most recent queue left unfinished by a quit or crash."""
+        jobs = self.download_queue.unfinished_jobs()
+        if not jobs:
+            return
+        job = jobs[0]
+
+        def on_prompt_dismiss(choice: Optional[str]) -> None:
+            if choice == "resume":
+                self.resume_download_job(job)
+            elif choice == "discard":
+                self.download_queue.finish_job(job.id)
+
+        self.push_screen(ResumePromptScreen(job, len(jobs) - 1), callback=on_prompt_dismiss)
+
+    def resume_download_job(self, job: QueueJob) -> None:
+        """Continue a journaled queue with the options it was started with."""
+        channel = ChannelInfo(id=job.channel_id, name=job.channel_name, url=job.channel_url)
+        self._current_channel = channel
+        self._max_videos = job.max_videos
+        self._download_quality = job.quality
+        self._playlist_url = job.playlist_url
+        self._download_subtitles = job.subtitles
+        self._selected_videos = None
+        self._new_only = job.new_only
+        self._download_order = self.config_service.get_setting("download_order", LISTING)
+        self._resume_job = job
+        self.push_screen(DownloadScreen(channel))
 
 
     def action_go_back(self) -> None:
@@ -107,8 +141,9 @@ class FifuApp(App):
             await self._handle_direct_url(query)
             return
         
+        # Show ranked rows as soon as the search page is parsed
         channels = await asyncio.get_event_loop().run_in_executor(
-            None, self.youtube_service.search_channels, query
+            None, self.youtube_service.search_channels_flat, query
         )
         
         if not channels:
@@ -117,7 +152,20 @@ class FifuApp(App):
         
         self.config_service.add_history(query)
         current_screen.hide_searching()
-        self.push_screen(ChannelsScreen(channels, query))
+        channels_screen = ChannelsScreen(channels, query)
+        self.push_screen(channels_screen)
+
+        loop = asyncio.get_running_loop()
+
+        def on_channel_update(channel: ChannelInfo) -> None:
+            # Runs on a lookup thread as each subscriber count resolves
+            loop.call_soon_threadsafe(channels_screen.update_channel, channel)
+
+        self.youtube_service.enrich_channels(
+            channels,
+            max_lookups=self.config_service.get_setting("search_max_lookups", 10),
+            on_update=on_channel_update,
+        )
 
     def search_videos(self, query: str) -> None:
         """Search for individual videos and display selection screen."""
@@ -184,44 +232,74 @@ class FifuApp(App):
         )
         self.push_screen(OptionsScreen(channel, playlists))
 
-    def initiate_video_selection(self, channel: ChannelInfo, playlist_url: Optional[str] = None) -> None:
+    def initiate_video_selection(
+        self,
+        channel: ChannelInfo,
+        playlist_url: Optional[str] = None,
+        new_only: bool = False,
+        order: str = LISTING,
+    ) -> None:
         """Initiate video selection flow."""
-        self.run_worker(self._load_video_selection_screen(channel, playlist_url), exclusive=True)
+        # Selected videos download in the order chosen on the options screen
+        self._download_order = order
+        self.run_worker(self._load_video_selection_screen(channel, playlist_url, new_only), exclusive=True)
 
-    async def _load_video_selection_screen(self, channel: ChannelInfo, playlist_url: Optional[str] = None) -> None:
-        """Load videos and show selection screen."""
+    async def _load_video_selection_screen(
+        self, channel: ChannelInfo, playlist_url: Optional[str] = None, new_only: bool = False
+    ) -> None:
+        """Load videos and show the selection screen as soon as the first batch arrives."""
         self.push_screen(LoadingScreen(f"Loading {channel.name}'s videos..."))
+        select_screen: Optional[VideoSelectScreen] = None
         
         try:
             target_url = playlist_url if playlist_url else channel.url
             is_playlist = bool(playlist_url)
             
-            # We need a reasonable limit to stay under 3s
+            # Cap manual selection lists to keep the screen responsive
             limit = 500 
             
             if is_playlist:
-                videos = await asyncio.get_event_loop().run_in_executor(
-                    None, 
-                    lambda: self.youtube_service.get_playlist_videos(target_url, limit)
+                batches = iterate_in_executor(
+                    self.youtube_service.iter_playlist_videos(target_url, limit)
                 )
                 # Store playlist URL for context
                 self._playlist_url = playlist_url
-            else:
+            elif new_only:
+                known_ids = self.config_service.get_known_video_ids(channel.id)
                 videos = await asyncio.get_event_loop().run_in_executor(
-                    None, 
-                    lambda: self.youtube_service.get_channel_videos(target_url, limit)
+                    None,
+                    lambda: self.youtube_service.get_new_channel_videos(target_url, known_ids, limit)
+                )
+                batches = iterate_in_executor(iter([videos] if videos else []))
+                self._playlist_url = None
+            else:
+                batches = iterate_in_executor(
+                    self.youtube_service.iter_channel_videos(target_url, limit)
                 )
                 self._playlist_url = None
+
+            async for batch in batches:
+                if select_screen is None:
+                    # Swap the loading screen for the list on the first page
+                    self.pop_screen()
+                    select_screen = VideoSelectScreen(batch, loading=True)
+                    self.push_screen(select_screen)
+                elif select_screen in self.screen_stack:
+                    select_screen.add_videos(batch)
+                else:
+                    # User left the selection screen, stop listing
+                    break
                 
-            if not videos:
+            if select_screen is None:
+                self.pop_screen() # Pop loading screen
                 self.notify("No videos found to select.", severity="warning", title="Fifu")
-                return
-                
-            # Pop the loading screen
-            self.pop_screen()
-            self.push_screen(VideoSelectScreen(videos))
+            elif select_screen in self.screen_stack:
+                select_screen.finish_loading()
         except Exception as e:
-            self.pop_screen() # Pop loading screen
+            if select_screen is None:
+                self.pop_screen() # Pop loading screen
+            else:
+                select_screen.finish_loading()
             self.notify(f"Error loading videos: {str(e)}", severity="error", title="Fifu")
 
     def on_video_selection_confirmed(self, videos: list[VideoInfo]) -> None:
@@ -244,7 +322,8 @@ class FifuApp(App):
             quality=self._download_quality,
             playlist_url=self._playlist_url,
             subtitles=self._download_subtitles,
-            selected_videos=videos
+            selected_videos=videos,
+            order=self._download_order,
         )
 
     def prompt_for_scoped_search(self, channel: ChannelInfo) -> None:
@@ -328,6 +407,8 @@ class FifuApp(App):
         playlist_url: Optional[str] = None,
         subtitles: bool = False,
         selected_videos: Optional[list[VideoInfo]] = None,
+        new_only: bool = False,
+        order: str = LISTING,
     ) -> None:
         """Start downloads with user-selected options."""
         self._current_channel = channel
@@ -336,141 +417,48 @@ class FifuApp(App):
         self._playlist_url = playlist_url
         self._download_subtitles = subtitles
         self._selected_videos = selected_videos # Store selected videos
+        self._new_only = new_only
+        self._download_order = order
+        self._resume_job = None
         self.push_screen(DownloadScreen(channel))
 
     def start_downloads(self, channel: ChannelInfo) -> None:
         """Start downloading videos from the channel."""
-        self._stop_downloads = False
+        self.download_runner.stopped = False
         self._download_task = asyncio.create_task(self._download_loop(channel))
 
     async def _download_loop(self, channel: ChannelInfo) -> None:
-        """Main download loop with concurrency."""
+        """Run the queue chosen on the options screen, reporting to the download screen."""
         download_screen = self.screen
         if not isinstance(download_screen, DownloadScreen):
             return
 
-        download_screen.log_message(f"📡 Fetching videos from {channel.name}...")
-        
-        playlist_url = getattr(self, '_playlist_url', None)
-        selected_videos = getattr(self, '_selected_videos', None)
-        
-        if selected_videos:
-             download_screen.log_message(f"📋 Processing {len(selected_videos)} selected videos...")
-             videos = selected_videos
-        elif playlist_url:
-            download_screen.log_message(f"📋 Loading playlist...")
-            videos = await asyncio.get_event_loop().run_in_executor(
-                None, 
-                lambda: self.youtube_service.get_playlist_videos(playlist_url, self._max_videos)
-            )
-        else:
-            videos = await asyncio.get_event_loop().run_in_executor(
-                None, 
-                lambda: self.youtube_service.get_channel_videos(channel.url, self._max_videos)
-            )
-        
-        if not videos:
-            download_screen.log_message("No videos found.", "error")
-            download_screen.on_queue_complete()
-            return
-        
-        # Deduplicate videos by ID to avoid multiple downloads of the same video
-        unique_videos = []
-        seen_ids = set()
-        for v in videos:
-            if v.id not in seen_ids:
-                unique_videos.append(v)
-                seen_ids.add(v.id)
-        
-        videos = unique_videos[:self._max_videos]
-        download_screen.log_message(f"📋 Found {len(videos)} videos to download")
-        download_screen.log_message(f"🎬 Quality: {self._download_quality}")
-        if self._download_subtitles:
-            download_screen.log_message("💬 Subtitles: Enabled")
-        
-        playlist_name = None
-        if playlist_url:
-             metadata = await asyncio.get_event_loop().run_in_executor(
-                 None,
-                 lambda: self.youtube_service.get_playlist_metadata(playlist_url)
-             )
-             if metadata:
-                 playlist_name = metadata[0]
-
-        output_dir = self.download_service.get_download_path(channel.name, playlist_name)
-        download_screen.log_message(f"📁 Saving to: {output_dir}")
-        
-        downloaded_titles = self.download_service.get_downloaded_videos(output_dir)
-        
-        # Filter out already downloaded
-        to_download = [v for v in videos if v.title not in downloaded_titles]
-        skipped = len(videos) - len(to_download)
-        if skipped:
-            download_screen.log_message(f"⏭ Skipping {skipped} already downloaded videos")
-        
-        download_screen.update_total_progress(0, len(to_download))
-        
-        if not to_download:
-            download_screen.on_queue_complete()
-            return
-
-        # Use Semaphore to limit concurrency
-        semaphore = asyncio.Semaphore(3)
-        tasks = []
-
-        async def download_task(video: VideoInfo, index: int):
-            async with semaphore:
-                if self._stop_downloads:
-                    return
+        resume_job, self._resume_job = self._resume_job, None
+        request = DownloadRequest(
+            channel=channel,
+            max_videos=self._max_videos,
+            quality=self._download_quality,
+            playlist_url=getattr(self, '_playlist_url', None),
+            subtitles=self._download_subtitles,
+            selected_videos=getattr(self, '_selected_videos', None),
+            new_only=self._new_only,
+            order=self._download_order,
+            resume_job=resume_job,
+        )
+        try:
+            await self.download_runner.run(request, download_screen)
+        except Exception as e:
+            download_screen.log_message(f"Queue failed: {str(e)}", "error")
 
-                video_url = f"https://www.youtube.com/watch?v={video.id}"
-                
-                def progress_callback(progress: DownloadProgress):
-                    # This runs in a side thread from yt-dlp, so we MUST use call_from_thread
-                    self.call_from_thread(download_screen.update_progress, progress)
-                
-                def stop_check():
-                    return self._stop_downloads
-
-                quality = self._download_quality
-                subtitles = self._download_subtitles
-                result = await asyncio.get_event_loop().run_in_executor(
-                    self._download_executor,
-                    lambda: self.download_service.download_video(
-                        video_url, 
-                        output_dir, 
-                        progress_callback, 
-                        quality, 
-                        subtitles=subtitles,
-                        stop_check=stop_check
-                    )
-                )
-                
-                if result.success:
-                    # We are in the main thread coroutine here, call directly
-                    download_screen.on_download_complete(result.video_title)
-                else:
-                    if not self._stop_downloads:
-                        download_screen.on_download_error(
-                            result.video_title, 
-                            result.error or "Unknown error"
-                        )
-                    else:
-                        download_screen.log_message(f"⏹ Stopped: {result.video_title}")
-
-        for i, video in enumerate(to_download):
-            tasks.append(asyncio.create_task(download_task(video, i)))
-
-        await asyncio_gather_safe(*tasks)
-        
-        # Ensure final state is reflected
-        if not self._stop_downloads:
-            download_screen.update_total_progress(len(to_download), len(to_download))
-            download_screen.on_queue_complete()
+    def set_rate_limit(self, rate: Optional[float]) -> None:
+        """Change the bandwidth limit shared by all downloads, None for unlimited."""
+        self.download_service.rate_limiter.set_rate(rate)
+        if isinstance(self.screen, DownloadScreen):
+            self.screen.set_rate_limit(self.download_service.rate_limiter.rate)
 
     def stop_downloads(self) -> None:
         """Stop the download loop and signals side threads."""
-        self._stop_downloads = True
+        self.download_runner.stop()
         if self._download_task:
             self._download_task.cancel()
 
@@ -0,0 +1,867 @@
+"""Headless download commands for servers and cron, without the TUI.
+
+Nothing here imports Textual: the commands drive the same ``DownloadRunner``
+as the TUI and print progress as plain lines or JSON objects.
+"""
+
+import asyncio
+import json
+import re
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Optional, TextIO
+
+from fifu.services.concurrency import ConcurrencyController
+from fifu.services.config import MAX_KNOWN_VIDEO_IDS, ConfigService
+from fifu.services.downloader import DownloadProgress
+from fifu.services.journal import DownloadQueue, ItemState, QueueJob
+from fifu.services.polling import PollSchedule
+from fifu.services.progress import ProgressBus
+from fifu.services.runner import DownloadRequest, DownloadRunner, JobContext, create_download_service
+from fifu.services.scheduling import LISTING, RoundRobin
+from fifu.services.youtube import ChannelInfo, VideoInfo, YouTubeService
+
+# Channel pages are synced as channels; any other URL is a playlist, as in the TUI
+CHANNEL_URL = re.compile(r"youtube\.com/(@[^/?#]+|channel/[^/?#]+|c/[^/?#]+|user/[^/?#]+)")
+
+# Seconds between re-reads of the favorites while the daemon waits
+FAVORITES_RELOAD_INTERVAL = 60.0
+
+# Seconds between progress totals of a batch
+TOTALS_INTERVAL = 30.0
+
+# Seconds an idle worker waits before looking for new items again
+WORKER_POLL_INTERVAL = 2.0
+
+# Items a worker claims beyond its download slots, resolved ahead so a slot
+# starts on bytes right away; any more would sit leased while other workers idle
+WORKER_LOOKAHEAD = 1
+
+
+class LineReporter:
+    """Report a download queue as plain log lines, e.g. for cron mail.
+
+    With several queues running at once, each gets its own reporter tagged
+    with its ``channel``.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        progress_interval: float = 5.0,
+        channel: Optional[str] = None,
+    ):
+        self.stream = stream or sys.stdout
+        self.channel = channel
+        # How often the progress of running downloads is printed
+        self.progress_interval = progress_interval
+        self.progress_bus = ProgressBus()
+        self.total = 0
+        self.downloaded = 0
+        self.failed = 0
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """Write one event."""
+        if event == "progress":
+            line = f"  {fields['percent']:5.1f}%  {fields['title']}"
+            if fields.get("speed"):
+                line += f"  {fields['speed']}"
+            if fields.get("eta"):
+                line += f"  ETA {fields['eta']}"
+        elif event == "downloaded":
+            line = f"✅ Downloaded: {fields['title']}"
+        elif event == "failed":
+            line = f"❌ Failed: {fields['title']} - {fields['error']}"
+        elif event == "summary":
+            line = f"🎉 {fields['downloaded']} downloaded, {fields['failed']} failed of {fields['total']}"
+        elif event == "totals":
+            line = (
+                f"📊 {fields['downloaded']}/{fields['total']} downloaded, "
+                f"{fields['failed']} failed across {fields['queues']} queues"
+            )
+        else:
+            line = fields.get("message", event)
+        if self.channel:
+            line = f"[{self.channel}] {line}"
+        print(line, file=self.stream, flush=True)
+
+    async def report_progress(self) -> None:
+        """Print the latest progress of running downloads every ``progress_interval``."""
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            for progress in self.progress_bus.drain():
+                self.update_progress(progress)
+
+    def log_message(self, message: str, level: str = "info") -> None:
+        self.emit("log", message=message, level=level)
+
+    def set_queue_total(self, total: int) -> None:
+        self.total = total
+
+    def set_concurrency(self, active: int, target: int, throughput: float) -> None:
+        pass
+
+    def update_progress(self, progress: DownloadProgress) -> None:
+        if progress.status == "downloading":
+            self.emit(
+                "progress",
+                title=progress.video_title,
+                percent=progress.percent,
+                speed=progress.speed,
+                eta=progress.eta,
+            )
+
+    def update_total_progress(self, current: int, total: int) -> None:
+        self.total = total
+
+    def on_download_complete(self, video_title: str) -> None:
+        self.downloaded += 1
+        self.emit("downloaded", title=video_title)
+
+    def on_download_error(self, video_title: str, error: str) -> None:
+        self.failed += 1
+        self.emit("failed", title=video_title, error=error)
+
+    def on_queue_complete(self) -> None:
+        self.emit("summary", total=self.total, downloaded=self.downloaded, failed=self.failed)
+
+
+class JsonReporter(LineReporter):
+    """Report a download queue as one JSON object per line, for scripts."""
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        progress_interval: float = 1.0,
+        channel: Optional[str] = None,
+    ):
+        super().__init__(stream, progress_interval, channel)
+        self._concurrency = (0, 0)
+
+    def emit(self, event: str, **fields: Any) -> None:
+        if self.channel:
+            fields["channel"] = self.channel
+        print(json.dumps({"event": event, "time": time.time(), **fields}, ensure_ascii=False), file=self.stream, flush=True)
+
+    def set_concurrency(self, active: int, target: int, throughput: float) -> None:
+        # Only changes, as the controller reports after every download
+        if (active, target) != self._concurrency:
+            self._concurrency = (active, target)
+            self.emit("concurrency", active=active, target=target, throughput=throughput)
+
+
+def resolve_target(youtube_service: YouTubeService, target: str) -> tuple[Optional[ChannelInfo], Optional[str]]:
+    """Turn a channel URL, other URL or search query into a channel and playlist URL."""
+    if target.startswith(("http://", "https://", "www.youtube.com", "youtube.com")):
+        if CHANNEL_URL.search(target) and "list=" not in target:
+            return youtube_service.get_channel_from_url(target), None
+        metadata = youtube_service.get_playlist_metadata(target)
+        if not metadata:
+            return None, None
+        title, uploader = metadata
+        channel = ChannelInfo(
+            id="direct_url",
+            name=title,
+            url=target,
+            description=f"Direct URL from: {uploader}",
+        )
+        return channel, target
+
+    channels = youtube_service.search_channels_flat(target)
+    return (channels[0] if channels else None), None
+
+
+def find_unfinished_job(queue: DownloadQueue, request: DownloadRequest) -> Optional[QueueJob]:
+    """Find an interrupted run of the same queue, to continue it instead of starting over."""
+    for job in queue.unfinished_jobs():
+        if (
+            job.channel_id == request.channel.id
+            and job.playlist_url == request.playlist_url
+            and job.quality == request.quality
+            and job.subtitles == request.subtitles
+            and job.new_only == request.new_only
+        ):
+            return job
+    return None
+
+
+class HeadlessSession:
+    """Services and runner for one headless command."""
+
+    def __init__(
+        self,
+        jobs: Optional[int] = None,
+        limit_rate: Optional[float] = None,
+        process_workers: Optional[bool] = None,
+        json_output: bool = False,
+        queue_path: Optional[Path] = None,
+    ):
+        # First, so a shared queue that can't be opened fails before any workers start
+        self.download_queue = DownloadQueue(queue_path)
+        self.config_service = ConfigService()
+        max_downloads = jobs or self.config_service.get_setting("max_concurrent_downloads", 8)
+        self.youtube_service = YouTubeService()
+        self.download_service = create_download_service(
+            self.config_service, max_downloads, process_workers, limit_rate
+        )
+        self.runner = DownloadRunner(
+            self.config_service,
+            self.youtube_service,
+            self.download_service,
+            self.download_queue,
+            max_downloads,
+        )
+        self.json_output = json_output
+        self.reporter = self.new_reporter()
+        # Reporters of the queues run so far, for totals and the exit status
+        self.reporters = [self.reporter]
+        self.stopping: Optional[asyncio.Event] = None
+
+    def new_reporter(self, channel: Optional[str] = None) -> LineReporter:
+        """Create a reporter in the command's output format."""
+        if self.json_output:
+            return JsonReporter(channel=channel)
+        return LineReporter(channel=channel)
+
+    @property
+    def failed(self) -> int:
+        """Videos or queues that failed so far."""
+        return sum(reporter.failed for reporter in self.reporters)
+
+    def report_totals(self, reporters: list[LineReporter]) -> None:
+        """Print the combined counts of several queues."""
+        self.reporter.emit(
+            "totals",
+            queues=len(reporters),
+            total=sum(reporter.total for reporter in reporters),
+            downloaded=sum(reporter.downloaded for reporter in reporters),
+            failed=sum(reporter.failed for reporter in reporters),
+        )
+
+    def close(self) -> None:
+        """Shutdown every service."""
+        self.runner.shutdown()
+        self.youtube_service.shutdown()
+        self.download_service.shutdown()
+        self.download_queue.close()
+
+    def request(self, channel: ChannelInfo, playlist_url: Optional[str] = None, **options: Any) -> DownloadRequest:
+        """Build a request, continuing the same queue if an earlier run was interrupted."""
+        request = DownloadRequest(channel=channel, playlist_url=playlist_url, **options)
+        request.resume_job = find_unfinished_job(self.download_queue, request)
+        return request
+
+    def handle_signals(self) -> None:
+        """Stop gracefully on the first Ctrl-C or SIGTERM, right away on the second."""
+        loop = asyncio.get_running_loop()
+        main = asyncio.current_task()
+        self.stopping = asyncio.Event()
+
+        def on_signal() -> None:
+            if self.runner.stopped:
+                # A second Ctrl-C stops waiting for running downloads
+                main.cancel()
+                return
+            self.reporter.log_message("⏹ Stopping, press Ctrl-C again to quit now...")
+            self.runner.stop()
+            self.stopping.set()
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, on_signal)
+            except (NotImplementedError, RuntimeError):
+                # Windows: Ctrl-C still interrupts, just not gracefully
+                pass
+
+    async def run_queue(
+        self,
+        request: DownloadRequest,
+        reporter: LineReporter,
+        controller: Optional[ConcurrencyController] = None,
+        fair_share: Optional[RoundRobin] = None,
+    ) -> None:
+        """Run one request, printing its progress."""
+        progress = asyncio.create_task(reporter.report_progress())
+        try:
+            await self.runner.run(request, reporter, controller, fair_share)
+        except Exception as e:
+            reporter.failed += 1
+            reporter.log_message(f"Queue failed: {str(e)}", "error")
+        finally:
+            progress.cancel()
+
+    async def run(self, requests: list[DownloadRequest]) -> None:
+        """Run the requests one after another until done or interrupted."""
+        self.handle_signals()
+        for request in requests:
+            if self.runner.stopped:
+                break
+            reporter = self.reporter
+            if len(requests) > 1:
+                reporter = self.new_reporter(request.channel.name)
+                self.reporters.append(reporter)
+            await self.run_queue(request, reporter)
+
+    async def run_batch(self, targets: list[str], **options: Any) -> None:
+        """Download several channels and playlists at once, fairly.
+
+        The targets are resolved and listed concurrently, and their queues
+        share one controller whose slots go round-robin between them, so a
+        channel with thousands of videos doesn't hold back the small ones.
+        """
+        self.handle_signals()
+        loop = asyncio.get_running_loop()
+        self.reporter.log_message(f"🔍 Resolving {len(targets)} channels and playlists...")
+        resolved = await asyncio.gather(*(
+            loop.run_in_executor(None, resolve_target, self.youtube_service, target)
+            for target in targets
+        ))
+
+        queues = []
+        for target, (channel, playlist_url) in zip(targets, resolved):
+            if channel is None:
+                self.reporter.failed += 1
+                self.reporter.log_message(f"Could not find a channel or playlist for '{target}'", "error")
+                continue
+            reporter = self.new_reporter(channel.name)
+            queues.append((self.request(channel, playlist_url, **options), reporter))
+        reporters = [reporter for _, reporter in queues]
+        self.reporters.extend(reporters)
+
+        async def report_totals():
+            while True:
+                await asyncio.sleep(TOTALS_INTERVAL)
+                self.report_totals(reporters)
+
+        controller = self.runner.new_controller()
+        fair_share = RoundRobin()
+        monitor = asyncio.create_task(self.runner.monitor(controller))
+        totals = asyncio.create_task(report_totals())
+        try:
+            await asyncio.gather(*(
+                self.run_queue(request, reporter, controller, fair_share)
+                for request, reporter in queues
+            ))
+        finally:
+            monitor.cancel()
+            totals.cancel()
+        self.report_totals(reporters)
+
+    async def seed_sync(self, channel: ChannelInfo, reporter: LineReporter) -> None:
+        """Remember a never-synced channel's current uploads without downloading them."""
+        loop = asyncio.get_running_loop()
+        try:
+            videos = await loop.run_in_executor(
+                None,
+                self.youtube_service.get_new_channel_videos,
+                channel.url,
+                set(),
+                MAX_KNOWN_VIDEO_IDS,
+            )
+            await loop.run_in_executor(
+                None, self.config_service.remember_video_ids, channel.id, [video.id for video in videos]
+            )
+        except Exception as e:
+            reporter.failed += 1
+            reporter.log_message(f"Could not list uploads: {str(e)}", "error")
+            return
+        reporter.log_message(
+            f"🌱 First check: {len(videos)} existing uploads marked as synced, only newer ones will download"
+        )
+
+    async def poll_favorites(self, schedule: PollSchedule, **options: Any) -> None:
+        """Check every favorite for new uploads on the schedule until stopped.
+
+        New uploads of all favorites share one concurrency controller, so the
+        ``--jobs`` and ``--limit-rate`` caps hold across channels. A channel
+        whose previous uploads are still downloading is checked next time.
+        The first check of a channel never synced before only remembers its
+        current uploads, so adding a favorite doesn't fetch its back catalogue.
+        """
+        self.handle_signals()
+        controller = self.runner.new_controller()
+        monitor = asyncio.create_task(self.runner.monitor(controller))
+        running: dict[str, asyncio.Task] = {}
+        try:
+            while not self.runner.stopped:
+                # Pick up favorites added or removed in the TUI meanwhile
+                self.config_service.reload()
+                favorites = {favorite["id"]: favorite for favorite in self.config_service.get_favorites()}
+                schedule.sync(favorites)
+
+                due = schedule.next_due()
+                wait = FAVORITES_RELOAD_INTERVAL if due is None else due[1] - time.monotonic()
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(self.stopping.wait(), min(wait, FAVORITES_RELOAD_INTERVAL))
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                key = due[0]
+                schedule.polled(key)
+                if key in running and not running[key].done():
+                    continue
+                favorite = favorites[key]
+                channel = ChannelInfo(id=favorite["id"], name=favorite["name"], url=favorite["url"])
+                request = self.request(channel, new_only=True, **options)
+                reporter = self.new_reporter(channel.name)
+                if request.resume_job or self.config_service.get_known_video_ids(channel.id):
+                    running[key] = asyncio.create_task(self.run_queue(request, reporter, controller))
+                else:
+                    running[key] = asyncio.create_task(self.seed_sync(channel, reporter))
+
+            # Let running downloads stop at a point they can resume from
+            await asyncio.gather(*running.values())
+        finally:
+            monitor.cancel()
+
+    def enqueue(self, target: str, **options: Any) -> int:
+        """List a channel or playlist into a shared job for workers, returning the videos queued."""
+        channel, playlist_url = resolve_target(self.youtube_service, target)
+        if channel is None:
+            self.reporter.failed += 1
+            self.reporter.log_message(f"Could not find a channel or playlist for '{target}'", "error")
+            return 0
+        request = DownloadRequest(channel=channel, playlist_url=playlist_url, **options)
+
+        playlist_name = None
+        if playlist_url:
+            metadata = self.youtube_service.get_playlist_metadata(playlist_url)
+            if metadata:
+                playlist_name = metadata[0]
+        output_dir = self.download_service.get_download_path(channel.name, playlist_name)
+        archive = self.download_service.get_archive(output_dir)
+        queue = self.download_queue
+        job_id = queue.create_job(
+            channel.id, channel.name, channel.url, output_dir, request.quality,
+            subtitles=request.subtitles,
+            playlist_url=playlist_url,
+            max_videos=request.max_videos,
+            new_only=request.new_only,
+            shared=True,
+        )
+
+        if playlist_url:
+            batches = self.youtube_service.iter_playlist_videos(playlist_url, request.max_videos)
+        elif request.new_only:
+            known_ids = self.config_service.get_known_video_ids(channel.id)
+            batches = iter([self.youtube_service.get_new_channel_videos(channel.url, known_ids, request.max_videos)])
+        else:
+            batches = self.youtube_service.iter_channel_videos(channel.url, request.max_videos)
+
+        # Waiting for workers from an earlier enqueue; the sync position only
+        # advances with the TUI and the headless downloads, so a video that
+        # fails in the shared queue is listed again by the next --new-only enqueue
+        waiting_ids = queue.shared_unfinished_ids(output_dir)
+        seen_ids = set()
+        queued_count = 0
+        waiting_count = 0
+        for batch in batches:
+            queued = []
+            for video in batch:
+                if video.id in seen_ids or len(seen_ids) >= request.max_videos:
+                    continue
+                seen_ids.add(video.id)
+                if video.id in waiting_ids:
+                    waiting_count += 1
+                elif video.id not in archive:
+                    queued.append(video)
+            queue.add_items(job_id, queued)
+            queued_count += len(queued)
+        queue.mark_listing_complete(job_id)
+        queue.finish_job_if_done(job_id)
+
+        self.reporter.log_message(
+            f"📥 Queued {queued_count} videos from {channel.name} "
+            f"({len(seen_ids) - queued_count - waiting_count} already downloaded, "
+            f"{waiting_count} already queued) to {output_dir}"
+        )
+        return queued_count
+
+    async def work(self, lease: float, exit_when_empty: bool = False) -> None:
+        """Download items of shared jobs as one of many workers until stopped.
+
+        Claimed items go through the runner's download path, with its
+        adaptive download slots, lookahead and merge stage. An item is only
+        claimed while fewer than the current download limit plus
+        ``WORKER_LOOKAHEAD`` are held, so the rest of the queue stays
+        available to other workers. A heartbeat renews the
+        leases of claimed items every third of ``lease``. An item whose lease
+        runs out before it is renewed, or that another worker claimed
+        meanwhile, is abandoned; if this worker dies, the others claim its
+        items once their leases expire.
+        """
+        self.handle_signals()
+        loop = asyncio.get_running_loop()
+        queue = self.download_queue
+        owner = f"{socket.gethostname()}:{os.getpid()}"
+        # Claims and renewals may wait on another worker's lock of the database
+        executor = ThreadPoolExecutor(max_workers=2)
+        controller = self.runner.new_controller()
+        lookahead = self.runner.new_lookahead()
+        contexts: dict[int, JobContext] = {}
+        # When the lease of each claimed item runs out, as far as this worker knows
+        leases: dict[tuple[int, str], float] = {}
+        # Claims in progress, and a wake-up for claimers once an item is let go
+        claiming = 0
+        capacity = asyncio.Condition()
+        self.reporter.log_message(
+            f"👷 Worker {owner} on {queue.path} with up to {controller.max_limit} downloads"
+        )
+
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(lease / 3)
+                # Items claimed after the renewal started may not be in its result yet
+                claimed = set(leases)
+                expires = time.time() + lease
+                try:
+                    held = await loop.run_in_executor(executor, queue.renew_leases, owner, lease)
+                except sqlite3.Error as e:
+                    # Keep beating: downloads stop on their own if their leases run out meanwhile
+                    self.reporter.log_message(f"Could not renew leases: {str(e)}", "error")
+                    continue
+                for key in claimed & leases.keys():
+                    leases[key] = expires if key in held else 0.0
+
+        async def job_context(job_id: int) -> Optional[JobContext]:
+            if job_id in contexts:
+                return contexts[job_id]
+            job = await loop.run_in_executor(executor, queue.get_job, job_id)
+            if job is None:
+                return None
+            contexts[job_id] = JobContext(
+                job_id=job.id,
+                output_dir=job.output_dir,
+                quality=job.quality,
+                subtitles=job.subtitles,
+                archive=self.download_service.get_archive(job.output_dir),
+                reporter=self.reporter,
+                controller=controller,
+                lookahead=lookahead,
+                lease_owner=owner,
+                lease_lost=lambda video_id: time.time() > leases.get((job_id, video_id), 0.0),
+            )
+            return contexts[job_id]
+
+        async def work_item(job_id: int, video: VideoInfo) -> None:
+            context = await job_context(job_id)
+            if context is None:
+                return
+            try:
+                if video.id in context.archive:
+                    await loop.run_in_executor(
+                        executor, lambda: queue.set_state(job_id, video.id, ItemState.DONE, owner=owner)
+                    )
+                else:
+                    await self.runner.download_task(context, video)
+            except sqlite3.Error:
+                # Not the video's fault; left to the slot
+                raise
+            except Exception as e:
+                await loop.run_in_executor(
+                    executor, lambda: queue.set_state(job_id, video.id, ItemState.FAILED, str(e), owner)
+                )
+                self.reporter.on_download_error(video.title, str(e))
+            await loop.run_in_executor(executor, queue.finish_job_if_done, job_id)
+
+        # Set once --exit-when-empty finds nothing left, so idle slots exit right away
+        drained = asyncio.Event()
+
+        async def idle() -> None:
+            # Poll faster than leases expire, so a dead worker's items are picked up soon
+            waits = [asyncio.create_task(self.stopping.wait()), asyncio.create_task(drained.wait())]
+            await asyncio.wait(waits, timeout=min(WORKER_POLL_INTERVAL, lease / 2), return_when=asyncio.FIRST_COMPLETED)
+            for wait in waits:
+                wait.cancel()
+
+        async def reserve() -> bool:
+            """Wait for room to claim another item and take it; False once stopping."""
+            nonlocal claiming
+            async with capacity:
+                while not self.runner.stopped and not drained.is_set():
+                    if len(leases) + claiming < controller.limit + WORKER_LOOKAHEAD:
+                        claiming += 1
+                        return True
+                    # Also wakes up for the controller's limit changing
+                    try:
+                        await asyncio.wait_for(capacity.wait(), WORKER_POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+            return False
+
+        async def let_go(key: Optional[tuple[int, str]] = None) -> None:
+            """Give back a reservation, or the claimed item it became."""
+            nonlocal claiming
+            async with capacity:
+                if key is None:
+                    claiming -= 1
+                else:
+                    leases.pop(key, None)
+                capacity.notify()
+
+        async def slot():
+            while await reserve():
+                expires = time.time() + lease
+                try:
+                    claimed = await loop.run_in_executor(executor, queue.claim_items, owner, 1, lease)
+                    if not claimed and exit_when_empty:
+                        if not await loop.run_in_executor(executor, queue.shared_unfinished):
+                            drained.set()
+                            await let_go()
+                            return
+                except sqlite3.Error as e:
+                    # e.g. locked by other workers for longer than the timeout
+                    self.reporter.log_message(f"Could not read the queue: {str(e)}", "error")
+                    claimed = []
+                if not claimed:
+                    await let_go()
+                    await idle()
+                    continue
+                job_id, video = claimed[0]
+                key = (job_id, video.id)
+                leases[key] = expires
+                await let_go()
+                try:
+                    await work_item(job_id, video)
+                except sqlite3.Error as e:
+                    # The lease runs out and another worker picks the item up
+                    self.reporter.log_message(f"Could not update the queue: {str(e)}", "error")
+                    await idle()
+                finally:
+                    await let_go(key)
+
+        beat = asyncio.create_task(heartbeat())
+        monitor = asyncio.create_task(self.runner.monitor(controller))
+        progress = asyncio.create_task(self.reporter.report_progress())
+        try:
+            await asyncio.gather(*(slot() for _ in range(controller.max_limit + WORKER_LOOKAHEAD)))
+        finally:
+            beat.cancel()
+            monitor.cancel()
+            progress.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _open_shared_queue(json_output: bool, **options: Any) -> Optional[HeadlessSession]:
+    """Start a session on the ``--queue`` database, or report why it can't be opened."""
+    try:
+        return HeadlessSession(json_output=json_output, **options)
+    except (sqlite3.Error, OSError) as e:
+        reporter = JsonReporter() if json_output else LineReporter()
+        reporter.log_message(f"Could not open the queue {options.get('queue_path')}: {str(e)}", "error")
+        return None
+
+
+def _execute(session: HeadlessSession, prepare: Callable[[], Optional[Coroutine]]) -> int:
+    """Run the coroutine a command prepares, returning the exit status."""
+    try:
+        main = prepare()
+        if main is None:
+            return 2
+        asyncio.run(main)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        return 130
+    finally:
+        session.close()
+    if session.runner.stopped:
+        return 130
+    return 1 if session.failed else 0
+
+
+def download(
+    target: str,
+    jobs: Optional[int] = None,
+    quality: str = "best",
+    max_videos: int = 9999,
+    subtitles: bool = False,
+    new_only: bool = False,
+    order: str = LISTING,
+    json_output: bool = False,
+    limit_rate: Optional[float] = None,
+    process_workers: Optional[bool] = None,
+) -> int:
+    """Download a channel, playlist or search query's top channel. Returns the exit status."""
+    session = HeadlessSession(jobs, limit_rate, process_workers, json_output)
+
+    def prepare() -> Optional[Coroutine]:
+        session.reporter.log_message(f"🔍 Resolving {target}...")
+        channel, playlist_url = resolve_target(session.youtube_service, target)
+        if channel is None:
+            session.reporter.log_message(f"Could not find a channel or playlist for '{target}'", "error")
+            return None
+        if new_only and playlist_url:
+            session.reporter.log_message("--new-only applies to channels; downloading the whole playlist")
+        return session.run([
+            session.request(
+                channel,
+                playlist_url,
+                max_videos=max_videos,
+                quality=quality,
+                subtitles=subtitles,
+                new_only=new_only,
+                order=order,
+            )
+        ])
+
+    return _execute(session, prepare)
+
+
+def sync_favorites(
+    jobs: Optional[int] = None,
+    quality: str = "best",
+    max_videos: int = 9999,
+    subtitles: bool = False,
+    order: str = LISTING,
+    json_output: bool = False,
+    limit_rate: Optional[float] = None,
+    process_workers: Optional[bool] = None,
+) -> int:
+    """Download new uploads of every favorite channel. Returns the exit status."""
+    session = HeadlessSession(jobs, limit_rate, process_workers, json_output)
+
+    def prepare() -> Coroutine:
+        favorites = session.config_service.get_favorites()
+        if not favorites:
+            session.reporter.log_message("No favorite channels yet; mark some with 'f' in the TUI.")
+        return session.run([
+            session.request(
+                ChannelInfo(id=favorite["id"], name=favorite["name"], url=favorite["url"]),
+                max_videos=max_videos,
+                quality=quality,
+                subtitles=subtitles,
+                new_only=True,
+                order=order,
+            )
+            for favorite in favorites
+        ])
+
+    return _execute(session, prepare)
+
+
+def daemon(
+    interval: Optional[float] = None,
+    jitter: Optional[float] = None,
+    jobs: Optional[int] = None,
+    quality: str = "best",
+    max_videos: int = 9999,
+    subtitles: bool = False,
+    order: str = LISTING,
+    json_output: bool = False,
+    limit_rate: Optional[float] = None,
+    process_workers: Optional[bool] = None,
+) -> int:
+    """Keep downloading new uploads of the favorites until stopped. Returns the exit status.
+
+    ``interval`` is in minutes between checks of each favorite.
+    """
+    session = HeadlessSession(jobs, limit_rate, process_workers, json_output)
+    if interval is None:
+        interval = session.config_service.get_setting("daemon_interval", 60)
+    if jitter is None:
+        jitter = session.config_service.get_setting("daemon_jitter", 0.1)
+    schedule = PollSchedule(interval * 60, jitter)
+    session.reporter.log_message(
+        f"👀 Checking favorites for new uploads every {interval:g} min (±{jitter:.0%})"
+    )
+    try:
+        asyncio.run(session.poll_favorites(
+            schedule,
+            max_videos=max_videos,
+            quality=quality,
+            subtitles=subtitles,
+            order=order,
+        ))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        return 130
+    finally:
+        session.close()
+    return 0
+
+
+def batch(
+    targets: list[str],
+    jobs: Optional[int] = None,
+    quality: str = "best",
+    max_videos: int = 9999,
+    subtitles: bool = False,
+    new_only: bool = False,
+    order: str = LISTING,
+    json_output: bool = False,
+    limit_rate: Optional[float] = None,
+    process_workers: Optional[bool] = None,
+) -> int:
+    """Download several channels and playlists at once. Returns the exit status."""
+    session = HeadlessSession(jobs, limit_rate, process_workers, json_output)
+    return _execute(session, lambda: session.run_batch(
+        targets,
+        max_videos=max_videos,
+        quality=quality,
+        subtitles=subtitles,
+        new_only=new_only,
+        order=order,
+    ))
+
+
+def enqueue(
+    targets: list[str],
+    quality: str = "best",
+    max_videos: int = 9999,
+    subtitles: bool = False,
+    new_only: bool = False,
+    queue_path: Optional[Path] = None,
+    json_output: bool = False,
+) -> int:
+    """Queue channels and playlists for ``fifu worker`` processes. Returns the exit status."""
+    session = _open_shared_queue(json_output, queue_path=queue_path)
+    if session is None:
+        return 2
+    try:
+        queued = sum(
+            session.enqueue(
+                target,
+                max_videos=max_videos,
+                quality=quality,
+                subtitles=subtitles,
+                new_only=new_only,
+            )
+            for target in targets
+        )
+        session.reporter.log_message(
+            f"📋 {queued} videos queued, {session.download_queue.shared_unfinished()} waiting for workers",
+            "success",
+        )
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        session.close()
+    return 1 if session.failed else 0
+
+
+def worker(
+    jobs: Optional[int] = None,
+    lease: float = 60.0,
+    exit_when_empty: bool = False,
+    queue_path: Optional[Path] = None,
+    json_output: bool = False,
+    limit_rate: Optional[float] = None,
+    process_workers: Optional[bool] = None,
+) -> int:
+    """Work on the shared queue with other workers. Returns the exit status."""
+    session = _open_shared_queue(
+        json_output,
+        jobs=jobs,
+        limit_rate=limit_rate,
+        process_workers=process_workers,
+        queue_path=queue_path,
+    )
+    if session is None:
+        return 2
+    return _execute(session, lambda: session.work(lease, exit_when_empty))
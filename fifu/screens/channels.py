@@ -19,16 +19,32 @@ class ChannelListItem(ListItem):
     def compose(self) -> ComposeResult:
         """Create the channel item layout."""
         with Vertical(classes="channel-item"):
-            subs = self.channel.subscriber_count_str or "N/A"
-            yield Label(
-                f"#{self.index + 1}  📺 {self.channel.name}  •  {subs} subs",
-                classes="channel-name",
-            )
-            if self.channel.description:
-                yield Label(
-                    self.channel.description[:80] + "...",
-                    classes="channel-info",
-                )
+            yield Label(self._name_text(), classes="channel-name")
+            info = Label(self._info_text(), classes="channel-info")
+            info.display = bool(self.channel.description)
+            yield info
+
+    def _name_text(self) -> str:
+        """Get the ranked title line for the channel."""
+        subs = self.channel.subscriber_count_str or "N/A"
+        return f"#{self.index + 1}  📺 {self.channel.name}  •  {subs} subs"
+
+    def _info_text(self) -> str:
+        """Get the truncated description line."""
+        if not self.channel.description:
+            return ""
+        return self.channel.description[:80] + "..."
+
+    def set_channel(self, channel: ChannelInfo, index: int) -> None:
+        """Show a different channel or rank in this row without remounting it."""
+        self.channel = channel
+        self.index = index
+        if not self.is_mounted:
+            return
+        self.query_one(".channel-name", Label).update(self._name_text())
+        info = self.query_one(".channel-info", Label)
+        info.update(self._info_text())
+        info.display = bool(channel.description)
 
 
 class ChannelsScreen(Screen):
@@ -157,6 +173,28 @@ class ChannelsScreen(Screen):
         page_info = self.query_one("#page-info", Label)
         page_info.update(f"Page {self.current_page + 1} of {self.total_pages}")
 
+    def update_channel(self, channel: ChannelInfo) -> None:
+        """Re-rank after a channel's subscriber count arrived, updating rows in place."""
+        if not self.is_mounted:
+            # on_mount renders the current state
+            return
+
+        list_view = self.query_one("#channels-list", ListView)
+        items = [item for item in list_view.children if isinstance(item, ChannelListItem)]
+        highlighted = None
+        if list_view.index is not None and list_view.index < len(items):
+            highlighted = items[list_view.index].channel
+
+        # Stable sort keeps search order among equal or unknown counts
+        self.channels.sort(key=lambda c: c.subscriber_count or 0, reverse=True)
+
+        start = self.current_page * self.page_size
+        page = self.channels[start:start + len(items)]
+        for i, (item, page_channel) in enumerate(zip(items, page)):
+            item.set_channel(page_channel, start + i)
+            if page_channel is highlighted:
+                list_view.index = i
+
     def action_next_page(self) -> None:
         """Go to next page."""
         if self.current_page < self.total_pages - 1:
@@ -1,18 +1,38 @@
 """Download screen showing progress and queue."""
 
 import asyncio
+from typing import Optional
+
 from textual.app import ComposeResult
+from textual.binding import Binding
 from textual.containers import Container, Vertical, VerticalScroll
 from textual.screen import Screen
 from textual.widgets import Button, Label, ProgressBar, RichLog
+from yt_dlp.utils import format_bytes
 
 from fifu.services.youtube import ChannelInfo
 from fifu.services.downloader import DownloadProgress
+from fifu.services.progress import ProgressBus
+
+
+# Lowest bandwidth limit reachable with the "slower" key, in bytes/s
+MIN_RATE_LIMIT = 64 * 1024
+# Limit to start from when slowing down before any speed was measured
+DEFAULT_RATE_LIMIT = 10 * 1024 * 1024
+
+# Seconds between redraws of download progress
+PROGRESS_REFRESH_INTERVAL = 0.1
 
 
 class DownloadScreen(Screen):
     """Screen for displaying download progress."""
 
+    BINDINGS = [
+        Binding("minus", "slower", "Slower"),
+        Binding("plus,equals_sign", "faster", "Faster"),
+        Binding("0", "unlimited", "No limit"),
+    ]
+
     CSS = """
     #download-container {
         width: 100%;
@@ -35,6 +55,10 @@ class DownloadScreen(Screen):
         color: $text-muted;
     }
 
+    #concurrency-status {
+        color: $text-muted;
+    }
+
     #total-status {
         width: 100%;
         height: auto;
@@ -89,7 +113,14 @@ class DownloadScreen(Screen):
         self._videos_downloaded = 0
         self._total_videos = 0
         self._active_downloads: dict[str, Vertical] = {}
+        # Progress bar and info label of each active download widget
+        self._progress_widgets: dict[str, tuple[ProgressBar, Label]] = {}
+        # Download threads publish here; the screen redraws from it on a timer
+        self.progress_bus = ProgressBus()
         self._active_percents: dict[str, float] = {}
+        self._concurrency = (0, 0)
+        self._throughput = 0.0
+        self._rate_limit: Optional[float] = None
 
     def compose(self) -> ComposeResult:
         """Create the download screen layout."""
@@ -100,6 +131,7 @@ class DownloadScreen(Screen):
                     "Downloading videos to ~/Downloads/videos/",
                     id="channel-subtitle",
                 )
+                yield Label("", id="concurrency-status")
             
             with VerticalScroll(id="active-downloads"):
                 # Active download widgets will be added here dynamically
@@ -112,6 +144,9 @@ class DownloadScreen(Screen):
 
     def on_mount(self) -> None:
         """Start downloading when screen mounts."""
+        self._rate_limit = self.app.download_service.rate_limiter.rate
+        self._show_status()
+        self.set_interval(PROGRESS_REFRESH_INTERVAL, self._refresh_progress)
         self.log_message("🚀 Starting download queue...", "info")
         self.app.start_downloads(self.channel)
 
@@ -121,6 +156,10 @@ class DownloadScreen(Screen):
             self.app.stop_downloads()
             self.app.exit()
 
+    def _refresh_progress(self) -> None:
+        for progress in self.progress_bus.drain():
+            self.update_progress(progress)
+
     def update_progress(self, progress: DownloadProgress) -> None:
         """Update the progress display for a specific video."""
         video_id = progress.video_title # Using title as ID for now
@@ -131,20 +170,22 @@ class DownloadScreen(Screen):
             # Note: We pass children to constructor to avoid "mount before parent mounted" error
             # Also use abs(hash) to ensure valid ID format
             safe_id = f"dl_{abs(hash(video_id))}"
+            # Keep references: the children can't be queried until the mount completes
+            pbar = ProgressBar(total=100, show_eta=False)
+            info = Label("Starting...", classes="video-info")
             new_widget = Vertical(
                 Label(f"🎬 {progress.video_title}", classes="video-title"),
-                ProgressBar(total=100, show_eta=False),
-                Label("Starting...", classes="video-info"),
+                pbar,
+                info,
                 classes="video-progress-item",
                 id=safe_id
             )
             active_container.mount(new_widget)
             self._active_downloads[video_id] = new_widget
+            self._progress_widgets[video_id] = (pbar, info)
             active_container.scroll_to_widget(new_widget)
 
-        widget = self._active_downloads[video_id]
-        pbar = widget.query_one(ProgressBar)
-        info = widget.query_one(".video-info", Label)
+        pbar, info = self._progress_widgets[video_id]
 
         pbar.progress = progress.percent
         
@@ -171,6 +212,45 @@ class DownloadScreen(Screen):
         self._videos_downloaded = current
         # Overall progress bar removed per user request
 
+    def action_slower(self) -> None:
+        """Halve the bandwidth limit, starting from the measured speed."""
+        rate = self._rate_limit or self._throughput or DEFAULT_RATE_LIMIT
+        self.app.set_rate_limit(max(MIN_RATE_LIMIT, rate / 2))
+
+    def action_faster(self) -> None:
+        """Double the bandwidth limit."""
+        if self._rate_limit:
+            self.app.set_rate_limit(self._rate_limit * 2)
+
+    def action_unlimited(self) -> None:
+        """Remove the bandwidth limit."""
+        self.app.set_rate_limit(None)
+
+    def set_concurrency(self, active: int, target: int, throughput: float) -> None:
+        """Show how many downloads are running against the controller's target."""
+        self._concurrency = (active, target)
+        self._throughput = throughput
+        self._show_status()
+
+    def set_rate_limit(self, rate: Optional[float]) -> None:
+        """Show the bandwidth limit shared by all downloads."""
+        self._rate_limit = rate
+        self._show_status()
+        self.log_message(f"🚦 Bandwidth limit: {format_bytes(rate) + '/s' if rate else 'none'}")
+
+    def _show_status(self) -> None:
+        active, target = self._concurrency
+        parts = [f"⚡ {active} active / {target} target"]
+        if self._throughput:
+            parts.append(f"{format_bytes(self._throughput)}/s")
+        if self._rate_limit:
+            parts.append(f"limit {format_bytes(self._rate_limit)}/s")
+        self.query_one("#concurrency-status", Label).update(" • ".join(parts))
+
+    def set_queue_total(self, total: int) -> None:
+        """Update the number of queued videos while the listing is still streaming in."""
+        self.update_total_progress(self._videos_downloaded, total)
+
     def log_message(self, message: str, level: str = "info") -> None:
         """Add a message to the download log."""
         log = self.query_one("#download-log", RichLog)
@@ -185,14 +265,14 @@ class DownloadScreen(Screen):
     async def _cleanup_completed_widget(self, video_title: str) -> None:
         """Keep the completed widget visible for a moment then remove."""
         if video_title in self._active_downloads:
-            widget = self._active_downloads[video_title]
-            info = widget.query_one(".video-info", Label)
+            _, info = self._progress_widgets[video_title]
             info.update("[green]✓ Download Completed![/green]")
             
             await asyncio.sleep(2)
             
             if video_title in self._active_downloads:
                 widget = self._active_downloads.pop(video_title)
+                self._progress_widgets.pop(video_title, None)
                 widget.remove()
 
     def on_download_complete(self, video_title: str) -> None:
@@ -210,6 +290,7 @@ class DownloadScreen(Screen):
         """Handle download error."""
         if video_title in self._active_downloads:
             widget = self._active_downloads.pop(video_title)
+            self._progress_widgets.pop(video_title, None)
             widget.remove()
         
         if video_title in self._active_percents:
@@ -5,15 +5,23 @@ from textual.containers import Container, Vertical, Horizontal, VerticalScroll
 from textual.screen import Screen
 from textual.widgets import Button, Input, Label, Select, RadioSet, RadioButton, Checkbox
 
+from fifu.services.downloader import QUALITY_FORMATS
 from fifu.services.youtube import ChannelInfo, PlaylistInfo
 
 
 QUALITY_OPTIONS = [
-    ("Best Quality", "best"),
-    ("1080p", "bestvideo[height<=1080]+bestaudio/best[height<=1080]"),
-    ("720p", "bestvideo[height<=720]+bestaudio/best[height<=720]"),
-    ("480p", "bestvideo[height<=480]+bestaudio/best[height<=480]"),
-    ("Audio Only", "bestaudio/best"),
+    ("Best Quality", QUALITY_FORMATS["best"]),
+    ("1080p", QUALITY_FORMATS["1080p"]),
+    ("720p", QUALITY_FORMATS["720p"]),
+    ("480p", QUALITY_FORMATS["480p"]),
+    ("Audio Only", QUALITY_FORMATS["audio"]),
+]
+
+ORDER_OPTIONS = [
+    ("Listing Order", "listing"),
+    ("Shortest First", "shortest"),
+    ("Longest First", "largest"),
+    ("Newest First", "newest"),
 ]
 
 
@@ -67,7 +75,7 @@ class OptionsScreen(Screen):
         margin-bottom: 1;
     }
 
-    #quality-select {
+    #quality-select, #order-select {
         width: 100%;
         margin-bottom: 1;
     }
@@ -122,6 +130,8 @@ class OptionsScreen(Screen):
         self.video_count = "all"
         self.selected_playlist = None
         self.download_subtitles = False
+        self.new_only = False
+        self.download_order = "listing"
 
     def compose(self) -> ComposeResult:
         """Create the options screen layout."""
@@ -139,6 +149,7 @@ class OptionsScreen(Screen):
                     )
                     
                     yield Checkbox("Download & Embed Subtitles", id="subtitles-check")
+                    yield Checkbox("Only New Uploads Since Last Sync", id="new-only-check")
                     
                     yield Label("Video Quality", classes="option-label")
                     yield Select(
@@ -146,6 +157,14 @@ class OptionsScreen(Screen):
                         value="best",
                         id="quality-select",
                     )
+
+                    yield Label("Download Order", classes="option-label")
+                    yield Select(
+                        ORDER_OPTIONS,
+                        value=self.app.config_service.get_setting("download_order", "listing"),
+                        allow_blank=False,
+                        id="order-select",
+                    )
                     
                     yield Label("Download from Playlist (optional)", classes="option-label")
                     if self.playlists:
@@ -192,6 +211,8 @@ class OptionsScreen(Screen):
         """Handle select changes."""
         if event.select.id == "quality-select":
             self.selected_quality = event.value
+        elif event.select.id == "order-select":
+            self.download_order = event.value
         elif event.select.id == "playlist-select":
             self.selected_playlist = event.value
 
@@ -199,6 +220,8 @@ class OptionsScreen(Screen):
         """Handle checkbox changes."""
         if event.checkbox.id == "subtitles-check":
             self.download_subtitles = event.value
+        elif event.checkbox.id == "new-only-check":
+            self.new_only = event.value
 
     def on_input_changed(self, event: Input.Changed) -> None:
         """Handle input changes."""
@@ -230,13 +253,17 @@ class OptionsScreen(Screen):
                 pass
         
         subtitles = self.query_one("#subtitles-check", Checkbox).value
+        new_only = self.query_one("#new-only-check", Checkbox).value
+        order = self.query_one("#order-select", Select).value
         
         self.app.start_download_with_options(
             channel=self.channel,
             max_videos=max_videos,
             quality=quality,
             playlist_url=playlist_url,
-            subtitles=subtitles
+            subtitles=subtitles,
+            new_only=new_only,
+            order=order,
         )
 
     def _search_channel_videos(self) -> None:
@@ -254,4 +281,6 @@ class OptionsScreen(Screen):
             except Exception:
                 pass
         
-        self.app.initiate_video_selection(self.channel, playlist_url)
+        new_only = self.query_one("#new-only-check", Checkbox).value
+        order = self.query_one("#order-select", Select).value
+        self.app.initiate_video_selection(self.channel, playlist_url, new_only, order)
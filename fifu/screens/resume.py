@@ -0,0 +1,78 @@
+"""Prompt offering to resume an interrupted download queue."""
+
+from datetime import datetime
+
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal, Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Button, Label
+
+from fifu.services.journal import QueueJob
+
+
+class ResumePromptScreen(ModalScreen):
+    """Ask whether to resume, discard or postpone an unfinished queue.
+
+    Dismisses with ``"resume"``, ``"discard"`` or ``None`` for later.
+    """
+
+    CSS = """
+    #resume-container {
+        width: 100%;
+        height: 100%;
+        align: center middle;
+        background: $surface-darken-1 80%;
+    }
+
+    #resume-box {
+        width: 64;
+        height: auto;
+        padding: 1 4;
+        border: round $primary;
+        background: $surface;
+    }
+
+    #resume-title {
+        text-style: bold;
+        margin-bottom: 1;
+    }
+
+    #resume-details {
+        color: $text-muted;
+        margin-bottom: 1;
+    }
+    """
+
+    def __init__(self, job: QueueJob, other_jobs: int = 0):
+        super().__init__()
+        self.job = job
+        self.other_jobs = other_jobs
+
+    def compose(self) -> ComposeResult:
+        """Create the prompt layout."""
+        started = datetime.fromtimestamp(self.job.created_at).strftime("%Y-%m-%d %H:%M")
+        details = [
+            f"{self.job.unfinished} unfinished videos",
+            f"started {started}",
+        ]
+        if not self.job.listing_complete:
+            details.append("listing incomplete")
+        if self.other_jobs:
+            details.append(f"{self.other_jobs} more queued")
+
+        with Container(id="resume-container"):
+            with Vertical(id="resume-box"):
+                yield Label(f"⏯ Resume downloads from {self.job.channel_name}?", id="resume-title")
+                yield Label(" • ".join(details), id="resume-details")
+                with Horizontal():
+                    yield Button("Resume", id="resume-job", variant="primary")
+                    yield Button("Discard", id="discard-job", variant="error")
+                    yield Button("Later", id="later-job")
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "resume-job":
+            self.dismiss("resume")
+        elif event.button.id == "discard-job":
+            self.dismiss("discard")
+        else:
+            self.dismiss(None)
@@ -29,16 +29,17 @@ class VideoSelectScreen(Screen):
     }
     """
 
-    def __init__(self, videos: list[VideoInfo]):
+    def __init__(self, videos: list[VideoInfo], loading: bool = False):
         super().__init__()
-        self.all_videos = videos
-        self.filtered_videos = videos
+        self.all_videos = list(videos)
+        self.filtered_videos = self.all_videos
         self.selected_urls = set()  # Track selected video URLs
         self.filter_query = ""
+        self.loading = loading
 
     def compose(self) -> ComposeResult:
         """Create the video selection layout."""
-        yield Label("Select Videos to Download", id="video-select-title")
+        yield Label(self._title_text(), id="video-select-title")
         
         # Search/Filter section
         yield Input(placeholder="Search videos...", id="video-filter-input")
@@ -70,19 +71,51 @@ class VideoSelectScreen(Screen):
         video_list = self.query_one("#video-list", Vertical)
         video_list.remove_children()
         
-        checkboxes = []
-        for video in self.filtered_videos:
-            is_checked = video.url in self.selected_urls
-            checkbox = Checkbox(
-                f"{video.title} ({self._format_duration(video.duration)})", 
-                value=is_checked
-            )
-            checkbox.video_info = video
-            checkboxes.append(checkbox)
-            
+        checkboxes = [self._make_checkbox(video) for video in self.filtered_videos]
         if checkboxes:
             video_list.mount_all(checkboxes)
 
+    def _make_checkbox(self, video: VideoInfo) -> Checkbox:
+        """Create the checkbox row for a video."""
+        checkbox = Checkbox(
+            f"{video.title} ({self._format_duration(video.duration)})", 
+            value=video.url in self.selected_urls
+        )
+        checkbox.video_info = video
+        return checkbox
+
+    def _title_text(self) -> str:
+        """Get the screen title, noting when more videos are still loading."""
+        if self.loading:
+            return f"Select Videos to Download (loading... {len(self.all_videos)} so far)"
+        return "Select Videos to Download"
+
+    def add_videos(self, videos: list[VideoInfo]) -> None:
+        """Append a newly listed batch of videos without rebuilding the list."""
+        self.all_videos.extend(videos)
+        if not self.is_mounted:
+            # on_mount populates the full list
+            return
+
+        if self.filter_query:
+            matching = [v for v in videos if self.filter_query in v.title.lower()]
+            self.filtered_videos.extend(matching)
+        else:
+            matching = videos
+
+        if matching:
+            self.query_one("#video-list", Vertical).mount_all(
+                [self._make_checkbox(video) for video in matching]
+            )
+        self.query_one("#video-select-title", Label).update(self._title_text())
+        self._update_selection_count()
+
+    def finish_loading(self) -> None:
+        """Mark the listing as complete."""
+        self.loading = False
+        if self.is_mounted:
+            self.query_one("#video-select-title", Label).update(self._title_text())
+
     def _format_duration(self, seconds: float | int | None) -> str:
         """Format seconds into MM:SS or HH:MM:SS."""
         if not seconds:
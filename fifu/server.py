@@ -0,0 +1,475 @@
+"""HTTP/JSON API over fifu's services, for the mobile app and other clients.
+
+One long-lived ``YouTubeService`` answers every request, so its yt-dlp
+instances stay warm, searches and listings come from the metadata cache,
+and identical lookups in flight at the same time share one extraction.
+Downloads run on the same ``DownloadRunner`` as the headless commands.
+"""
+
+import asyncio
+import itertools
+import json
+import re
+import time
+from dataclasses import asdict
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from yt_dlp.utils import format_bytes, parse_filesize, remove_terminal_sequences
+
+from fifu.headless import HeadlessSession, LineReporter, resolve_target
+from fifu.services.concurrency import ConcurrencyController
+from fifu.services.downloader import QUALITY_FORMATS, DownloadProgress
+from fifu.services.runner import DownloadRequest
+from fifu.services.scheduling import LISTING, RoundRobin
+
+# Same port as the Node API in apps/api, so clients work with either
+DEFAULT_PORT = 8787
+
+# Largest request body accepted, in bytes
+MAX_BODY = 64 * 1024
+
+# Seconds an idle keep-alive connection is held open
+KEEP_ALIVE_TIMEOUT = 30.0
+
+# Seconds a finished job stays listed for clients to pick up its result
+FINISHED_JOB_TTL = 3600.0
+
+Handler = Callable[[tuple, dict, dict], Awaitable[tuple[int, Any]]]
+
+
+class HTTPError(Exception):
+    """A request the API answers with an error status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _eta_seconds(eta: Optional[str]) -> int:
+    """Parse a yt-dlp ETA such as 01:02:03 or 42:17 into seconds."""
+    try:
+        return sum(int(part) * 60 ** i for i, part in enumerate(reversed(eta.split(":"))))
+    except (AttributeError, ValueError):
+        return 0
+
+
+def _speed_bytes(speed: Optional[str]) -> float:
+    """Parse a yt-dlp speed such as 1.23MiB/s into bytes per second."""
+    if not speed:
+        return 0.0
+    return parse_filesize(remove_terminal_sequences(speed).strip().removesuffix("/s")) or 0.0
+
+
+def _max_videos(value: Any, default: int) -> int:
+    """Parse a video count from a request, where "All" means no limit."""
+    if value in (None, ""):
+        return default
+    if str(value).lower() == "all":
+        return 9999
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{value}' is not a number of videos")
+    if count < 1:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "The number of videos must be at least 1")
+    return count
+
+
+class JobReporter(LineReporter):
+    """Log a download job like the headless commands and keep its status for the API."""
+
+    def __init__(self, job_id: str, channel: str):
+        super().__init__(progress_interval=1.0, channel=channel)
+        self.job_id = job_id
+        self.status = "queued"
+        # When the job ended, on the monotonic clock
+        self.finished_at: Optional[float] = None
+        # Latest progress of the job's running downloads, by title
+        self.active: dict[str, DownloadProgress] = {}
+
+    def update_progress(self, progress: DownloadProgress) -> None:
+        if progress.status in ("downloading", "finishing"):
+            self.active[progress.video_title] = progress
+
+    def on_download_complete(self, video_title: str) -> None:
+        self.active.pop(video_title, None)
+        super().on_download_complete(video_title)
+
+    def on_download_error(self, video_title: str, error: str) -> None:
+        self.active.pop(video_title, None)
+        super().on_download_error(video_title, error)
+
+    def snapshot(self) -> dict:
+        """The job's status in the shape the mobile app polls."""
+        if self.status == "completed":
+            progress = 100.0
+        elif self.total:
+            done = self.downloaded + self.failed + sum(p.percent for p in self.active.values()) / 100
+            progress = min(100.0, done / self.total * 100)
+        else:
+            progress = 0.0
+        running = self.status == "downloading" and self.active
+        speed = sum(_speed_bytes(p.speed) for p in self.active.values())
+        etas = [p.eta for p in self.active.values() if p.eta]
+        return {
+            "id": self.job_id,
+            "name": self.channel,
+            "status": self.status,
+            "total": self.total,
+            "completed": self.downloaded,
+            "failed": self.failed,
+            "progress": round(progress, 1),
+            "speed": f"{format_bytes(speed)}/s" if running else "0 B/s",
+            "eta": max(etas, key=_eta_seconds) if running and etas else ("Done" if self.status == "completed" else ""),
+            "active": [f"{title} ({p.percent:.0f}%)" for title, p in self.active.items()],
+        }
+
+
+class ApiServer:
+    """Route HTTP requests to fifu's services and run download jobs."""
+
+    def __init__(self, session: HeadlessSession):
+        self.session = session
+        self.youtube_service = session.youtube_service
+        self.jobs: dict[str, JobReporter] = {}
+        # Jobs running in this process by what they download, so a repeated request joins them
+        self._running: dict[tuple, JobReporter] = {}
+        self._job_ids = itertools.count(1)
+        self._tasks: set[asyncio.Task] = set()
+        # Every job shares the download slots, taking turns like a batch
+        self.controller: Optional[ConcurrencyController] = None
+        self.fair_share = RoundRobin()
+        self.routes: list[tuple[str, re.Pattern, Handler]] = [
+            ("GET", re.compile(r"/health"), self.health),
+            ("POST", re.compile(r"/api/search"), self.search),
+            ("POST", re.compile(r"/api/options"), self.options),
+            ("GET", re.compile(r"/api/channels/([^/]+)/videos"), self.channel_videos),
+            ("GET", re.compile(r"/api/channels/([^/]+)/playlists"), self.channel_playlists),
+            ("GET", re.compile(r"/api/playlists/([^/]+)/videos"), self.playlist_videos),
+            ("POST", re.compile(r"/api/downloads"), self.start_download),
+            ("GET", re.compile(r"/api/jobs"), self.list_jobs),
+            ("GET", re.compile(r"/api/jobs/([^/]+)"), self.get_job),
+        ]
+
+    async def _call(self, function: Callable, *args: Any) -> Any:
+        """Run a blocking service call off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def health(self, params: tuple, query: dict, body: dict) -> tuple[int, Any]:
+        return HTTPStatus.OK, {"ok": True}
+
+    async def search(self, params: tuple, query: dict, body: dict) -> tuple[int, Any]:
+        """Search channels or videos, in the response shape of the Node API."""
+        text = str(body.get("query") or "").strip()
+        kind = body.get("type") or "channel"
+        if not text:
+            return HTTPStatus.OK, {"query": "", "type": kind, "channels": [], "videos": []}
+
+        if kind == "video":
+            videos = await self._call(self.youtube_service.search_videos, text, _max_videos(body.get("max"), 50))
+            return HTTPStatus.OK, {
+                "query": text,
+                "type": kind,
+                "videos": [{**asdict(video), "uploader": video.uploader or "Unknown"} for video in videos],
+            }
+
+        config_service = self.session.config_service
+        channels = await self._call(
+            self.youtube_service.search_channels,
+            text,
+            _max_videos(body.get("max"), 30),
+            config_service.get_setting("search_max_lookups", 10),
+            config_service.get_setting("search_max_wait", 3.0),
+        )
+        return HTTPStatus.OK, {
+            "query": text,
+            "type": kind,
+            "channels": [
+                {
+                    "id": channel.id,
+                    "name": channel.name,
+                    "url": channel.url,
+                    "subs": channel.subscriber_count_str or "N/A",
+                    "subCount": channel.subscriber_count or 0,
+                    "description": channel.description or "",
+                }
+                for channel in channels
+            ],
+        }
+
+    async def options(self, params: tuple, query: dict, body: dict) -> tuple[int, Any]:
+        """Playlists to offer when downloading a channel, in the shape of the Node API."""
+        channel_id = body.get("channelId")
+        if not channel_id:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing channelId")
+        playlists, name = await asyncio.gather(
+            self._call(self.youtube_service.get_channel_playlists, channel_id),
+            self._call(self.youtube_service.get_channel_name, channel_id),
+        )
+        return HTTPStatus.OK, {
+            "channelId": channel_id,
+            "name": name or "Unknown Channel",
+            "playlists": [
+                {"id": playlist.id, "title": playlist.title, "url": playlist.url, "count": playlist.video_count or 0}
+                for playlist in playlists
+            ],
+            # The Node API's count of entries in the channel's playlists tab
+            "totalVideos": len(playlists),
+        }
+
+    async def channel_videos(self, params: tuple, query: dict, body: dict) -> tuple[int, Any]:
+        channel_id = params[0]
+        videos = await self._call(
+            self.youtube_service.get_channel_videos,
+            f"https://www.youtube.com/channel/{channel_id}/videos",
+            _max_videos(query.get("max"), 50),
+        )
+        return HTTPStatus.OK, {"channelId": channel_id, "videos": [asdict(video) for video in videos]}
+
+    async def channel_playlists(self, params: tuple, query: dict, body: dict) -> tuple[int, Any]:
+        channel_id = params[0]
+        playlists = await self._call(self.youtube_service.get_channel_playlists, channel_id)
+        return HTTPStatus.OK, {"channelId": channel_id, "playlists": [asdict(playlist) for playlist in playlists]}
+
+    async def playlist_videos(self, params: tuple, query: dict, body: dict) -> tuple[int, Any]:
+        playlist_id = params[0]
+        videos = await self._call(
+            self.youtube_service.get_playlist_videos,
+            f"https://www.youtube.com/playlist?list={playlist_id}",
+            _max_videos(query.get("max"), 100),
+        )
+        return HTTPStatus.OK, {"playlistId": playlist_id, "videos": [asdict(video) for video in videos]}
+
+    async def start_download(self, params: tuple, query: dict, body: dict) -> tuple[int, Any]:
+        """Queue a channel, playlist or video for download and return its job.
+
+        The source is a ``target`` as given to ``fifu download``, or a
+        ``channelId`` or ``playlistId``.
+        """
+        target = body.get("target") or body.get("url")
+        if not target and body.get("playlistId"):
+            target = f"https://www.youtube.com/playlist?list={body['playlistId']}"
+        if not target and body.get("channelId"):
+            target = f"https://www.youtube.com/channel/{body['channelId']}"
+        if not target:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing target, channelId or playlistId")
+        quality = str(body.get("quality") or "best").lower()
+        if quality not in QUALITY_FORMATS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown quality '{quality}'")
+        if self.session.runner.stopped:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "The server is shutting down")
+
+        max_videos = _max_videos(body.get("max"), 9999)
+        subtitles = bool(body.get("subtitles"))
+
+        channel, playlist_url = await self._call(resolve_target, self.youtube_service, target)
+        if channel is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Could not find a channel or playlist for '{target}'")
+        new_only = bool(body.get("newOnly")) and not playlist_url
+        # What find_unfinished_job matches on: a second run would resume the first one's journal
+        key = (channel.id, playlist_url, QUALITY_FORMATS[quality], subtitles, new_only)
+        if key in self._running:
+            return HTTPStatus.OK, self._running[key].snapshot()
+
+        self._evict_finished()
+        job_id = f"job_{next(self._job_ids)}"
+        reporter = JobReporter(job_id, channel.name)
+        self.jobs[job_id] = reporter
+        self.session.reporters.append(reporter)
+        self._running[key] = reporter
+        try:
+            request = await self._call(lambda: self.session.request(
+                channel,
+                playlist_url,
+                max_videos=max_videos,
+                quality=QUALITY_FORMATS[quality],
+                subtitles=subtitles,
+                new_only=new_only,
+                order=self.session.config_service.get_setting("download_order", LISTING),
+            ))
+        except Exception:
+            self._finish_job(key, reporter, "failed")
+            raise
+        task = asyncio.create_task(self._run_job(key, request, reporter))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return HTTPStatus.ACCEPTED, reporter.snapshot()
+
+    async def _run_job(self, key: tuple, request: DownloadRequest, reporter: JobReporter) -> None:
+        """Run a job's queue alongside the others and record how it ended."""
+        reporter.status = "downloading"
+        try:
+            await self.session.run_queue(request, reporter, self.controller, self.fair_share)
+        finally:
+            reporter.active.clear()
+            if self.session.runner.stopped:
+                status = "stopped"
+            elif reporter.failed and not reporter.downloaded:
+                status = "failed"
+            else:
+                status = "completed"
+            self._finish_job(key, reporter, status)
+
+    def _finish_job(self, key: tuple, reporter: JobReporter, status: str) -> None:
+        """Record how a job ended and let the same download be requested again."""
+        reporter.status = status
+        reporter.finished_at = time.monotonic()
+        if self._running.get(key) is reporter:
+            del self._running[key]
+
+    def _evict_finished(self) -> None:
+        """Forget jobs that finished more than ``FINISHED_JOB_TTL`` ago."""
+        cutoff = time.monotonic() - FINISHED_JOB_TTL
+        expired = [
+            job_id for job_id, reporter in self.jobs.items()
+            if reporter.finished_at is not None and reporter.finished_at < cutoff
+        ]
+        for job_id in expired:
+            self.session.reporters.remove(self.jobs.pop(job_id))
+
+    async def list_jobs(self, params: tuple, query: dict, body: dict) -> tuple[int, Any]:
+        self._evict_finished()
+        return HTTPStatus.OK, {"jobs": [reporter.snapshot() for reporter in self.jobs.values()]}
+
+    async def get_job(self, params: tuple, query: dict, body: dict) -> tuple[int, Any]:
+        reporter = self.jobs.get(params[0])
+        if reporter is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Job not found")
+        return HTTPStatus.OK, reporter.snapshot()
+
+    async def dispatch(self, method: str, target: str, raw_body: bytes) -> tuple[int, Any]:
+        """Answer one request with a status and a JSON-serializable payload."""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        path = url.path.rstrip("/") or "/"
+        allowed = []
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            try:
+                body = json.loads(raw_body) if raw_body.strip() else {}
+                if not isinstance(body, dict):
+                    raise ValueError("not an object")
+            except ValueError:
+                return HTTPStatus.BAD_REQUEST, {"error": "The body must be a JSON object"}
+            try:
+                return await handler(tuple(unquote(group) for group in match.groups()), query, body)
+            except HTTPError as e:
+                return e.status, {"error": e.message}
+            except Exception as e:
+                self.session.reporter.log_message(f"{method} {path} failed: {str(e)}", "error")
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+        if allowed:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"Use {' or '.join(allowed)}"}
+        return HTTPStatus.NOT_FOUND, {"error": "Not found"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of one connection, keeping it open between them."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                started = time.perf_counter()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Bad request"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Bad Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"}, False)
+                    break
+                raw_body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, target, raw_body)
+                await self._respond(writer, status, payload, keep_alive)
+                self.session.reporter.log_message(
+                    f"{method} {target} {int(status)} {(time.perf_counter() - started) * 1000:.1f} ms"
+                )
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        status = HTTPStatus(status)
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host: str, port: int) -> None:
+        """Answer requests until Ctrl-C, then let running downloads stop where they can resume."""
+        self.session.handle_signals()
+        self.controller = self.session.runner.new_controller()
+        monitor = asyncio.create_task(self.session.runner.monitor(self.controller))
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ", ".join(
+            f"http://{address[0]}:{address[1]}" for address in (s.getsockname() for s in server.sockets)
+        )
+        self.session.reporter.log_message(f"🌐 Serving the fifu API on {addresses}", "success")
+        try:
+            await self.session.stopping.wait()
+            # Idle keep-alive connections are dropped rather than waited for
+            server.close()
+            await asyncio.gather(*self._tasks)
+        finally:
+            server.close()
+            monitor.cancel()
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    jobs: Optional[int] = None,
+    json_output: bool = False,
+    limit_rate: Optional[float] = None,
+    process_workers: Optional[bool] = None,
+) -> int:
+    """Serve the HTTP API until stopped. Returns the exit status."""
+    session = HeadlessSession(jobs, limit_rate, process_workers, json_output)
+    try:
+        asyncio.run(ApiServer(session).serve(host, port))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        return 130
+    except OSError as e:
+        session.reporter.log_message(f"Could not listen on {host}:{port}: {e.strerror or e}", "error")
+        return 1
+    finally:
+        session.close()
+    return 0
@@ -3,5 +3,7 @@
 from fifu.services.youtube import YouTubeService, ChannelInfo, VideoInfo, PlaylistInfo
 from fifu.services.downloader import DownloadService
 from fifu.services.config import ConfigService
+from fifu.services.cache import MetadataCache
+from fifu.services.journal import DownloadQueue
 
-__all__ = ["YouTubeService", "ChannelInfo", "VideoInfo", "PlaylistInfo", "DownloadService", "ConfigService"]
+__all__ = ["YouTubeService", "ChannelInfo", "VideoInfo", "PlaylistInfo", "DownloadService", "ConfigService", "MetadataCache", "DownloadQueue"]
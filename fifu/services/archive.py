@@ -0,0 +1,62 @@
+"""Persistent archive of downloaded video IDs."""
+
+import threading
+from pathlib import Path
+
+
+ARCHIVE_FILENAME = ".fifu_archive.txt"
+
+
+class DownloadArchive:
+    """Append-only set of completed video IDs stored in an output folder.
+
+    The file uses yt-dlp's ``--download-archive`` format (one
+    ``<extractor> <video id>`` line per video), so it can be shared with
+    plain yt-dlp runs against the same folder.
+    """
+
+    def __init__(self, path: Path, extractor: str = "youtube"):
+        self.path = path
+        self.extractor = extractor
+        self._lock = threading.Lock()
+        self._entries: set[str] = set()
+        self._load()
+
+    def _load(self) -> None:
+        """Read existing entries into memory."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self._entries.add(line)
+        except OSError:
+            # Missing or unreadable archive starts empty
+            pass
+
+    def _entry(self, video_id: str) -> str:
+        return f"{self.extractor} {video_id}"
+
+    def exists(self) -> bool:
+        """Whether the archive file has been created yet."""
+        return self.path.exists()
+
+    def __contains__(self, video_id: str) -> bool:
+        return self._entry(video_id) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, video_id: str) -> None:
+        """Record a video as downloaded."""
+        entry = self._entry(video_id)
+        with self._lock:
+            if entry in self._entries:
+                return
+            self._entries.add(entry)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(entry + "\n")
+            except OSError:
+                pass
@@ -0,0 +1,129 @@
+"""Persistent SQLite cache for YouTube metadata listings."""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+
+# Seconds a cached listing is served as fresh, per kind of lookup
+DEFAULT_TTLS = {
+    "channel_videos": 30 * 60,
+    "channel_playlists": 6 * 60 * 60,
+    "playlist_videos": 30 * 60,
+    "playlist_metadata": 24 * 60 * 60,
+    "channel_details": 24 * 60 * 60,
+    "channel_search": 60 * 60,
+    "video_search": 60 * 60,
+}
+
+# Entries older than their TTL are still served (and refreshed in the
+# background) until they reach this age, after which they count as a miss.
+DEFAULT_MAX_STALE = 7 * 24 * 60 * 60
+
+
+class MetadataCache:
+    """Key/value cache of JSON metadata with per-kind TTLs and hit/miss counters."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttls: Optional[dict[str, float]] = None,
+        max_stale: float = DEFAULT_MAX_STALE,
+    ):
+        self.path = path or Path.home() / ".config" / "fifu" / "cache.db"
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_stale = max_stale
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "writes": 0}
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database, falling back to memory if the file is unusable."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error:
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """
+        )
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def make_key(url: str, **options: Any) -> str:
+        """Build a cache key from a URL and the options that shape its result."""
+        return json.dumps([url, options], sort_keys=True)
+
+    def get(self, kind: str, key: str) -> Optional[tuple[Any, bool]]:
+        """Return (value, is_stale) for a cached entry, or None on a miss."""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT value, stored_at FROM entries WHERE kind = ? AND key = ?",
+                    (kind, key),
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            age = time.time() - row[1]
+            if age > self.max_stale:
+                self._stats["misses"] += 1
+                return None
+
+            is_stale = age > self.ttls.get(kind, 0)
+            self._stats["stale_hits" if is_stale else "hits"] += 1
+
+        return json.loads(row[0]), is_stale
+
+    def set(self, kind: str, key: str, value: Any) -> None:
+        """Store a JSON-serializable value."""
+        payload = json.dumps(value)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (kind, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                    (kind, key, payload, time.time()),
+                )
+                self._conn.commit()
+                self._stats["writes"] += 1
+            except sqlite3.Error:
+                pass
+
+    def invalidate(self, kind: Optional[str] = None) -> None:
+        """Drop cached entries, optionally only those of one kind."""
+        with self._lock:
+            try:
+                if kind:
+                    self._conn.execute("DELETE FROM entries WHERE kind = ?", (kind,))
+                else:
+                    self._conn.execute("DELETE FROM entries")
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> dict[str, int]:
+        """Get a snapshot of the hit/miss counters."""
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
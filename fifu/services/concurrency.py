@@ -0,0 +1,228 @@
+"""Adaptive control of how many downloads run at once."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Optional, Union
+
+# Lower goes first; tuples order by their first item, then the next
+Priority = Union[float, tuple[float, ...]]
+
+
+def is_throttled(error: Optional[str]) -> bool:
+    """Whether a download error means YouTube is rate limiting us."""
+    if not error:
+        return False
+    return "429" in error or "Too Many Requests" in error
+
+
+class PrioritySlots:
+    """Semaphore whose waiters are served by priority and whose size can change.
+
+    Waiters get slots in order of ``priority``, lowest first, then of arrival.
+    """
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._active = 0
+        self._condition = asyncio.Condition()
+        # (priority, arrival) of tasks waiting for a slot
+        self._waiting: list[tuple[Priority, int]] = []
+        self._arrivals = itertools.count()
+
+    @property
+    def limit(self) -> int:
+        """Number of slots."""
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        """Number of slots currently held."""
+        return self._active
+
+    async def acquire(self, priority: Priority = 0.0) -> None:
+        """Wait for a free slot."""
+        entry = (priority, next(self._arrivals))
+        heapq.heappush(self._waiting, entry)
+        try:
+            # Let tasks queued in the same batch line up before a slot is handed out
+            await asyncio.sleep(0)
+            async with self._condition:
+                await self._condition.wait_for(
+                    lambda: self._active < self._limit and self._waiting[0] == entry
+                )
+                heapq.heappop(self._waiting)
+                self._active += 1
+                # The next waiter may fit in a slot that is still free
+                self._condition.notify_all()
+        except asyncio.CancelledError:
+            if entry in self._waiting:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                async with self._condition:
+                    self._condition.notify_all()
+            raise
+
+    async def release(self) -> None:
+        """Give a slot back."""
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    async def set_limit(self, limit: int) -> None:
+        """Change the number of slots; slots held above it are kept until released."""
+        async with self._condition:
+            self._limit = limit
+            self._condition.notify_all()
+
+
+class ConcurrencyController:
+    """AIMD controller for the number of simultaneous downloads.
+
+    Downloads take a slot with ``acquire``/``release``. Every ``interval``
+    seconds ``adjust`` looks at the bytes downloaded and the downloads that
+    ended during the window:
+
+    * a 429 or an error rate above ``max_error_rate`` multiplies the target
+      by ``backoff`` (multiplicative decrease);
+    * when every slot is busy, the target grows by one (additive increase);
+    * once the new download has had a window to get going, the extra slot
+      is given back if it did not raise aggregate throughput by at least
+      ``min_gain``, and the target then holds for ``hold_windows`` windows.
+
+    Byte counters are fed from yt-dlp progress hooks on worker threads.
+    Free slots go to the waiting download with the lowest priority.
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        initial: int = 3,
+        interval: float = 5.0,
+        backoff: float = 0.5,
+        max_error_rate: float = 0.3,
+        min_gain: float = 0.1,
+        hold_windows: int = 6,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.interval = interval
+        self.backoff = backoff
+        self.max_error_rate = max_error_rate
+        self.min_gain = min_gain
+        self.hold_windows = hold_windows
+        self._slots = PrioritySlots(min(max(initial, self.min_limit), self.max_limit))
+
+        # Window counters, written from download threads
+        self._lock = threading.Lock()
+        self._window_bytes = 0
+        self._window_finished = 0
+        self._window_errors = 0
+        self._window_throttled = 0
+        self._window_start = time.monotonic()
+        self._last_bytes: dict[str, int] = {}
+
+        self._throughput = 0.0
+        # Throughput measured just before the last additive increase
+        self._before_increase: Optional[float] = None
+        # Windows to let a new download get going before judging it
+        self._settle = 0
+        # Windows left before probing a higher target again
+        self._hold = 0
+        # Windows whose failures are ignored after a decrease, since they
+        # come from downloads started under the previous target
+        self._cooldown = 0
+
+    @property
+    def limit(self) -> int:
+        """Target number of simultaneous downloads."""
+        return self._slots.limit
+
+    @property
+    def active(self) -> int:
+        """Number of downloads currently holding a slot."""
+        return self._slots.active
+
+    @property
+    def throughput(self) -> float:
+        """Aggregate bytes per second over the last window."""
+        return self._throughput
+
+    async def acquire(self, priority: Priority = 0.0) -> None:
+        """Wait for a free slot under the current target."""
+        await self._slots.acquire(priority)
+
+    async def release(self) -> None:
+        """Give a slot back."""
+        await self._slots.release()
+
+    def record_progress(self, key: str, downloaded_bytes: int) -> None:
+        """Feed the cumulative byte count of one download's current file."""
+        with self._lock:
+            last = self._last_bytes.get(key, 0)
+            # A smaller count means the next file (e.g. the audio stream) started
+            delta = downloaded_bytes - last if downloaded_bytes >= last else downloaded_bytes
+            self._last_bytes[key] = downloaded_bytes
+            self._window_bytes += delta
+
+    def record_result(self, key: str, success: bool, error: Optional[str] = None) -> None:
+        """Record how a download ended."""
+        with self._lock:
+            self._last_bytes.pop(key, None)
+            self._window_finished += 1
+            if not success:
+                self._window_errors += 1
+                if is_throttled(error):
+                    self._window_throttled += 1
+
+    async def adjust(self) -> int:
+        """Close the current window, update the target and return it."""
+        with self._lock:
+            elapsed = max(time.monotonic() - self._window_start, 1e-6)
+            throughput = self._window_bytes / elapsed
+            finished = self._window_finished
+            errors = self._window_errors
+            throttled = self._window_throttled
+            self._window_bytes = 0
+            self._window_finished = 0
+            self._window_errors = 0
+            self._window_throttled = 0
+            self._window_start = time.monotonic()
+        self._throughput = throughput
+
+        limit = self._slots.limit
+        cooling = self._cooldown > 0
+        self._cooldown = max(0, self._cooldown - 1)
+        if throttled or (finished and errors / finished > self.max_error_rate):
+            if not cooling:
+                limit = max(self.min_limit, int(limit * self.backoff))
+                self._before_increase = None
+                self._hold = self.hold_windows
+                self._cooldown = 1
+        elif self._before_increase is not None:
+            if self._settle:
+                self._settle -= 1
+            else:
+                if throughput < self._before_increase * (1 + self.min_gain):
+                    # The extra download didn't buy throughput; the link is full
+                    limit = max(self.min_limit, limit - 1)
+                    self._hold = self.hold_windows
+                self._before_increase = None
+        elif self._hold:
+            self._hold -= 1
+        elif self._slots.active >= limit and limit < self.max_limit and throughput > 0:
+            self._before_increase = throughput
+            self._settle = 1
+            limit += 1
+
+        if limit != self._slots.limit:
+            logging.info(
+                f"Download concurrency {self._slots.limit} -> {limit} "
+                f"({throughput / 1024 / 1024:.1f} MiB/s, {errors}/{finished} failed, {throttled} throttled)"
+            )
+        await self._slots.set_limit(limit)
+        return limit
@@ -1,8 +1,23 @@
 """Service for managing persistent configuration and history."""
 
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
+
+# Number of synced video IDs remembered per channel for incremental syncs
+MAX_KNOWN_VIDEO_IDS = 200
+
+
+def _merge_channel_sync(saved: dict[str, list[str]], ours: dict[str, list[str]]) -> dict[str, list[str]]:
+    """Combine synced video IDs saved by another process with this one's, ours first."""
+    merged = dict(saved)
+    for channel_id, video_ids in ours.items():
+        known = set(video_ids)
+        theirs = [v for v in saved.get(channel_id, []) if v not in known]
+        merged[channel_id] = (video_ids + theirs)[:MAX_KNOWN_VIDEO_IDS]
+    return merged
 
 
 class ConfigService:
@@ -13,30 +28,53 @@ class ConfigService:
         self.config_file = self.config_dir / "data.json"
         self._data = {
             "history": [],
-            "favorites": []
+            "favorites": [],
+            "channel_sync": {},
+            "settings": {}
         }
+        # Downloads remember synced IDs from a worker thread while the UI saves its own keys
+        self._lock = threading.RLock()
         self._load()
 
+    def _read(self) -> dict[str, Any]:
+        """Read the data file as it is on disk, or nothing if it's missing or unreadable."""
+        try:
+            with open(self.config_file, "r") as f:
+                data = json.load(f)
+        except Exception:
+            return {}
+        return data if isinstance(data, dict) else {}
+
     def _load(self) -> None:
         """Load data from JSON file."""
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, "r") as f:
-                    loaded_data = json.load(f)
-                    # Merge with defaults to handle schema changes
-                    self._data.update(loaded_data)
-            except Exception:
-                pass
-
-    def _save(self) -> None:
-        """Save data to JSON file."""
-        self.config_dir.mkdir(parents=True, exist_ok=True)
+        # Merge with defaults to handle schema changes
+        self._data.update(self._read())
+
+    def _save(self, key: str) -> None:
+        """Save one top-level key, keeping what other fifu processes saved meanwhile.
+
+        The TUI and a daemon or server can run at once: each writes only the
+        key it changed, synced video IDs are merged with the file's, and the
+        file is replaced atomically so it's never read half-written.
+        """
         try:
-            with open(self.config_file, "w") as f:
-                json.dump(self._data, f, indent=4)
+            with self._lock:
+                self.config_dir.mkdir(parents=True, exist_ok=True)
+                data = self._read()
+                if key == "channel_sync":
+                    self._data[key] = _merge_channel_sync(data.get(key) or {}, self._data[key])
+                data[key] = self._data[key]
+                temp_file = self.config_file.with_name(f".{self.config_file.name}.{os.getpid()}.tmp")
+                with open(temp_file, "w") as f:
+                    json.dump(data, f, indent=4)
+                os.replace(temp_file, self.config_file)
         except Exception:
             pass
 
+    def reload(self) -> None:
+        """Re-read the favorites, e.g. after another fifu process changed them."""
+        self._data["favorites"] = self._read().get("favorites", [])
+
     def get_history(self) -> list[str]:
         """Get search history."""
         return self._data.get("history", [])
@@ -53,12 +91,12 @@ class ConfigService:
             
         history.insert(0, query)
         self._data["history"] = history[:10]
-        self._save()
+        self._save("history")
 
     def clear_history(self) -> None:
         """Clear search history."""
         self._data["history"] = []
-        self._save()
+        self._save("history")
 
     def get_favorites(self) -> list[dict[str, Any]]:
         """Get favorite channels."""
@@ -83,5 +121,30 @@ class ConfigService:
             result = True
             
         self._data["favorites"] = favorites
-        self._save()
+        self._save("favorites")
         return result
+
+    def get_setting(self, key: str, default: Any = None) -> Any:
+        """Get a user setting, falling back to a default."""
+        return self._data.get("settings", {}).get(key, default)
+
+    def set_setting(self, key: str, value: Any) -> None:
+        """Persist a user setting."""
+        self._data.setdefault("settings", {})[key] = value
+        self._save("settings")
+
+    def get_known_video_ids(self, channel_id: str) -> set[str]:
+        """Get IDs of videos already synced from a channel."""
+        return set(self._data.get("channel_sync", {}).get(channel_id, []))
+
+    def remember_video_ids(self, channel_id: str, video_ids: Iterable[str]) -> None:
+        """Record video IDs as synced for a channel, keeping the most recent ones."""
+        new_ids = [v for v in video_ids if v]
+        if not new_ids:
+            return
+
+        with self._lock:
+            sync = self._data.setdefault("channel_sync", {})
+            known = [v for v in sync.get(channel_id, []) if v not in set(new_ids)]
+            sync[channel_id] = (new_ids + known)[:MAX_KNOWN_VIDEO_IDS]
+            self._save("channel_sync")
@@ -2,11 +2,39 @@
 
 import re
 import shutil
-from dataclasses import dataclass, field
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
 import logging
 from pathlib import Path
-from typing import Callable, Optional
-import yt_dlp
+from typing import Callable, Iterator, Optional
+
+from fifu.services.archive import ARCHIVE_FILENAME, DownloadArchive
+from fifu.services.pool import YoutubeDLPool
+from fifu.services.ratelimit import TokenBucket
+from fifu.services.throttle import StreamThrottled, ThrottleWatchdog
+from fifu.services.ydl import FifuYoutubeDL
+
+
+# Times a throttled stream is restarted before it is left to finish as it is
+MAX_THROTTLE_RESTARTS = 3
+
+# Pre-resolved stream URLs this close to expiry are resolved again before use
+STREAM_EXPIRY_MARGIN = 30 * 60
+
+# Seconds between "downloading" updates passed to a progress callback
+PROGRESS_INTERVAL = 0.1
+
+# yt-dlp format selections of the quality presets offered by the options
+# screen and the headless commands
+QUALITY_FORMATS = {
+    "best": "best",
+    "1080p": "bestvideo[height<=1080]+bestaudio/best[height<=1080]",
+    "720p": "bestvideo[height<=720]+bestaudio/best[height<=720]",
+    "480p": "bestvideo[height<=480]+bestaudio/best[height<=480]",
+    "audio": "bestaudio/best",
+}
 
 
 class DownloadStopped(Exception):
@@ -33,21 +61,55 @@ class DownloadResult:
     video_title: str
     file_path: Optional[Path] = None
     error: Optional[str] = None
+    # Set when post-processing was deferred; call it to finish the download
+    post_process: Optional[Callable[[], "DownloadResult"]] = None
+    # Set with post_process; call it instead to give up the download unfinished
+    discard: Optional[Callable[[], None]] = None
 
 
-@dataclass
-class DownloadQueue:
-    """Queue of videos to download."""
-    channel_name: str
-    videos: list = field(default_factory=list)
-    current_index: int = 0
-    downloaded_ids: set = field(default_factory=set)
+def stream_expiry(info: dict) -> Optional[float]:
+    """Get the earliest ``expire`` timestamp among the stream URLs of an info dict."""
+    expiries = []
+    for fmt in info.get("requested_formats") or info.get("formats") or [info]:
+        match = re.search(r"[?&/]expire[=/](\d+)", fmt.get("url") or "")
+        if match:
+            expiries.append(float(match.group(1)))
+    return min(expiries) if expiries else None
+
+
+class YDLogger:
+    """Route yt-dlp output to the downloader log."""
+
+    def debug(self, msg):
+        if msg.startswith('[debug] '): pass
+        else: self.info(msg)
+    def info(self, msg): logging.info(f"yt-dlp: {msg}")
+    def warning(self, msg): logging.warning(f"yt-dlp: {msg}")
+    def error(self, msg): logging.error(f"yt-dlp: {msg}")
 
 
 class DownloadService:
     """Service for downloading YouTube videos."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool: Optional[YoutubeDLPool] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        segmented_connections: int = 4,
+    ):
+        self._pool = pool or YoutubeDLPool()
+        # Resolving formats ahead of a download never waits for a download's instance
+        self._metadata_pool = YoutubeDLPool()
+        # Parallel Range requests per file when aria2c isn't installed
+        self.segmented_connections = segmented_connections
+        # One bandwidth budget shared by every download of this service
+        self.rate_limiter = rate_limiter or TokenBucket()
+        # Compares the speeds of this service's downloads to spot throttled streams
+        self.throttle_watchdog = ThrottleWatchdog()
+        self._stats = {"extractions": 0, "downloads": 0, "restarts": 0}
+        self._stats_lock = threading.Lock()
+        self._active = 0
+        self._archives: dict[Path, DownloadArchive] = {}
         self.log_file = Path.home() / ".config" / "fifu" / "downloader.log"
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
         logging.basicConfig(
@@ -57,6 +119,26 @@ class DownloadService:
         )
         logging.info("Downloader service initialized")
 
+    def shutdown(self) -> None:
+        """Close pooled yt-dlp instances."""
+        logging.info(f"Download stats: {self.stats()}")
+        logging.info(f"Download YoutubeDL pool stats: {self.pool_stats()}")
+        self._pool.close()
+        self._metadata_pool.close()
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            self._stats[counter] += 1
+
+    def stats(self) -> dict[str, int]:
+        """Get counters of metadata extractions, completed downloads and stream restarts."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def pool_stats(self) -> dict[str, int]:
+        """Get counters of created and reused download YoutubeDL instances."""
+        return self._pool.stats()
+
     def get_download_path(self, channel_name: str, playlist_name: Optional[str] = None) -> Path:
         """Get the download path for a channel, optionally into a playlist subfolder."""
         safe_channel = self._sanitize_filename(channel_name)
@@ -79,6 +161,77 @@ class DownloadService:
         """Check if aria2c is available on the system."""
         return shutil.which("aria2c") is not None
 
+    def _aria2_rate_args(self) -> list[str]:
+        """Split the bandwidth budget evenly between aria2c downloads as they start."""
+        rate = self.rate_limiter.rate
+        if not rate:
+            return []
+        with self._stats_lock:
+            # Count the download about to start
+            active = self._active + 1
+        return [f"--max-overall-download-limit={max(1, int(rate / active) // 1024)}K"]
+
+    @contextmanager
+    def _active_download(self) -> Iterator[None]:
+        with self._stats_lock:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._stats_lock:
+                self._active -= 1
+
+    def _format_opts(self, quality: str, subtitles: bool) -> dict:
+        """Build the yt-dlp options that decide which formats are downloaded."""
+        if quality == "best":
+            # Prefer mp4 for compatibility but allow other high quality formats for merging
+            format_str = "bestvideo+bestaudio/best"
+        elif quality == "bestaudio/best":
+            format_str = "bestaudio/best"
+        else:
+            format_str = quality
+
+        opts = {
+            "format": format_str,
+            "quiet": True,
+            "no_warnings": True,
+            "merge_output_format": "mp4",
+            "logger": YDLogger(),
+        }
+        if subtitles:
+            opts.update({
+                "writesubtitles": True,
+                "subtitleslangs": ["en.*", ".*"],
+                "embedsubs": True,
+            })
+        return opts
+
+    def resolve_video(self, video_url: str, quality: str = "best", subtitles: bool = False) -> Optional[dict]:
+        """Resolve a video's formats and stream URLs ahead of downloading it.
+
+        The returned info dict can be passed to ``download_video`` as
+        ``resolved`` so the download starts transferring right away.
+        """
+        try:
+            with self._metadata_pool.acquire(self._format_opts(quality, subtitles)) as ydl:
+                info = ydl.extract_info(video_url, download=False)
+                self._count("extractions")
+                return ydl.sanitize_info(info, remove_private_keys=True) if info else None
+        except Exception as e:
+            logging.warning(f"Resolving ahead failed for {video_url}: {str(e)}")
+            return None
+
+    def _wait_for_bandwidth(self, delay: float, stop_check: Optional[Callable[[], bool]]) -> None:
+        """Sleep off a rate limit delay in short steps so stops stay responsive."""
+        deadline = time.monotonic() + delay
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if stop_check and stop_check():
+                raise DownloadStopped("User requested stop")
+            time.sleep(min(remaining, 0.25))
+
 
     def download_video(
         self,
@@ -88,18 +241,59 @@ class DownloadService:
         quality: str = "best",
         video_id: str = "unknown",
         subtitles: bool = False,
-        stop_check: Optional[Callable[[], bool]] = None
+        stop_check: Optional[Callable[[], bool]] = None,
+        defer_post_processing: bool = False,
+        resolved: Optional[dict] = None,
     ) -> DownloadResult:
-        """Download a single video with specified quality."""
+        """Download a single video with specified quality.
+
+        ``resolved`` is an info dict from ``resolve_video``; unless its stream
+        URLs are close to expiry, the download uses it instead of extracting.
+
+        With ``defer_post_processing`` the merge/embed step is not run; the
+        result's ``post_process`` callable runs it and returns the final result.
+
+        A stream that stays far slower than the other downloads is restarted
+        from a freshly extracted URL, resuming from the bytes already on disk.
+        """
         expected_total_bytes = 0
+        current_title = "Unknown"
+        extractions = 0
+        use_aria2 = self.is_aria2_available()
+        last_downloaded = 0
+        last_reported = 0.0
+        watch_key = None
+        restarts = 0
 
         def progress_hook(d: dict):
+            nonlocal last_downloaded, last_reported
             if stop_check and stop_check():
                 raise DownloadStopped("User requested stop")
+
+            if not use_aria2 and d.get("status") == "downloading":
+                # Sleeping here holds back yt-dlp's next read from the socket
+                downloaded = d.get("downloaded_bytes") or 0
+                received = downloaded - last_downloaded if downloaded >= last_downloaded else downloaded
+                last_downloaded = downloaded
+                delay = self.rate_limiter.reserve(received)
+                if delay:
+                    self._wait_for_bandwidth(delay, stop_check)
+                # A bandwidth limit slows every download on purpose, so then only compare with peers
+                if restarts < MAX_THROTTLE_RESTARTS and self.throttle_watchdog.update(
+                    watch_key, downloaded, use_min_speed=self.rate_limiter.rate is None
+                ):
+                    raise StreamThrottled(f"Stream throttled at {downloaded} bytes")
+            elif d.get("status") == "finished":
+                last_downloaded = 0
                 
             if progress_callback:
                 status = d.get("status", "unknown")
                 if status == "downloading":
+                    # yt-dlp calls hooks for every block read; callers only need a few updates a second
+                    now = time.monotonic()
+                    if now - last_reported < PROGRESS_INTERVAL:
+                        return
+                    last_reported = now
                     downloaded = d.get("downloaded_bytes", 0)
                     total = d.get("total_bytes") or d.get("total_bytes_estimate") or expected_total_bytes
                     
@@ -127,37 +321,16 @@ class DownloadService:
 
         output_template = str(output_dir / "%(title)s.%(ext)s")
         
-        if quality == "best":
-            # Prefer mp4 for compatibility but allow other high quality formats for merging
-            format_str = "bestvideo+bestaudio/best"
-        elif quality == "bestaudio/best":
-            format_str = "bestaudio/best"
-        else:
-            format_str = quality
-        
-        class YDLogger:
-            def debug(self, msg):
-                if msg.startswith('[debug] '): pass
-                else: self.info(msg)
-            def info(self, msg): logging.info(f"yt-dlp: {msg}")
-            def warning(self, msg): logging.warning(f"yt-dlp: {msg}")
-            def error(self, msg): logging.error(f"yt-dlp: {msg}")
-
         ydl_opts = {
-            "format": format_str,
+            **self._format_opts(quality, subtitles),
             "outtmpl": output_template,
             "paths": {"temp": str(output_dir / ".fifu_tmp")},
-            "progress_hooks": [progress_hook],
-            "quiet": True,
-            "no_warnings": True,
-            "merge_output_format": "mp4",
-            "logger": YDLogger(),
             "noprogress": False,
             "nooverwrites": True,
             "ffmpeg_location": "/usr/bin/ffmpeg",
         }
 
-        if self.is_aria2_available():
+        if use_aria2:
             ydl_opts.update({
                 "external_downloader": "aria2c",
                 "external_downloader_args": {
@@ -170,21 +343,30 @@ class DownloadService:
                         "--show-console-readout=false",
                         "--console-log-level=error",
                         "--download-result=hide",
+                        *self._aria2_rate_args(),
                     ]
                 }
             })
             logging.info("Using aria2c for multi-threaded downloading")
-
-        if subtitles:
-            ydl_opts.update({
-                "writesubtitles": True,
-                "subtitleslangs": ["en.*", ".*"],
-                "embedsubs": True,
-            })
+        elif self.segmented_connections > 1:
+            ydl_opts["segmented_connections"] = self.segmented_connections
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with self._active_download(), self.throttle_watchdog.watching() as watch_key, ExitStack() as stack:
+            ydl = stack.enter_context(self._pool.acquire(ydl_opts, progress_hook))
+            ydl.deferred_post_processing = [] if defer_post_processing else None
+            # Pooled instances must go back with deferral switched off
+            stack.callback(setattr, ydl, "deferred_post_processing", None)
             try:
-                info = ydl.extract_info(video_url, download=False)
+                expiry = stream_expiry(resolved) if resolved else None
+                if expiry and expiry - time.time() < STREAM_EXPIRY_MARGIN:
+                    logging.info(f"Resolved stream URLs expire soon, resolving again: {video_url}")
+                    resolved = None
+                if resolved:
+                    info = resolved
+                else:
+                    info = ydl.extract_info(video_url, download=False)
+                    self._count("extractions")
+                extractions += 1
                 if info:
                     current_title = info.get("title", "Unknown")
                     expected_total_bytes = info.get("filesize") or info.get("filesize_approx") or 0
@@ -197,22 +379,43 @@ class DownloadService:
                         ))
                     
                     logging.info(f"Starting download: {current_title} ({video_url})")
-                    ydl.download([video_url])
-                    logging.info(f"Download finished: {current_title}")
-                    
-                    filename = ydl.prepare_filename(info)
-                    file_path = Path(filename)
-                    
-                    if not file_path.exists():
-                        mp4_path = file_path.with_suffix('.mp4')
-                        if mp4_path.exists():
-                            file_path = mp4_path
-                    
-                    return DownloadResult(
-                        success=True,
-                        video_title=current_title,
-                        file_path=file_path if file_path.exists() else None,
-                    )
+                    # Download from the info we already resolved; ydl.download() would
+                    # run the whole extraction and format resolution a second time
+                    while True:
+                        try:
+                            ydl.process_ie_result(info, download=True)
+                            break
+                        except StreamThrottled as e:
+                            restarts += 1
+                            self._count("restarts")
+                            logging.warning(
+                                f"{e}, restarting with a fresh URL "
+                                f"(restart {restarts} of {MAX_THROTTLE_RESTARTS}): {current_title}"
+                            )
+                        # Stream URLs are tied to the server that throttled them; the
+                        # partial file is kept, so the new stream resumes from its end
+                        info = ydl.extract_info(video_url, download=False)
+                        extractions += 1
+                        self._count("extractions")
+                        self.throttle_watchdog.reset(watch_key)
+                    if restarts:
+                        logging.info(f"Stream restarts for {current_title}: {restarts}")
+
+                    if ydl.deferred_post_processing:
+                        # The instance stays checked out until its postprocessors have run
+                        held = stack.pop_all()
+                        title = current_title
+                        logging.info(f"Download fetched, post-processing deferred: {title}")
+                        return DownloadResult(
+                            success=True,
+                            video_title=title,
+                            post_process=lambda: self._run_post_processing(
+                                held, ydl, info, title, video_url, extractions
+                            ),
+                            # Checks the instance back in; yt-dlp reuses the fetched formats next time
+                            discard=held.close,
+                        )
+                    return self._completed(ydl, info, current_title, extractions)
             except DownloadStopped as e:
                 logging.info(f"Download aborted for {video_url}: {str(e)}")
                 return DownloadResult(
@@ -234,8 +437,62 @@ class DownloadService:
             error="Unknown error",
         )
 
+    def _run_post_processing(
+        self,
+        held: ExitStack,
+        ydl: FifuYoutubeDL,
+        info: dict,
+        title: str,
+        video_url: str,
+        extractions: int,
+    ) -> DownloadResult:
+        """Run a download's deferred merge/embed/move step and return its final result."""
+        with held:
+            try:
+                ydl.run_deferred_post_processing()
+            except Exception as e:
+                logging.error(f"Post-processing failed for {video_url}: {str(e)}")
+                return DownloadResult(success=False, video_title=title, error=str(e))
+            return self._completed(ydl, info, title, extractions)
+
+    def _completed(self, ydl: FifuYoutubeDL, info: dict, title: str, extractions: int) -> DownloadResult:
+        """Build the result of a finished download."""
+        self._count("downloads")
+        stats = self.stats()
+        logging.info(
+            f"Download finished: {title} "
+            f"[extractions: {extractions} for this video, "
+            f"{stats['extractions']} total for {stats['downloads']} downloads]"
+        )
+        
+        filename = ydl.prepare_filename(info)
+        file_path = Path(filename)
+        
+        if not file_path.exists():
+            mp4_path = file_path.with_suffix('.mp4')
+            if mp4_path.exists():
+                file_path = mp4_path
+        
+        return DownloadResult(
+            success=True,
+            video_title=title,
+            file_path=file_path if file_path.exists() else None,
+        )
+
+    def get_archive(self, output_dir: Path) -> DownloadArchive:
+        """Get the archive of downloaded video IDs for an output folder."""
+        with self._stats_lock:
+            archive = self._archives.get(output_dir)
+            if archive is None:
+                archive = DownloadArchive(output_dir / ARCHIVE_FILENAME)
+                self._archives[output_dir] = archive
+            return archive
+
     def get_downloaded_videos(self, output_dir: Path) -> set[str]:
-        """Get set of already downloaded video titles (without extension)."""
+        """Get set of already downloaded video titles (without extension).
+
+        Only used to migrate folders downloaded before they had an archive.
+        """
         downloaded = set()
         if output_dir.exists():
             for file in output_dir.iterdir():
@@ -0,0 +1,427 @@
+"""Durable download queue journaled to SQLite so queues survive restarts."""
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from fifu.services.youtube import VideoInfo
+
+
+class ItemState:
+    """Lifecycle states of a queued video."""
+    PENDING = "pending"
+    RESOLVING = "resolving"
+    DOWNLOADING = "downloading"
+    POST_PROCESSING = "post-processing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+# States an item can be left in by a crash or quit while it was being worked on
+IN_FLIGHT_STATES = (ItemState.RESOLVING, ItemState.DOWNLOADING, ItemState.POST_PROCESSING)
+UNFINISHED_STATES = (ItemState.PENDING, *IN_FLIGHT_STATES)
+
+
+def _placeholders(values: tuple) -> str:
+    return ", ".join("?" for _ in values)
+
+
+@dataclass
+class QueueJob:
+    """A journaled download queue for one channel or playlist."""
+    id: int
+    channel_id: str
+    channel_name: str
+    channel_url: str
+    output_dir: Path
+    quality: str
+    subtitles: bool
+    playlist_url: Optional[str] = None
+    max_videos: int = 9999
+    new_only: bool = False
+    listing_complete: bool = False
+    unfinished: int = 0
+    created_at: float = 0.0
+    # Worked on by `fifu worker` processes instead of the fifu that created it
+    shared: bool = False
+
+
+class DownloadQueue:
+    """Journaled queue of videos to download with per-item states.
+
+    Every state change is committed to a SQLite database, so after a quit or
+    crash the unfinished items of a job can be resumed. yt-dlp keeps its
+    ``.part`` files in the output folder's temp directory, so resumed
+    downloads continue where they stopped.
+
+    fifu's own journal is in WAL mode. A ``path`` given explicitly is meant
+    to be shared by workers, possibly on other machines over a network
+    drive, where WAL's shared memory doesn't work, so it uses a rollback
+    journal and relies on the filesystem's locks instead.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.shared = path is not None
+        self.path = path or Path.home() / ".config" / "fifu" / "queue.db"
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the journal, falling back to memory if fifu's own file is unusable.
+
+        A shared queue that can't be opened raises instead: workers quietly
+        using a private in-memory queue would never see each other's items.
+        """
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+            conn.execute(f"PRAGMA journal_mode={'DELETE' if self.shared else 'WAL'}")
+        except (sqlite3.Error, OSError):
+            if self.shared:
+                raise
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel_id TEXT NOT NULL,
+                channel_name TEXT NOT NULL,
+                channel_url TEXT NOT NULL,
+                output_dir TEXT NOT NULL,
+                quality TEXT NOT NULL,
+                subtitles INTEGER NOT NULL DEFAULT 0,
+                playlist_url TEXT,
+                max_videos INTEGER NOT NULL DEFAULT 9999,
+                new_only INTEGER NOT NULL DEFAULT 0,
+                listing_complete INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                shared INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                job_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                video_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                duration INTEGER,
+                upload_date TEXT,
+                state TEXT NOT NULL DEFAULT 'pending',
+                error TEXT,
+                updated_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                PRIMARY KEY (job_id, video_id)
+            );
+            CREATE INDEX IF NOT EXISTS items_state ON items (job_id, state);
+            """
+        )
+        # Journals written before shared jobs existed
+        for table, column, definition in (
+            ("jobs", "shared", "INTEGER NOT NULL DEFAULT 0"),
+            ("items", "lease_owner", "TEXT"),
+            ("items", "lease_expires", "REAL"),
+        ):
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        conn.commit()
+        return conn
+
+    def _execute(self, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        with self._lock:
+            cursor = self._conn.execute(sql, tuple(params))
+            self._conn.commit()
+            return cursor
+
+    def create_job(
+        self,
+        channel_id: str,
+        channel_name: str,
+        channel_url: str,
+        output_dir: Path,
+        quality: str,
+        subtitles: bool = False,
+        playlist_url: Optional[str] = None,
+        max_videos: int = 9999,
+        new_only: bool = False,
+        shared: bool = False,
+    ) -> int:
+        """Start journaling a new queue and return its job ID.
+
+        Items of a ``shared`` job are left to ``fifu worker`` processes,
+        which take them with ``claim_items``.
+        """
+        cursor = self._execute(
+            """
+            INSERT INTO jobs (channel_id, channel_name, channel_url, output_dir, quality,
+                              subtitles, playlist_url, max_videos, new_only, created_at, shared)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (channel_id, channel_name, channel_url, str(output_dir), quality,
+             int(subtitles), playlist_url, max_videos, int(new_only), time.time(), int(shared)),
+        )
+        return cursor.lastrowid
+
+    def add_items(self, job_id: int, videos: list[VideoInfo]) -> None:
+        """Append videos to a job as pending, ignoring ones already journaled."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(MAX(position), -1) FROM items WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            start = row[0] + 1
+            self._conn.executemany(
+                """
+                INSERT OR IGNORE INTO items (job_id, position, video_id, title, url,
+                                             duration, upload_date, state, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (job_id, start + i, v.id, v.title, v.url, v.duration, v.upload_date,
+                     ItemState.PENDING, now)
+                    for i, v in enumerate(videos)
+                ],
+            )
+            self._conn.commit()
+
+    def set_state(
+        self,
+        job_id: int,
+        video_id: str,
+        state: str,
+        error: Optional[str] = None,
+        owner: Optional[str] = None,
+    ) -> bool:
+        """Record a state transition for one item, returning whether it was recorded.
+
+        With an ``owner`` the item is only updated while it is leased to that
+        worker, so a worker whose lease ran out and whose item another worker
+        claimed can't overwrite the new owner's progress.
+        """
+        sql = "UPDATE items SET state = ?, error = ?, updated_at = ? WHERE job_id = ? AND video_id = ?"
+        params = [state, error, time.time(), job_id, video_id]
+        if owner is not None:
+            sql += " AND lease_owner = ?"
+            params.append(owner)
+        return self._execute(sql, params).rowcount > 0
+
+    def mark_listing_complete(self, job_id: int) -> None:
+        """Record that every video of the source has been journaled."""
+        self._execute("UPDATE jobs SET listing_complete = 1 WHERE id = ?", (job_id,))
+
+    def unfinished_jobs(self) -> list[QueueJob]:
+        """Get jobs with items left to download, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT j.id, j.channel_id, j.channel_name, j.channel_url, j.output_dir, j.quality,
+                       j.subtitles, j.playlist_url, j.max_videos, j.new_only,
+                       j.listing_complete, j.created_at,
+                       (SELECT COUNT(*) FROM items i
+                        WHERE i.job_id = j.id AND i.state IN ({_placeholders(UNFINISHED_STATES)})) AS unfinished
+                FROM jobs j
+                WHERE j.shared = 0
+                ORDER BY j.created_at DESC
+                """,
+                UNFINISHED_STATES,
+            ).fetchall()
+
+        return [
+            QueueJob(
+                id=row[0],
+                channel_id=row[1],
+                channel_name=row[2],
+                channel_url=row[3],
+                output_dir=Path(row[4]),
+                quality=row[5],
+                subtitles=bool(row[6]),
+                playlist_url=row[7],
+                max_videos=row[8],
+                new_only=bool(row[9]),
+                listing_complete=bool(row[10]),
+                created_at=row[11],
+                unfinished=row[12],
+            )
+            for row in rows
+            if row[12] or not row[10]
+        ]
+
+    def resume_items(self, job_id: int) -> list[VideoInfo]:
+        """Reset interrupted items to pending and return every unfinished video in queue order."""
+        with self._lock:
+            self._conn.execute(
+                f"""
+                UPDATE items SET state = ?, updated_at = ?
+                WHERE job_id = ? AND state IN ({_placeholders(IN_FLIGHT_STATES)})
+                """,
+                (ItemState.PENDING, time.time(), job_id, *IN_FLIGHT_STATES),
+            )
+            self._conn.commit()
+            rows = self._conn.execute(
+                f"""
+                SELECT video_id, title, url, duration, upload_date FROM items
+                WHERE job_id = ? AND state IN ({_placeholders(UNFINISHED_STATES)})
+                ORDER BY position
+                """,
+                (job_id, *UNFINISHED_STATES),
+            ).fetchall()
+
+        return [
+            VideoInfo(id=row[0], title=row[1], url=row[2], duration=row[3], upload_date=row[4])
+            for row in rows
+        ]
+
+    def finish_job(self, job_id: int) -> None:
+        """Forget a job once its queue has been worked through."""
+        with self._lock:
+            self._conn.execute("DELETE FROM items WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._conn.commit()
+
+    def get_job(self, job_id: int) -> Optional[QueueJob]:
+        """Get a job by ID, or None once it has been finished."""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT id, channel_id, channel_name, channel_url, output_dir, quality, subtitles,
+                       playlist_url, max_videos, new_only, listing_complete, created_at, shared
+                FROM jobs WHERE id = ?
+                """,
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return QueueJob(
+            id=row[0],
+            channel_id=row[1],
+            channel_name=row[2],
+            channel_url=row[3],
+            output_dir=Path(row[4]),
+            quality=row[5],
+            subtitles=bool(row[6]),
+            playlist_url=row[7],
+            max_videos=row[8],
+            new_only=bool(row[9]),
+            listing_complete=bool(row[10]),
+            created_at=row[11],
+            shared=bool(row[12]),
+        )
+
+    def claim_items(self, owner: str, limit: int = 1, lease: float = 60.0) -> list[tuple[int, VideoInfo]]:
+        """Take up to ``limit`` items of shared jobs for a worker, oldest job first.
+
+        Claimed items are leased to ``owner`` for ``lease`` seconds, which the
+        worker extends with ``renew_leases`` while it works on them. Items
+        whose lease ran out, e.g. because their worker died, are claimed
+        again by the other workers. The claim runs in an immediate
+        transaction, so workers sharing the database never take the same
+        item; if the database stays locked, ``sqlite3.Error`` is raised.
+        Returns (job ID, video) pairs.
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                rows = self._conn.execute(
+                    f"""
+                    SELECT i.job_id, i.video_id, i.title, i.url, i.duration, i.upload_date
+                    FROM items i JOIN jobs j ON j.id = i.job_id
+                    WHERE j.shared = 1
+                      AND (i.state = ?
+                           OR (i.state IN ({_placeholders(IN_FLIGHT_STATES)})
+                               AND i.lease_expires < ? AND i.lease_owner IS NOT ?))
+                    ORDER BY j.created_at, i.position
+                    LIMIT ?
+                    """,
+                    (ItemState.PENDING, *IN_FLIGHT_STATES, now, owner, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    """
+                    UPDATE items SET state = ?, lease_owner = ?, lease_expires = ?, updated_at = ?
+                    WHERE job_id = ? AND video_id = ?
+                    """,
+                    [(ItemState.RESOLVING, owner, now + lease, now, row[0], row[1]) for row in rows],
+                )
+                self._conn.commit()
+            except sqlite3.Error:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                raise
+
+        return [
+            (row[0], VideoInfo(id=row[1], title=row[2], url=row[3], duration=row[4], upload_date=row[5]))
+            for row in rows
+        ]
+
+    def renew_leases(self, owner: str, lease: float = 60.0) -> set[tuple[int, str]]:
+        """Extend the leases of the items a worker is still working on.
+
+        Returns the (job ID, video ID) of every item still leased to ``owner``;
+        any other item the worker is working on has been claimed by another.
+        """
+        with self._lock:
+            self._conn.execute(
+                f"""
+                UPDATE items SET lease_expires = ?
+                WHERE lease_owner = ? AND state IN ({_placeholders(IN_FLIGHT_STATES)})
+                """,
+                (time.time() + lease, owner, *IN_FLIGHT_STATES),
+            )
+            self._conn.commit()
+            rows = self._conn.execute(
+                f"""
+                SELECT job_id, video_id FROM items
+                WHERE lease_owner = ? AND state IN ({_placeholders(IN_FLIGHT_STATES)})
+                """,
+                (owner, *IN_FLIGHT_STATES),
+            ).fetchall()
+        return {(row[0], row[1]) for row in rows}
+
+    def shared_unfinished(self) -> int:
+        """Count items of shared jobs that are pending or being worked on."""
+        with self._lock:
+            row = self._conn.execute(
+                f"""
+                SELECT COUNT(*) FROM items i JOIN jobs j ON j.id = i.job_id
+                WHERE j.shared = 1 AND i.state IN ({_placeholders(UNFINISHED_STATES)})
+                """,
+                UNFINISHED_STATES,
+            ).fetchone()
+        return row[0]
+
+    def shared_unfinished_ids(self, output_dir: Path) -> set[str]:
+        """IDs of videos waiting or being worked on in shared jobs saving to a folder."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT i.video_id FROM items i JOIN jobs j ON j.id = i.job_id
+                WHERE j.shared = 1 AND j.output_dir = ? AND i.state IN ({_placeholders(UNFINISHED_STATES)})
+                """,
+                (str(output_dir), *UNFINISHED_STATES),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def finish_job_if_done(self, job_id: int) -> bool:
+        """Forget a fully listed job once none of its items is left, returning whether it was."""
+        with self._lock:
+            row = self._conn.execute(
+                f"""
+                SELECT j.listing_complete,
+                       (SELECT COUNT(*) FROM items i
+                        WHERE i.job_id = j.id AND i.state IN ({_placeholders(UNFINISHED_STATES)}))
+                FROM jobs j WHERE j.id = ?
+                """,
+                (*UNFINISHED_STATES, job_id),
+            ).fetchone()
+        if not row or not row[0] or row[1]:
+            return False
+        self.finish_job(job_id)
+        return True
+
+    def close(self) -> None:
+        """Close the journal database."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,60 @@
+"""Bounded producer/consumer pipeline for queued downloads."""
+
+import asyncio
+import itertools
+import logging
+import math
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class BoundedPipeline(Generic[T]):
+    """Feed items to a fixed set of consumer tasks through a bounded queue.
+
+    ``put`` waits while ``maxsize`` items are queued, which holds back the
+    producer (e.g. a streaming listing) instead of buffering the whole
+    queue, so memory and task count stay proportional to ``workers`` and
+    ``maxsize``. Consumers take the queued item with the lowest
+    ``priority`` first, then in the order items were put. An exception from
+    ``consume`` is logged and the consumer moves on to the next item.
+    """
+
+    def __init__(
+        self,
+        consume: Callable[[T], Awaitable[None]],
+        workers: int,
+        maxsize: int,
+        priority: Optional[Callable[[T], float]] = None,
+    ):
+        self._consume = consume
+        self._priority = priority or (lambda item: 0.0)
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=max(1, maxsize))
+        self._order = itertools.count()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(max(1, workers))]
+
+    async def put(self, item: T) -> None:
+        """Queue an item, waiting while the queue is full."""
+        await self._queue.put((self._priority(item), next(self._order), item))
+
+    async def join(self) -> None:
+        """Let the consumers finish every queued item, then stop them."""
+        for _ in self._workers:
+            # Sorts after every item, including those of unknown priority
+            await self._queue.put((math.inf, math.inf, None))
+        await asyncio.gather(*self._workers)
+
+    def cancel(self) -> None:
+        """Stop the consumers, abandoning queued items."""
+        for worker in self._workers:
+            worker.cancel()
+
+    async def _work(self) -> None:
+        while True:
+            _, _, item = await self._queue.get()
+            if item is None:
+                return
+            try:
+                await self._consume(item)
+            except Exception as e:
+                logging.error(f"Download pipeline item failed: {str(e)}")
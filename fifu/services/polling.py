@@ -0,0 +1,57 @@
+"""Schedule for checking many channels for new uploads."""
+
+import random
+import time
+from typing import Iterable, Optional
+
+
+class PollSchedule:
+    """When each channel is next checked for new uploads.
+
+    Channels added together get their first checks spread over one
+    ``interval`` instead of all at once, and checks are always at least
+    ``min_gap`` seconds apart. After a check the next one is due an interval
+    later, give or take ``jitter`` of it, so channels don't drift back into
+    lockstep.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        jitter: float = 0.1,
+        min_gap: float = 1.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.interval = interval
+        self.jitter = jitter
+        self.min_gap = min_gap
+        self._rng = rng or random.Random()
+        self._due: dict[str, float] = {}
+        self._last_poll = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def sync(self, keys: Iterable[str], now: Optional[float] = None) -> None:
+        """Track exactly these channels; new ones are spread over the next interval."""
+        now = time.monotonic() if now is None else now
+        keys = list(dict.fromkeys(keys))
+        for key in set(self._due) - set(keys):
+            del self._due[key]
+        new = [key for key in keys if key not in self._due]
+        for i, key in enumerate(new):
+            self._due[key] = now + self.interval * (i + self._rng.random()) / len(new)
+
+    def next_due(self) -> Optional[tuple[str, float]]:
+        """Get the channel checked next and when, or None with nothing to check."""
+        if not self._due:
+            return None
+        key = min(self._due, key=self._due.__getitem__)
+        return key, max(self._due[key], self._last_poll + self.min_gap)
+
+    def polled(self, key: str, now: Optional[float] = None) -> None:
+        """Record a check of a channel and schedule its next one."""
+        now = time.monotonic() if now is None else now
+        self._last_poll = now
+        if key in self._due:
+            self._due[key] = now + self.interval * (1 + self._rng.uniform(-self.jitter, self.jitter))
@@ -0,0 +1,131 @@
+"""Pool of reusable, pre-warmed yt-dlp instances."""
+
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from fifu.services.ydl import FifuYoutubeDL
+
+
+# Extractors instantiated up front when pre-warming an instance
+PREWARM_EXTRACTORS = ("Youtube", "YoutubeTab", "YoutubeSearch")
+
+
+def profile_key(opts: dict[str, Any]) -> str:
+    """Build a key identifying an option profile.
+
+    Objects such as loggers are keyed by type, so equivalent profiles built on
+    separate calls share pooled instances.
+    """
+    return json.dumps(opts, sort_keys=True, default=lambda o: type(o).__name__)
+
+
+class _PooledInstance:
+    """A YoutubeDL instance whose progress hook can be swapped per checkout."""
+
+    def __init__(self, opts: dict[str, Any]):
+        self.progress_hook: Optional[Callable[[dict], None]] = None
+        self.ydl = FifuYoutubeDL({**opts, "progress_hooks": [self._dispatch_progress]})
+
+    def _dispatch_progress(self, d: dict) -> None:
+        if self.progress_hook:
+            self.progress_hook(d)
+
+
+class YoutubeDLPool:
+    """Thread-safe pool of YoutubeDL instances keyed by option profile.
+
+    Each instance is checked out by exactly one caller at a time. When every
+    instance of a profile is busy a new one is created, and surplus instances
+    beyond ``max_idle_per_profile`` are closed when they are returned.
+    """
+
+    def __init__(self, max_idle_per_profile: int = 4):
+        self.max_idle_per_profile = max_idle_per_profile
+        self._idle: dict[str, list[_PooledInstance]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"created": 0, "reused": 0}
+
+    @contextmanager
+    def acquire(
+        self,
+        opts: dict[str, Any],
+        progress_hook: Optional[Callable[[dict], None]] = None,
+    ) -> Iterator[FifuYoutubeDL]:
+        """Check out an instance for ``opts`` for the duration of the block."""
+        key = profile_key(opts)
+        instance = self._checkout(key, opts)
+        instance.progress_hook = progress_hook
+        try:
+            yield instance.ydl
+        except GeneratorExit:
+            # A lazy listing was abandoned between pages; the instance is idle
+            instance.progress_hook = None
+            self._checkin(key, instance)
+            raise
+        except BaseException:
+            # Don't hand out an instance that was interrupted mid-operation
+            instance.progress_hook = None
+            self._discard(instance)
+            raise
+        instance.progress_hook = None
+        self._checkin(key, instance)
+
+    def prewarm(self, opts: dict[str, Any], count: int = 1) -> None:
+        """Create idle instances for a profile ahead of time."""
+        key = profile_key(opts)
+        for _ in range(count):
+            with self._lock:
+                if self._closed or len(self._idle.get(key, [])) >= self.max_idle_per_profile:
+                    return
+            instance = self._create(opts)
+            for ie_key in PREWARM_EXTRACTORS:
+                try:
+                    instance.ydl.get_info_extractor(ie_key)
+                except Exception:
+                    pass
+            self._checkin(key, instance)
+
+    def stats(self) -> dict[str, int]:
+        """Get counters of created and reused instances."""
+        with self._lock:
+            return {**self._stats, "idle": sum(len(v) for v in self._idle.values())}
+
+    def close(self) -> None:
+        """Close all idle instances; instances still checked out close on return."""
+        with self._lock:
+            self._closed = True
+            idle = [i for instances in self._idle.values() for i in instances]
+            self._idle.clear()
+        for instance in idle:
+            self._discard(instance)
+
+    def _create(self, opts: dict[str, Any]) -> _PooledInstance:
+        instance = _PooledInstance(opts)
+        with self._lock:
+            self._stats["created"] += 1
+        return instance
+
+    def _checkout(self, key: str, opts: dict[str, Any]) -> _PooledInstance:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._stats["reused"] += 1
+                return idle.pop()
+        return self._create(opts)
+
+    def _checkin(self, key: str, instance: _PooledInstance) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if not self._closed and len(idle) < self.max_idle_per_profile:
+                idle.append(instance)
+                return
+        self._discard(instance)
+
+    def _discard(self, instance: _PooledInstance) -> None:
+        try:
+            instance.ydl.close()
+        except Exception:
+            pass
@@ -0,0 +1,35 @@
+"""Coalesced delivery of download progress from worker threads."""
+
+import threading
+from typing import Optional
+
+from fifu.services.downloader import DownloadProgress
+
+
+class ProgressBus:
+    """Latest progress of each download, handed over to the UI in batches.
+
+    Worker threads ``publish`` without ever waiting on the UI; an update
+    replaces the one still pending for the same download. The UI ``drain``s
+    the bus on a timer and gets at most one update per download.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[str, DownloadProgress] = {}
+
+    def publish(self, key: str, progress: DownloadProgress) -> None:
+        """Record a download's latest progress."""
+        with self._lock:
+            self._pending[key] = progress
+
+    def drain(self) -> list[DownloadProgress]:
+        """Take the pending updates of all downloads."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return list(pending.values())
+
+    def pop(self, key: str) -> Optional[DownloadProgress]:
+        """Take the pending update of one download, e.g. once it has finished."""
+        with self._lock:
+            return self._pending.pop(key, None)
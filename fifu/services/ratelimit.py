@@ -0,0 +1,49 @@
+"""Bandwidth limit shared by every active download."""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Token bucket of bytes refilled at ``rate`` bytes/s up to ``burst``.
+
+    Callers report the bytes they just received with ``reserve`` and sleep for
+    the returned delay, which keeps the combined rate of all callers at or
+    below the limit. A rate of ``None`` means unlimited.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        self._lock = threading.Lock()
+        self._rate: Optional[float] = None
+        self._burst = 0.0
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self.set_rate(rate, burst)
+
+    @property
+    def rate(self) -> Optional[float]:
+        """Current limit in bytes/s, or None when unlimited."""
+        return self._rate
+
+    def set_rate(self, rate: Optional[float], burst: Optional[float] = None) -> None:
+        """Change the limit; takes effect for bytes reported from now on."""
+        with self._lock:
+            self._rate = rate if rate and rate > 0 else None
+            # Default to one second worth of traffic
+            self._burst = float(burst or self._rate or 0)
+            self._tokens = min(self._tokens, self._burst)
+            self._updated = time.monotonic()
+
+    def reserve(self, amount: int) -> float:
+        """Take ``amount`` bytes from the bucket and return seconds to wait."""
+        with self._lock:
+            if self._rate is None:
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
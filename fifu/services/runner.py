@@ -0,0 +1,611 @@
+"""Download queue runner shared by the TUI and the headless commands."""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Protocol
+
+from fifu.services.archive import DownloadArchive
+from fifu.services.concurrency import ConcurrencyController, PrioritySlots
+from fifu.services.config import ConfigService
+from fifu.services.downloader import DownloadProgress, DownloadResult, DownloadService
+from fifu.services.journal import DownloadQueue, ItemState, QueueJob
+from fifu.services.pipeline import BoundedPipeline
+from fifu.services.progress import ProgressBus
+from fifu.services.scheduling import LISTING, RoundRobin, download_priority
+from fifu.services.youtube import ChannelInfo, VideoInfo, YouTubeService
+
+
+async def iterate_in_executor(iterator, executor=None):
+    """Consume a blocking iterator on a worker thread, yielding items asynchronously."""
+    loop = asyncio.get_event_loop()
+    sentinel = object()
+    # A generator can't be closed while a step runs on the worker thread, so
+    # closing takes its turn after the step in flight
+    turn = threading.Lock()
+
+    def step():
+        with turn:
+            return next(iterator, sentinel)
+
+    def close():
+        with turn:
+            try:
+                iterator.close()
+            except Exception:
+                pass
+
+    try:
+        while True:
+            item = await loop.run_in_executor(executor, step)
+            if item is sentinel:
+                break
+            yield item
+    finally:
+        if hasattr(iterator, "close"):
+            try:
+                loop.run_in_executor(executor, close)
+            except RuntimeError:
+                # The loop or executor is shutting down
+                pass
+
+
+def create_download_service(
+    config_service: ConfigService,
+    max_downloads: int,
+    process_workers: Optional[bool] = None,
+    limit_rate: Optional[float] = None,
+) -> DownloadService:
+    """Create the download service the settings ask for, threads or worker processes."""
+    if process_workers is None:
+        process_workers = config_service.get_setting("process_workers", False)
+    segmented_connections = config_service.get_setting("segmented_connections", 4)
+    if process_workers:
+        # Keep yt-dlp's CPU work off the UI process
+        from fifu.services.workers import ProcessDownloadService
+        service = ProcessDownloadService(
+            max_workers=max_downloads,
+            segmented_connections=segmented_connections,
+            resolve_workers=config_service.get_setting("lookahead_videos", 3),
+        )
+    else:
+        service = DownloadService(segmented_connections=segmented_connections)
+    service.rate_limiter.set_rate(limit_rate)
+    return service
+
+
+@dataclass
+class DownloadRequest:
+    """What one download queue fetches, as chosen on the options screen."""
+    channel: ChannelInfo
+    max_videos: int = 9999
+    quality: str = "best"
+    playlist_url: Optional[str] = None
+    subtitles: bool = False
+    selected_videos: Optional[list[VideoInfo]] = None
+    new_only: bool = False
+    order: str = LISTING
+    resume_job: Optional[QueueJob] = None
+
+
+class SyncWatermark:
+    """Which video IDs of a channel listing are safe to remember as synced.
+
+    A new-uploads check stops at the first remembered ID, so an ID is only
+    remembered once the listing is complete and every older video in it is
+    done. A failed or interrupted older upload then keeps the videos above it
+    unremembered, and the next check lists it again.
+    """
+
+    def __init__(self):
+        # Listed IDs not yet remembered, newest first as YouTube lists them
+        self._listed: list[str] = []
+        self._finished: set[str] = set()
+        self._complete = False
+
+    def listed(self, video_id: str) -> None:
+        """Record the next video of the listing."""
+        self._listed.append(video_id)
+
+    def finished(self, video_id: str) -> list[str]:
+        """Record a video as downloaded or skipped; returns the IDs now safe to remember."""
+        self._finished.add(video_id)
+        return self._release()
+
+    def complete(self) -> list[str]:
+        """Record that the listing reached its end; returns the IDs now safe to remember."""
+        self._complete = True
+        return self._release()
+
+    def _release(self) -> list[str]:
+        if not self._complete:
+            return []
+        released = []
+        while self._listed and self._listed[-1] in self._finished:
+            released.append(self._listed.pop())
+        # Newest first, the order the remembered IDs are kept in
+        return released[::-1]
+
+
+class DownloadReporter(Protocol):
+    """Where a running queue reports to; the TUI's download screen is one."""
+
+    progress_bus: ProgressBus
+
+    def log_message(self, message: str, level: str = "info") -> None: ...
+
+    def set_queue_total(self, total: int) -> None: ...
+
+    def set_concurrency(self, active: int, target: int, throughput: float) -> None: ...
+
+    def update_progress(self, progress: DownloadProgress) -> None: ...
+
+    def update_total_progress(self, current: int, total: int) -> None: ...
+
+    def on_download_complete(self, video_title: str) -> None: ...
+
+    def on_download_error(self, video_title: str, error: str) -> None: ...
+
+    def on_queue_complete(self) -> None: ...
+
+
+@dataclass
+class JobContext:
+    """Where and how the videos of one journaled job are downloaded."""
+    job_id: int
+    output_dir: Path
+    quality: str
+    subtitles: bool
+    archive: DownloadArchive
+    reporter: DownloadReporter
+    controller: ConcurrencyController
+    # Videos being resolved, or resolved and waiting for a download slot
+    lookahead: PrioritySlots
+    order: str = LISTING
+    fair_share: Optional[RoundRobin] = None
+    # Awaited with each video ID once it is downloaded and journaled
+    on_finished: Optional[Callable[[str], Awaitable[None]]] = None
+    # Worker whose lease the videos of a shared job are journaled under
+    lease_owner: Optional[str] = None
+    # Whether a video's lease ran out before it could be renewed; its download stops
+    lease_lost: Optional[Callable[[str], bool]] = None
+
+
+class DownloadRunner:
+    """Run download queues: listing, archive checks, journaling and concurrency.
+
+    Nothing here knows about the UI. Progress goes to a ``DownloadReporter``,
+    which is the download screen in the TUI and a line printer when headless,
+    so both get the same queueing, archive and concurrency behaviour.
+    """
+
+    def __init__(
+        self,
+        config_service: ConfigService,
+        youtube_service: YouTubeService,
+        download_service: DownloadService,
+        download_queue: DownloadQueue,
+        max_downloads: Optional[int] = None,
+    ):
+        self.config_service = config_service
+        self.youtube_service = youtube_service
+        self.download_service = download_service
+        self.download_queue = download_queue
+        self.max_downloads = max(
+            1, max_downloads or config_service.get_setting("max_concurrent_downloads", 8)
+        )
+        # In process mode these threads only relay progress from the workers
+        self._download_executor = ThreadPoolExecutor(max_workers=self.max_downloads)
+        # ffmpeg merges are CPU-bound, so they get a pool sized to the machine
+        self._post_process_workers = max(
+            1, config_service.get_setting("max_concurrent_post_processing", os.cpu_count() or 2)
+        )
+        self._post_process_executor = ThreadPoolExecutor(max_workers=self._post_process_workers)
+        # Videos resolved ahead of the download slots, so a slot starts on bytes right away
+        self._lookahead = max(1, config_service.get_setting("lookahead_videos", 3))
+        self._metadata_executor = ThreadPoolExecutor(max_workers=self._lookahead)
+        # Journal writes commit synchronously and may wait on a locked database,
+        # so they run on one thread of their own, in order, off the event loop
+        self._journal_executor = ThreadPoolExecutor(max_workers=1)
+        self.stopped = False
+
+    def stop(self) -> None:
+        """Stop queueing and ask running downloads to stop."""
+        self.stopped = True
+
+    def shutdown(self) -> None:
+        """Shutdown the executors and cancel pending futures."""
+        self._download_executor.shutdown(wait=False, cancel_futures=True)
+        self._post_process_executor.shutdown(wait=False, cancel_futures=True)
+        self._metadata_executor.shutdown(wait=False, cancel_futures=True)
+        self._journal_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _journal(self, write: Callable[..., Any], *args: Any) -> Any:
+        """Run a journal call on the journal thread."""
+        return await asyncio.get_event_loop().run_in_executor(self._journal_executor, write, *args)
+
+    def new_controller(self) -> ConcurrencyController:
+        """Create a controller for the configured concurrency, capped at ``max_downloads``."""
+        return ConcurrencyController(
+            min_limit=min(self.max_downloads, self.config_service.get_setting("min_concurrent_downloads", 1)),
+            max_limit=self.max_downloads,
+            initial=self.config_service.get_setting("concurrent_downloads", 3),
+        )
+
+    async def monitor(
+        self, controller: ConcurrencyController, on_adjust: Optional[Callable[[], None]] = None
+    ) -> None:
+        """Let a controller adapt its limit to measured throughput until cancelled."""
+        while True:
+            await asyncio.sleep(controller.interval)
+            await controller.adjust()
+            if on_adjust:
+                on_adjust()
+
+    def new_lookahead(self) -> PrioritySlots:
+        """Create the slots of videos resolved ahead of the download slots."""
+        return PrioritySlots(self._lookahead)
+
+    def pipeline_workers(self, controller: ConcurrencyController) -> int:
+        """Tasks needed to keep every download slot, the lookahead and the merge stage busy."""
+        return controller.max_limit + self._lookahead + self._post_process_workers
+
+    def _show_concurrency(self, context: JobContext) -> None:
+        controller = context.controller
+        context.reporter.set_concurrency(controller.active, controller.limit, controller.throughput)
+
+    def _lease_lost(self, context: JobContext, video_id: str) -> bool:
+        return context.lease_lost is not None and context.lease_lost(video_id)
+
+    async def _set_state(
+        self, context: JobContext, video_id: str, state: str, error: Optional[str] = None
+    ) -> bool:
+        """Journal an item's state; False once another worker has taken over its lease."""
+        recorded = await self._journal(
+            self.download_queue.set_state, context.job_id, video_id, state, error, context.lease_owner
+        )
+        return recorded or context.lease_owner is None
+
+    async def _resolve_ahead(self, context: JobContext, video: VideoInfo, video_url: str) -> Optional[dict]:
+        """Resolve a video's formats and stream URLs on the metadata pool."""
+        if self.stopped:
+            return None
+        resolved = await asyncio.get_event_loop().run_in_executor(
+            self._metadata_executor,
+            lambda: self.download_service.resolve_video(video_url, context.quality, context.subtitles),
+        )
+        if resolved:
+            # Shortest/largest first can now go by the real size
+            video.filesize = resolved.get("filesize") or resolved.get("filesize_approx")
+        return resolved
+
+    async def _fetch_video(self, context: JobContext, video: VideoInfo) -> Optional[DownloadResult]:
+        """Download a video's bytes while holding a network slot."""
+        video_url = video.url or f"https://www.youtube.com/watch?v={video.id}"
+        controller = context.controller
+        fair_share = context.fair_share
+        # Only the next few videos in line are resolved, as stream URLs expire
+        await context.lookahead.acquire(download_priority(video, context.order))
+        try:
+            if fair_share:
+                # Rounds are handed out as videos leave the lookahead line,
+                # i.e. in this queue's download order
+                round_ = fair_share.next_round(context.job_id)
+            resolved = await self._resolve_ahead(context, video, video_url)
+            if fair_share:
+                await controller.acquire((round_, download_priority(video, context.order)))
+                fair_share.served(round_)
+            else:
+                await controller.acquire(download_priority(video, context.order))
+        finally:
+            await context.lookahead.release()
+        self._show_concurrency(context)
+        try:
+            if self.stopped:
+                if context.lease_owner is not None:
+                    # Claimed by this worker: straight back to the queue, without waiting for the lease
+                    await self._set_state(context, video.id, ItemState.PENDING)
+                return None
+            if self._lease_lost(context, video.id):
+                return None
+
+            if not await self._set_state(context, video.id, ItemState.RESOLVING):
+                return None
+            journaled = {"state": ItemState.RESOLVING, "lost": False}
+
+            def progress_callback(progress: DownloadProgress):
+                # Journal only state transitions, not every progress tick
+                state = {
+                    "downloading": ItemState.DOWNLOADING,
+                    "finishing": ItemState.POST_PROCESSING,
+                }.get(progress.status)
+                if state and state != journaled["state"]:
+                    journaled["state"] = state
+                    recorded = self.download_queue.set_state(
+                        context.job_id, video.id, state, owner=context.lease_owner
+                    )
+                    if not recorded and context.lease_owner is not None:
+                        journaled["lost"] = True
+                if progress.status == "downloading":
+                    controller.record_progress(video.id, progress.downloaded_bytes)
+                # This runs in a side thread from yt-dlp; the reporter picks it up on its next refresh
+                context.reporter.progress_bus.publish(video.id, progress)
+
+            def stop_check():
+                return self.stopped or journaled["lost"] or self._lease_lost(context, video.id)
+
+            result = await asyncio.get_event_loop().run_in_executor(
+                self._download_executor,
+                lambda: self.download_service.download_video(
+                    video_url,
+                    context.output_dir,
+                    progress_callback,
+                    context.quality,
+                    subtitles=context.subtitles,
+                    stop_check=stop_check,
+                    defer_post_processing=True,
+                    resolved=resolved,
+                )
+            )
+            if not stop_check():
+                controller.record_result(video.id, result.success, result.error)
+            return result
+        finally:
+            await controller.release()
+            self._show_concurrency(context)
+
+    async def download_task(self, context: JobContext, video: VideoInfo) -> None:
+        """Download one journaled video of a job: resolve, fetch, merge and record it."""
+        reporter = context.reporter
+        result = await self._fetch_video(context, video)
+        # Show the last update before the result, so it can't resurrect a finished widget
+        progress = reporter.progress_bus.pop(video.id)
+        if progress:
+            reporter.update_progress(progress)
+        if result is None:
+            return
+
+        if result.post_process and (self.stopped or self._lease_lost(context, video.id)):
+            # Hand the held instance back; the fetched formats are merged on resume
+            result.discard()
+        elif result.post_process:
+            # Merging runs on its own CPU-sized pool so the network slot is already free
+            await self._set_state(context, video.id, ItemState.POST_PROCESSING)
+            merge = self._post_process_executor.submit(result.post_process)
+            try:
+                result = await asyncio.wrap_future(merge)
+            except asyncio.CancelledError:
+                # Quit before the merge started, so it never closes what it holds
+                if merge.cancel():
+                    result.discard()
+                raise
+
+        if result.success and not result.post_process:
+            context.archive.add(video.id)
+            if not await self._set_state(context, video.id, ItemState.DONE):
+                reporter.log_message(f"🔒 Downloaded after another worker took it over: {result.video_title}")
+                return
+            if context.on_finished:
+                await context.on_finished(video.id)
+            reporter.on_download_complete(result.video_title)
+        elif self._lease_lost(context, video.id):
+            # Left for whichever worker claims it once the lease has expired
+            reporter.log_message(f"🔒 Lease lost, leaving to other workers: {result.video_title}")
+        elif not self.stopped:
+            if await self._set_state(context, video.id, ItemState.FAILED, result.error):
+                reporter.on_download_error(
+                    result.video_title,
+                    result.error or "Unknown error"
+                )
+            else:
+                reporter.log_message(f"🔒 Lease lost, leaving to other workers: {result.video_title}")
+        else:
+            # Left for the next run; yt-dlp continues from the .part file
+            await self._set_state(context, video.id, ItemState.PENDING)
+            reporter.log_message(f"⏹ Stopped: {result.video_title}")
+
+    async def run(
+        self,
+        request: DownloadRequest,
+        reporter: DownloadReporter,
+        controller: Optional[ConcurrencyController] = None,
+        fair_share: Optional[RoundRobin] = None,
+    ) -> None:
+        """Download a channel, playlist or selection, reporting as it goes.
+
+        Queues run at the same time can share one ``controller`` so their
+        downloads compete for the same slots; its owner then runs ``monitor``.
+        With a shared ``fair_share`` the slots go round-robin between them.
+        """
+        channel = request.channel
+        reporter.log_message(f"📡 Fetching videos from {channel.name}...")
+
+        playlist_url = request.playlist_url
+        selected_videos = request.selected_videos
+        resume_job = request.resume_job
+        quality = request.quality
+        subtitles = request.subtitles
+        queue = self.download_queue
+
+        # Only full channel listings advance the incremental sync position
+        sync_channel = not selected_videos and not playlist_url
+        watermark = SyncWatermark()
+
+        async def remember_synced(video_ids: list[str]) -> None:
+            if sync_channel and video_ids:
+                # Each call rewrites the config file, so it runs off the event loop
+                await self._journal(self.config_service.remember_video_ids, channel.id, video_ids)
+
+        async def video_batches():
+            """Yield videos to queue in batches as the listing arrives."""
+            if resume_job:
+                pending = await self._journal(queue.resume_items, resume_job.id)
+                reporter.log_message(f"⏯ Resuming {len(pending)} unfinished videos...")
+                if pending:
+                    yield pending
+                if resume_job.listing_complete:
+                    return
+                reporter.log_message("📡 Continuing the interrupted listing...")
+
+            if selected_videos:
+                reporter.log_message(f"📋 Processing {len(selected_videos)} selected videos...")
+                yield selected_videos
+            elif playlist_url:
+                reporter.log_message(f"📋 Loading playlist...")
+                async for batch in iterate_in_executor(
+                    self.youtube_service.iter_playlist_videos(playlist_url, request.max_videos)
+                ):
+                    yield batch
+            elif request.new_only:
+                known_ids = self.config_service.get_known_video_ids(channel.id)
+                reporter.log_message(f"🆕 Checking for new uploads ({len(known_ids)} already synced)...")
+                yield await asyncio.get_event_loop().run_in_executor(
+                    None,
+                    lambda: self.youtube_service.get_new_channel_videos(channel.url, known_ids, request.max_videos)
+                )
+            else:
+                async for batch in iterate_in_executor(
+                    self.youtube_service.iter_channel_videos(channel.url, request.max_videos)
+                ):
+                    yield batch
+
+        order = request.order
+        reporter.log_message(f"🎬 Quality: {quality}")
+        if order != LISTING:
+            reporter.log_message(f"↕ Order: {order}")
+        if subtitles:
+            reporter.log_message("💬 Subtitles: Enabled")
+
+        playlist_name = None
+        if playlist_url and not resume_job:
+            metadata = await asyncio.get_event_loop().run_in_executor(
+                None,
+                lambda: self.youtube_service.get_playlist_metadata(playlist_url)
+            )
+            if metadata:
+                playlist_name = metadata[0]
+
+        if resume_job:
+            output_dir = resume_job.output_dir
+            job_id = resume_job.id
+        else:
+            output_dir = self.download_service.get_download_path(channel.name, playlist_name)
+            job_id = await self._journal(lambda: queue.create_job(
+                channel.id, channel.name, channel.url, output_dir, quality,
+                subtitles=subtitles,
+                playlist_url=playlist_url,
+                max_videos=request.max_videos,
+                new_only=request.new_only,
+            ))
+        reporter.log_message(f"📁 Saving to: {output_dir}")
+
+        archive = self.download_service.get_archive(output_dir)
+        # Folders downloaded before the archive existed are matched by title once
+        legacy_titles = set() if archive.exists() else self.download_service.get_downloaded_videos(output_dir)
+
+        # Grow or shrink the number of simultaneous downloads with measured throughput
+        shared_controller = controller is not None
+        controller = controller or self.new_controller()
+        context = JobContext(
+            job_id=job_id,
+            output_dir=output_dir,
+            quality=quality,
+            subtitles=subtitles,
+            archive=archive,
+            reporter=reporter,
+            controller=controller,
+            lookahead=self.new_lookahead(),
+            order=order,
+            fair_share=fair_share,
+            on_finished=lambda video_id: remember_synced(watermark.finished(video_id)),
+        )
+
+        def show_concurrency() -> None:
+            self._show_concurrency(context)
+
+        monitor = None if shared_controller else asyncio.create_task(self.monitor(controller, show_concurrency))
+        # The listing waits while as many videos are queued as there are consumers
+        workers = self.pipeline_workers(controller)
+        pipeline = BoundedPipeline(
+            lambda video: self.download_task(context, video),
+            workers=workers,
+            maxsize=workers,
+            priority=lambda video: download_priority(video, order),
+        )
+        try:
+            # Deduplicate videos by ID and start downloads as soon as each batch is listed
+            seen_ids = set()
+            skipped_ids = []
+            queued_count = 0
+            listing_complete = False
+            async for batch in video_batches():
+                queued = []
+                for video in batch:
+                    if video.id in seen_ids or len(seen_ids) >= request.max_videos:
+                        continue
+                    seen_ids.add(video.id)
+                    watermark.listed(video.id)
+
+                    # Filter out already downloaded
+                    if video.id in archive:
+                        if resume_job:
+                            # Finished just before the interruption was journaled
+                            await self._journal(queue.set_state, job_id, video.id, ItemState.DONE)
+                        skipped_ids.append(video.id)
+                        watermark.finished(video.id)
+                        continue
+                    if video.title in legacy_titles:
+                        archive.add(video.id)
+                        skipped_ids.append(video.id)
+                        watermark.finished(video.id)
+                        continue
+                    queued.append(video)
+
+                # Journal the batch before any of it starts downloading
+                await self._journal(queue.add_items, job_id, queued)
+                queued_count += len(queued)
+                reporter.set_queue_total(queued_count)
+                for video in queued:
+                    await pipeline.put(video)
+
+                if self.stopped:
+                    break
+            else:
+                listing_complete = True
+
+            if listing_complete:
+                await self._journal(queue.mark_listing_complete, job_id)
+                await remember_synced(watermark.complete())
+
+            if not seen_ids:
+                if request.new_only and sync_channel:
+                    reporter.log_message("✨ No new uploads since last sync.", "success")
+                else:
+                    reporter.log_message("No videos found.", "error")
+                await self._journal(queue.finish_job, job_id)
+                reporter.on_queue_complete()
+                return
+
+            reporter.log_message(f"📋 Found {queued_count} videos to download")
+            if skipped_ids:
+                reporter.log_message(f"⏭ Skipping {len(skipped_ids)} already downloaded videos")
+
+            if not queued_count:
+                await self._journal(queue.finish_job, job_id)
+                reporter.on_queue_complete()
+                return
+
+            await pipeline.join()
+
+            # Ensure final state is reflected
+            if not self.stopped:
+                await self._journal(queue.finish_job, job_id)
+                reporter.update_total_progress(queued_count, queued_count)
+                reporter.on_queue_complete()
+        finally:
+            if monitor:
+                monitor.cancel()
+            pipeline.cancel()
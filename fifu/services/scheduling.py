@@ -0,0 +1,78 @@
+"""Order in which queued videos get a download slot."""
+
+import math
+import threading
+from typing import Hashable, Optional
+
+from fifu.services.youtube import VideoInfo
+
+
+LISTING = "listing"
+SHORTEST = "shortest"
+LARGEST = "largest"
+NEWEST = "newest"
+
+ORDERINGS = (LISTING, SHORTEST, LARGEST, NEWEST)
+
+# Rough size of a second of video, so listed durations and resolved file
+# sizes can be compared within one queue
+BYTES_PER_SECOND = 512 * 1024
+
+
+def estimated_size(video: VideoInfo) -> Optional[float]:
+    """Estimate a video's download size from its resolved size or its duration."""
+    if video.filesize:
+        return float(video.filesize)
+    if video.duration:
+        return float(video.duration) * BYTES_PER_SECOND
+    return None
+
+
+def download_priority(video: VideoInfo, ordering: str = LISTING) -> float:
+    """Priority of a video for a download slot; lower goes first.
+
+    Equal priorities keep listing order, and videos whose size or upload
+    date is unknown go after the rest. ``shortest`` finishes the most videos
+    per hour; ``largest`` starts long videos early so they don't hold a
+    slot alone at the end of the queue.
+    """
+    if ordering == SHORTEST:
+        size = estimated_size(video)
+        return size if size is not None else math.inf
+    if ordering == LARGEST:
+        size = estimated_size(video)
+        return -size if size is not None else math.inf
+    if ordering == NEWEST:
+        try:
+            return -float(video.upload_date)
+        except (TypeError, ValueError):
+            return math.inf
+    return 0.0
+
+
+class RoundRobin:
+    """Interleave the videos of several queues that share download slots.
+
+    Each queue's next video waiting for a slot gets the round after that
+    queue's previous one, and slots go to the lowest round first, so they
+    alternate between queues however long each one is. A queue that starts
+    late joins at the round being served instead of jumping ahead of the
+    others until it has caught up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next: dict[Hashable, int] = {}
+        self._serving = 0
+
+    def next_round(self, queue: Hashable) -> int:
+        """Get the round of a queue's next video."""
+        with self._lock:
+            round_ = max(self._next.get(queue, 0), self._serving)
+            self._next[queue] = round_ + 1
+            return round_
+
+    def served(self, round_: int) -> None:
+        """Record that a video of this round got its slot."""
+        with self._lock:
+            self._serving = max(self._serving, round_)
@@ -0,0 +1,264 @@
+"""Parallel HTTP Range downloader used when aria2c is not installed."""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+
+
+# Files are only split when every connection gets at least this many bytes
+MIN_SEGMENT_SIZE = 1024 * 1024
+
+# Largest read from a connection; reads start small and adapt to its speed
+# like HttpFD's, so slow connections still report progress every second or so
+CHUNK_SIZE = 256 * 1024
+INITIAL_READ_SIZE = 16 * 1024
+
+# Seconds between progress reports and between saves of the resume state
+PROGRESS_INTERVAL = 0.1
+STATE_SAVE_INTERVAL = 1.0
+
+
+class SegmentIncomplete(Exception):
+    """A connection closed before its byte range was complete."""
+
+
+class RangeNotSupported(Exception):
+    """The server answered a Range request with the whole file."""
+
+
+@dataclass
+class Segment:
+    """An inclusive byte range of the file and how much of it is on disk."""
+    start: int
+    end: int
+    done: int = 0
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+
+def plan_segments(total: int, count: int) -> list[Segment]:
+    """Split ``total`` bytes into ``count`` contiguous segments."""
+    size = total // count
+    return [
+        Segment(start=i * size, end=total - 1 if i == count - 1 else (i + 1) * size - 1)
+        for i in range(count)
+    ]
+
+
+class SegmentedFD(HttpFD):
+    """Download one file over several concurrent HTTP Range requests.
+
+    The ``.part`` file is preallocated to the full size and each connection
+    writes its own byte range into it. Segment progress is saved next to the
+    ``.part`` file, so an interrupted download resumes every segment where it
+    stopped, and failed requests are retried per segment from their current
+    offset. Small files and servers without Range support fall back to
+    yt-dlp's single-connection HttpFD.
+    """
+
+    def __init__(self, ydl, params, connections: int = 4):
+        super().__init__(ydl, params)
+        self.connections = connections
+
+    def real_download(self, filename, info_dict):
+        url = info_dict["url"]
+        headers = info_dict.get("http_headers") or {}
+        total = self._probe_size(url, headers)
+        count = min(self.connections, (total or 0) // MIN_SEGMENT_SIZE)
+        if count < 2:
+            return super().real_download(filename, info_dict)
+
+        tmpfilename = self.temp_name(filename)
+        state_path = f"{tmpfilename}.segments"
+        segments = self._load_state(state_path, tmpfilename, total)
+        if segments is None:
+            segments = plan_segments(total, count)
+            # Preallocate so every connection can write at its own offset
+            with open(tmpfilename, "wb") as f:
+                f.truncate(total)
+        else:
+            resumed = sum(s.done for s in segments)
+            if resumed:
+                self.report_resuming_byte(resumed)
+        self.report_destination(filename)
+
+        download = _SegmentedDownload(self, info_dict, filename, tmpfilename, state_path, total, segments)
+        download.run()
+
+        try:
+            os.remove(state_path)
+        except OSError:
+            pass
+        self.try_rename(tmpfilename, filename)
+        self._hook_progress({
+            "downloaded_bytes": total,
+            "total_bytes": total,
+            "filename": filename,
+            "status": "finished",
+            "elapsed": time.time() - download.started,
+        }, info_dict)
+        return True
+
+    def _probe_size(self, url: str, headers: dict) -> Optional[int]:
+        """Get the file size if the server honours Range requests."""
+        try:
+            with self.ydl.urlopen(Request(url, headers={**headers, "Range": "bytes=0-0"})) as response:
+                if response.status != 206:
+                    return None
+                match = re.match(r"bytes\s+\d+-\d+/(\d+)", response.headers.get("Content-Range", ""))
+                return int(match.group(1)) if match else None
+        except (HTTPError, TransportError):
+            return None
+
+    def _load_state(self, state_path: str, tmpfilename: str, total: int) -> Optional[list[Segment]]:
+        """Load saved segment progress for a resumable ``.part`` file."""
+        if not self.params.get("continuedl", True) or not os.path.isfile(tmpfilename):
+            return None
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("total") != total or os.path.getsize(tmpfilename) != total:
+                return None
+            return [Segment(*s) for s in state["segments"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+class _SegmentedDownload:
+    """State shared by the connections of one segmented download."""
+
+    def __init__(self, fd: SegmentedFD, info_dict: dict, filename: str, tmpfilename: str,
+                 state_path: str, total: int, segments: list[Segment]):
+        self.fd = fd
+        self.info_dict = info_dict
+        self.filename = filename
+        self.tmpfilename = tmpfilename
+        self.state_path = state_path
+        self.total = total
+        self.segments = segments
+        self.url = info_dict["url"]
+        self.headers = info_dict.get("http_headers") or {}
+        self.started = time.time()
+        self._resumed = sum(s.done for s in segments)
+        self._downloaded = self._resumed
+        # Bytes of each segment flushed from its connection's file buffer; only
+        # these are saved as done, so a resume never skips bytes never written
+        self._flushed = [s.done for s in segments]
+        # Progress hooks run under this lock, so a hook that sleeps (such as
+        # the shared rate limit) holds back every connection
+        self._lock = threading.Lock()
+        self._abort = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._last_report = 0.0
+        self._last_save = time.monotonic()
+
+    def run(self) -> None:
+        """Download all unfinished segments concurrently, raising the first error."""
+        threads = [
+            threading.Thread(target=self._run_segment, args=(index,), daemon=True)
+            for index, segment in enumerate(self.segments)
+            if segment.done < segment.length
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._save_state()
+        if self._error:
+            raise self._error
+        if self._downloaded != self.total:
+            raise SegmentIncomplete(f"Got {self._downloaded} of {self.total} bytes")
+
+    def _run_segment(self, index: int) -> None:
+        try:
+            self._download_segment(index)
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+            self._abort.set()
+        finally:
+            # Closing the file flushed whatever was written
+            self._flushed[index] = self.segments[index].done
+
+    def _download_segment(self, index: int) -> None:
+        segment = self.segments[index]
+        retries = self.fd.params.get("retries", 10)
+        count = 0
+        last_flush = time.monotonic()
+        with open(self.tmpfilename, "r+b") as f:
+            while segment.done < segment.length and not self._abort.is_set():
+                offset = segment.start + segment.done
+                request = Request(self.url, headers={**self.headers, "Range": f"bytes={offset}-{segment.end}"})
+                try:
+                    with self.fd.ydl.urlopen(request) as response:
+                        if response.status != 206:
+                            raise RangeNotSupported(f"Server ignored the Range request (HTTP {response.status})")
+                        f.seek(offset)
+                        read_size = INITIAL_READ_SIZE
+                        while segment.done < segment.length and not self._abort.is_set():
+                            before = time.monotonic()
+                            chunk = response.read(min(read_size, segment.length - segment.done))
+                            if not chunk:
+                                raise SegmentIncomplete(f"Connection closed at byte {segment.start + segment.done}")
+                            read_size = min(CHUNK_SIZE, int(self.fd.best_block_size(time.monotonic() - before, len(chunk))))
+                            f.write(chunk)
+                            self._advance(segment, len(chunk))
+                            if time.monotonic() - last_flush >= STATE_SAVE_INTERVAL:
+                                f.flush()
+                                last_flush = time.monotonic()
+                                self._flushed[index] = segment.done
+                except (HTTPError, TransportError, SegmentIncomplete, OSError) as e:
+                    if isinstance(e, HTTPError) and e.status < 500:
+                        raise
+                    count += 1
+                    if count > retries:
+                        raise
+                    self.fd.report_retry(e, count, retries, fatal=False)
+                    time.sleep(min(count, 5))
+
+    def _advance(self, segment: Segment, received: int) -> None:
+        with self._lock:
+            segment.done += received
+            self._downloaded += received
+            now = time.monotonic()
+            if now - self._last_save >= STATE_SAVE_INTERVAL:
+                self._last_save = now
+                self._save_state()
+            if now - self._last_report < PROGRESS_INTERVAL and self._downloaded < self.total:
+                return
+            self._last_report = now
+
+            elapsed = time.time() - self.started
+            speed = self.fd.calc_speed(self.started, time.time(), self._downloaded - self._resumed)
+            self.fd._hook_progress({
+                "status": "downloading",
+                "downloaded_bytes": self._downloaded,
+                "total_bytes": self.total,
+                "tmpfilename": self.tmpfilename,
+                "filename": self.filename,
+                "eta": self.fd.calc_eta(speed, self.total - self._downloaded) if speed else None,
+                "speed": speed,
+                "elapsed": elapsed,
+            }, self.info_dict)
+
+    def _save_state(self) -> None:
+        try:
+            with open(self.state_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "total": self.total,
+                    "segments": [[s.start, s.end, flushed] for s, flushed in zip(self.segments, self._flushed)],
+                }, f)
+        except OSError:
+            pass
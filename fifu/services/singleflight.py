@@ -0,0 +1,138 @@
+"""Request coalescing for identical in-flight calls."""
+
+import concurrent.futures
+import threading
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+
+# Marks that a consumer has caught up with the fetched items
+_MISSING = object()
+
+
+class SingleFlight:
+    """Run at most one call per key at a time, sharing its result with concurrent callers.
+
+    The first caller for a key executes the function; callers arriving while it
+    is still running block on the same future and receive its result or
+    exception. Once the call finishes the key is forgotten, so later calls run
+    again (caching is left to the caller).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, concurrent.futures.Future] = {}
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Call ``fn`` or join an in-flight call with the same key."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                future = concurrent.futures.Future()
+                self._calls[key] = future
+                self._stats["calls"] += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        """Get counters of executed and coalesced calls."""
+        with self._lock:
+            return dict(self._stats)
+
+
+class SharedIterator:
+    """One lazily consumed iterator read by several concurrent consumers.
+
+    Each consumer sees every item from the first. Whichever consumer runs out
+    of fetched items pulls the next one from the source, so a consumer that
+    stops early never stalls the others. The source is closed once the last
+    consumer leaves.
+    """
+
+    def __init__(self, source: Iterator):
+        self._source = source
+        self._items: list = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._consumers = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        # Only one consumer pulls from the source at a time
+        self._fetch_lock = threading.Lock()
+
+    def join(self) -> bool:
+        """Register a consumer; False once the last one has left and the source is closed."""
+        with self._lock:
+            if self._closed:
+                return False
+            self._consumers += 1
+            return True
+
+    def leave(self) -> bool:
+        """Unregister a consumer; True if it was the last one."""
+        with self._lock:
+            self._consumers -= 1
+            if self._consumers:
+                return False
+            self._closed = True
+            done = self._done
+        if not done:
+            close = getattr(self._source, "close", None)
+            if close:
+                with self._fetch_lock:
+                    close()
+        return True
+
+    def consume(self) -> Iterator:
+        """Iterate over every item, pulling new ones from the source as needed."""
+        index = 0
+        while True:
+            with self._lock:
+                if index < len(self._items):
+                    item = self._items[index]
+                elif self._done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                else:
+                    item = _MISSING
+            if item is not _MISSING:
+                index += 1
+                yield item
+                continue
+
+            with self._fetch_lock:
+                with self._lock:
+                    if index < len(self._items) or self._done:
+                        # Another consumer fetched meanwhile
+                        continue
+                try:
+                    fetched = next(self._source)
+                except StopIteration:
+                    with self._lock:
+                        self._done = True
+                except Exception as e:
+                    with self._lock:
+                        self._done = True
+                        self._error = e
+                else:
+                    with self._lock:
+                        self._items.append(fetched)
+
@@ -0,0 +1,95 @@
+"""Detection of streams the server has throttled."""
+
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+
+class StreamThrottled(Exception):
+    """Raised from a progress hook to restart a throttled stream."""
+
+
+@dataclass
+class _Watch:
+    """Speed measurement of one download."""
+    window_started: float = field(default_factory=time.monotonic)
+    window_bytes: int = 0
+    speed: Optional[float] = None
+    slow_windows: int = 0
+
+
+class ThrottleWatchdog:
+    """Spot downloads that run far slower than the downloads beside them.
+
+    YouTube sometimes throttles a single stream to a few dozen KB/s while
+    other streams on the same link run at full speed. Each download reports
+    its byte count with ``update``; every ``window`` seconds its speed is
+    compared with the median speed of the other downloads being watched, and
+    with ``min_speed`` when there are none. A download that stays below
+    ``ratio`` of that median, or below ``min_speed``, for ``slow_windows``
+    windows in a row is reported as throttled.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.25,
+        min_speed: float = 64 * 1024,
+        window: float = 10.0,
+        slow_windows: int = 2,
+    ):
+        self.ratio = ratio
+        self.min_speed = min_speed
+        self.window = window
+        self.slow_windows = slow_windows
+        self._lock = threading.Lock()
+        self._watches: dict[object, _Watch] = {}
+
+    @contextmanager
+    def watching(self) -> Iterator[object]:
+        """Watch one download for as long as the block runs, yielding its key."""
+        key = object()
+        with self._lock:
+            self._watches[key] = _Watch()
+        try:
+            yield key
+        finally:
+            with self._lock:
+                self._watches.pop(key, None)
+
+    def reset(self, key: object) -> None:
+        """Start measuring a download afresh, e.g. after restarting its stream."""
+        with self._lock:
+            if key in self._watches:
+                self._watches[key] = _Watch()
+
+    def update(self, key: object, downloaded_bytes: int, use_min_speed: bool = True) -> bool:
+        """Record a download's byte count and return True if it is throttled.
+
+        ``use_min_speed=False`` only compares against other downloads, for
+        when a bandwidth limit makes every download slow on purpose.
+        """
+        with self._lock:
+            watch = self._watches.get(key)
+            if watch is None:
+                return False
+            now = time.monotonic()
+            if downloaded_bytes < watch.window_bytes:
+                # yt-dlp moved on to the next format of the video
+                watch.window_started, watch.window_bytes = now, downloaded_bytes
+                return False
+            elapsed = now - watch.window_started
+            if elapsed < self.window:
+                return False
+
+            watch.speed = (downloaded_bytes - watch.window_bytes) / elapsed
+            watch.window_started, watch.window_bytes = now, downloaded_bytes
+            peers = [w.speed for k, w in self._watches.items() if k is not key and w.speed is not None]
+            if peers:
+                slow = watch.speed < self.ratio * statistics.median(peers)
+            else:
+                slow = use_min_speed and watch.speed < self.min_speed
+            watch.slow_windows = watch.slow_windows + 1 if slow else 0
+            return watch.slow_windows >= self.slow_windows
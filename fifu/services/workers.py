@@ -0,0 +1,295 @@
+"""Download workers running in separate processes."""
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from fifu.services.downloader import DownloadProgress, DownloadResult, DownloadService
+
+
+# Service owned by each worker process, so its YoutubeDL pool is reused
+_worker_service: Optional[DownloadService] = None
+
+# Seconds between a worker's checks for a restart asked for by the parent
+RESTART_CHECK_INTERVAL = 0.5
+
+
+class _RelayedWatchdog:
+    """Stand-in for the throttle watchdog inside a worker process.
+
+    A worker runs a single download, so it has no peers to compare speeds
+    with. The parent watches the progress relayed from every worker and sets
+    ``restart`` when this download is throttled; the progress hook then sees
+    the stream as throttled exactly as with an in-process watchdog.
+    """
+
+    def __init__(self, restart):
+        self._restart = restart
+        self._checked = 0.0
+
+    @contextmanager
+    def watching(self) -> Iterator[object]:
+        yield None
+
+    def reset(self, key: object) -> None:
+        self._restart.clear()
+
+    def update(self, key: object, downloaded_bytes: int, use_min_speed: bool = True) -> bool:
+        # Asking the manager is a round trip, and hooks run for every block read
+        now = time.monotonic()
+        if now - self._checked < RESTART_CHECK_INTERVAL:
+            return False
+        self._checked = now
+        return self._restart.is_set()
+
+
+def _init_worker(segmented_connections: int) -> None:
+    global _worker_service
+    _worker_service = DownloadService(segmented_connections=segmented_connections)
+
+
+def _counters() -> tuple[dict[str, int], dict[str, int]]:
+    pool = _worker_service.pool_stats()
+    return _worker_service.stats(), {"created": pool["created"], "reused": pool["reused"]}
+
+
+def _counted_since(before: tuple[dict[str, int], dict[str, int]]) -> tuple[dict[str, int], dict[str, int]]:
+    """What a worker's counters grew by since ``before``, to add to the parent's."""
+    return tuple(
+        {counter: count - earlier[counter] for counter, count in now.items()}
+        for now, earlier in zip(_counters(), before)
+    )
+
+
+def _download_in_worker(
+    video_url: str,
+    output_dir: Path,
+    progress_queue,
+    cancel_event,
+    restart_event,
+    quality: str,
+    video_id: str,
+    subtitles: bool,
+    rate_limit: Optional[float],
+    resolved: Optional[dict],
+) -> tuple[DownloadResult, tuple[dict[str, int], dict[str, int]]]:
+    """Run one download inside a worker process, streaming progress back.
+
+    Returns the result with what it added to the worker's counters.
+    """
+    service = _worker_service
+    # A worker runs one download at a time, so its own bucket is this download's share
+    service.rate_limiter.set_rate(rate_limit)
+    service.throttle_watchdog = _RelayedWatchdog(restart_event)
+    before = _counters()
+    result = service.download_video(
+        video_url,
+        output_dir,
+        progress_queue.put,
+        quality,
+        video_id=video_id,
+        subtitles=subtitles,
+        stop_check=cancel_event.is_set,
+        resolved=resolved,
+    )
+    return result, _counted_since(before)
+
+
+def _resolve_in_worker(
+    video_url: str, quality: str, subtitles: bool
+) -> tuple[Optional[dict], tuple[dict[str, int], dict[str, int]]]:
+    before = _counters()
+    resolved = _worker_service.resolve_video(video_url, quality, subtitles)
+    return resolved, _counted_since(before)
+
+
+class ProcessDownloadService(DownloadService):
+    """DownloadService whose downloads run in a pool of worker processes.
+
+    yt-dlp's extraction, signature deciphering and progress hooks then no
+    longer compete with the UI for the GIL. ``download_video`` keeps its
+    blocking contract: the calling thread relays ``DownloadProgress`` updates
+    from the worker and returns its ``DownloadResult``. The bandwidth budget
+    is split into equal per-download shares as downloads start, and the
+    relayed progress feeds this process's throttle watchdog, which tells a
+    worker to restart its stream when it falls behind the other workers.
+    Each worker's extraction, download and YoutubeDL reuse counts are added
+    to this service's ``stats`` and ``pool_stats``.
+    """
+
+    def __init__(self, max_workers: int = 4, segmented_connections: int = 4, resolve_workers: int = 2):
+        super().__init__(segmented_connections=segmented_connections)
+        self.max_workers = max_workers
+        self.resolve_workers = max(1, resolve_workers)
+        self._context = multiprocessing.get_context("spawn")
+        self._manager = self._context.Manager()
+        self._executor_lock = threading.Lock()
+        self._executor = self._new_executor()
+        # Resolving ahead gets workers of its own, so it never waits behind
+        # downloads that occupy every download worker
+        self._resolve_executor = self._new_executor(self.resolve_workers)
+        # The download workers' YoutubeDL instances; this process's pool stays unused
+        self._worker_pool_stats = {"created": 0, "reused": 0}
+        self._closed = False
+
+    def _new_executor(self, max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=max_workers or self.max_workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self.segmented_connections,),
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        super().shutdown()
+        self._closed = True
+        with self._executor_lock:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._resolve_executor.shutdown(wait=False, cancel_futures=True)
+        try:
+            self._manager.shutdown()
+        except Exception:
+            pass
+
+    def pool_stats(self) -> dict[str, int]:
+        """Get counters of created and reused YoutubeDL instances in the download workers."""
+        with self._stats_lock:
+            return dict(self._worker_pool_stats)
+
+    def _add_counts(self, counts: tuple[dict[str, int], dict[str, int]], pool: bool = True) -> None:
+        """Add what a worker counted for one call to this service's counters."""
+        stats, pool_stats = counts
+        with self._stats_lock:
+            for counter, count in stats.items():
+                self._stats[counter] += count
+            if pool:
+                for counter, count in pool_stats.items():
+                    self._worker_pool_stats[counter] += count
+
+    def _rate_share(self) -> Optional[float]:
+        """Split the bandwidth budget evenly between downloads as they start."""
+        rate = self.rate_limiter.rate
+        if not rate:
+            return None
+        with self._stats_lock:
+            return rate / max(1, self._active)
+
+    def resolve_video(self, video_url: str, quality: str = "best", subtitles: bool = False) -> Optional[dict]:
+        """Resolve a video's formats in one of the resolving worker processes."""
+        if self._closed:
+            return None
+        try:
+            with self._executor_lock:
+                executor = self._resolve_executor
+                future = executor.submit(_resolve_in_worker, video_url, quality, subtitles)
+            resolved, counts = future.result()
+            # Resolving workers use their metadata pool, not a download pool
+            self._add_counts(counts, pool=False)
+            return resolved
+        except BrokenProcessPool as e:
+            logging.warning(f"Resolving worker died for {video_url}: {str(e)}")
+            with self._executor_lock:
+                # Unless another caller already replaced it
+                if not self._closed and self._resolve_executor is executor:
+                    self._resolve_executor.shutdown(wait=False, cancel_futures=True)
+                    self._resolve_executor = self._new_executor(self.resolve_workers)
+            return None
+        except Exception as e:
+            logging.warning(f"Resolving ahead failed for {video_url}: {str(e)}")
+            return None
+
+    def download_video(
+        self,
+        video_url: str,
+        output_dir: Path,
+        progress_callback: Optional[Callable[[DownloadProgress], None]] = None,
+        quality: str = "best",
+        video_id: str = "unknown",
+        subtitles: bool = False,
+        stop_check: Optional[Callable[[], bool]] = None,
+        defer_post_processing: bool = False,
+        resolved: Optional[dict] = None,
+    ) -> DownloadResult:
+        """Download a single video in a worker process.
+
+        Post-processing always runs inside the worker, which is already off
+        the UI process, so ``defer_post_processing`` is ignored.
+        """
+        if self._closed:
+            return DownloadResult(success=False, video_title="Unknown", error="Stopped by user")
+
+        with self._active_download(), self.throttle_watchdog.watching() as watch_key:
+            try:
+                progress_queue = self._manager.Queue()
+                cancel_event = self._manager.Event()
+                restart_event = self._manager.Event()
+                with self._executor_lock:
+                    future = self._executor.submit(
+                        _download_in_worker, video_url, output_dir, progress_queue, cancel_event,
+                        restart_event, quality, video_id, subtitles, self._rate_share(), resolved,
+                    )
+            except (BrokenProcessPool, RuntimeError, EOFError, OSError) as e:
+                return DownloadResult(success=False, video_title="Unknown", error=str(e))
+
+            stopping = False
+            while True:
+                if not stopping and stop_check and stop_check():
+                    stopping = True
+                    # Not started yet: drop it; running: let the worker stop itself
+                    if not future.cancel():
+                        cancel_event.set()
+                try:
+                    progress = progress_queue.get(timeout=0.2)
+                except queue.Empty:
+                    if future.done():
+                        break
+                    continue
+                except (EOFError, OSError):
+                    # Manager went away during shutdown
+                    break
+                # The worker counts the restarts and stops asking after the last one
+                if progress.status == "downloading" and self.throttle_watchdog.update(
+                    watch_key, progress.downloaded_bytes, use_min_speed=self.rate_limiter.rate is None
+                ):
+                    try:
+                        restart_event.set()
+                    except (EOFError, OSError):
+                        break
+                    self.throttle_watchdog.reset(watch_key)
+                if progress_callback:
+                    progress_callback(progress)
+
+            try:
+                result, counts = future.result()
+            except BrokenProcessPool as e:
+                logging.error(f"Download worker died for {video_url}: {str(e)}")
+                self._replace_broken_executor()
+                return DownloadResult(success=False, video_title="Unknown", error="Download worker crashed")
+            except Exception as e:
+                # Includes CancelledError for downloads stopped before they started
+                return DownloadResult(
+                    success=False,
+                    video_title="Unknown",
+                    error="Stopped by user" if future.cancelled() else str(e),
+                )
+
+        self._add_counts(counts)
+        return result
+
+    def _replace_broken_executor(self) -> None:
+        with self._executor_lock:
+            if self._closed:
+                return
+            try:
+                self._executor.submit(int).result(timeout=5)
+            except Exception:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
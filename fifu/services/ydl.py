@@ -0,0 +1,58 @@
+"""YoutubeDL subclass with the hooks fifu's download pipeline needs."""
+
+from typing import Any, Optional
+
+import yt_dlp
+from yt_dlp.downloader import get_suitable_downloader
+from yt_dlp.downloader.http import HttpFD
+
+from fifu.services.segmented import SegmentedFD
+
+
+class FifuYoutubeDL(yt_dlp.YoutubeDL):
+    """YoutubeDL with fifu's own download and post-processing steps.
+
+    While ``deferred_post_processing`` is a list, ``post_process`` records its
+    arguments there instead of running the merge/embed/move postprocessors,
+    so the network part of a download can finish without waiting for ffmpeg.
+
+    With the ``segmented_connections`` option above 1, plain HTTP(S) files
+    that yt-dlp would fetch on one connection go through ``SegmentedFD``.
+    """
+
+    deferred_post_processing: Optional[list[tuple[str, dict, Any]]] = None
+
+    def dl(self, name, info, subtitle=False, test=False):
+        connections = self.params.get("segmented_connections") or 0
+        if (
+            connections < 2 or test or subtitle or name == "-" or not info.get("url")
+            or get_suitable_downloader(info, self.params) is not HttpFD
+        ):
+            return super().dl(name, info, subtitle, test)
+
+        fd = SegmentedFD(self, self.params, connections=connections)
+        for ph in self._progress_hooks:
+            fd.add_progress_hook(ph)
+        self.write_debug(f'Invoking {fd.FD_NAME} downloader on "{info["url"]}"')
+        new_info = self._copy_infodict(info)
+        if new_info.get("http_headers") is None:
+            new_info["http_headers"] = self._calc_headers(new_info)
+        return fd.download(name, new_info, subtitle)
+
+    def post_process(self, filename, info, files_to_move=None):
+        if self.deferred_post_processing is None:
+            return super().post_process(filename, info, files_to_move)
+        info["filepath"] = filename
+        self.deferred_post_processing.append((filename, info, files_to_move))
+        return info
+
+    def run_deferred_post_processing(self) -> list[dict]:
+        """Run postprocessors held back since deferral was enabled, then disable it.
+
+        Returns the post-processed info dicts, whose ``filepath`` is the final file.
+        """
+        deferred, self.deferred_post_processing = self.deferred_post_processing or [], None
+        return [
+            super(FifuYoutubeDL, self).post_process(filename, info, files_to_move)
+            for filename, info, files_to_move in deferred
+        ]
@@ -1,10 +1,15 @@
 """YouTube service using yt-dlp for channel search and video extraction."""
 
-from dataclasses import dataclass
-from typing import Optional, List, Tuple
-import yt_dlp
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Iterator, Optional, List, Tuple
+import logging
+import threading
 import concurrent.futures
 
+from fifu.services.cache import MetadataCache
+from fifu.services.pool import YoutubeDLPool, profile_key
+from fifu.services.singleflight import SharedIterator, SingleFlight
+
 
 @dataclass
 class ChannelInfo:
@@ -27,6 +32,10 @@ class VideoInfo:
     duration: Optional[int] = None
     upload_date: Optional[str] = None
     thumbnail: Optional[str] = None
+    # Bytes of the chosen formats, once they have been resolved
+    filesize: Optional[int] = None
+    # Only known for search results, which span many channels
+    uploader: Optional[str] = None
 
 
 @dataclass
@@ -38,104 +47,274 @@ class PlaylistInfo:
     video_count: Optional[int] = None
 
 
+def rank_channels(channels: list[ChannelInfo]) -> list[ChannelInfo]:
+    """Sort channels by subscriber count, keeping search order for ties and unknowns."""
+    return sorted(channels, key=lambda c: c.subscriber_count or 0, reverse=True)
+
+
+def _encode_items(items: list) -> list[dict]:
+    """Convert a list of info dataclasses into JSON-serializable dicts."""
+    return [asdict(item) for item in items]
+
+
 class YouTubeService:
     """Service for interacting with YouTube via yt-dlp."""
 
-    def __init__(self):
+    def __init__(self, cache: Optional[MetadataCache] = None, pool: Optional[YoutubeDLPool] = None):
         self._ydl_opts = {
             "quiet": True,
             "no_warnings": True,
             "extract_flat": True,
         }
         self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=10)
+        self._pool = pool or YoutubeDLPool()
+        self._flights = SingleFlight()
+        # Streaming listings in progress, shared by identical concurrent callers
+        self._listings: dict[str, SharedIterator] = {}
+        self._listings_lock = threading.Lock()
+        # Warm the flat-listing profile used by search and listings off the UI thread
+        self._executor.submit(self._pool.prewarm, self._ydl_opts, 2)
+        self._cache = cache or MetadataCache()
+        self._refreshing: set[tuple[str, str]] = set()
+        self._refresh_lock = threading.Lock()
 
     def shutdown(self):
         """Shutdown the executor."""
+        logging.info(f"Metadata cache stats: {self.cache_stats()}")
+        logging.info(f"YoutubeDL pool stats: {self._pool.stats()}")
+        logging.info(f"Request coalescing stats: {self._flights.stats()}")
         self._executor.shutdown(wait=False)
+        self._pool.close()
+
+    def cache_stats(self) -> dict[str, int]:
+        """Get metadata cache hit/miss counters."""
+        return self._cache.stats()
+
+    def _cached(
+        self,
+        kind: str,
+        key: str,
+        fetch: Callable[[], Any],
+        encode: Callable[[Any], Any],
+        decode: Callable[[Any], Any],
+    ) -> Any:
+        """Serve a listing from cache, refreshing stale entries in the background."""
+        cached = self._cache.get(kind, key)
+        if cached is not None:
+            value, is_stale = cached
+            if is_stale:
+                self._refresh_in_background(kind, key, fetch, encode)
+            return decode(value)
+
+        result = fetch()
+        # Empty results usually mean a failed scrape, so never cache them
+        if result:
+            self._cache.set(kind, key, encode(result))
+        return result
+
+    def _refresh_in_background(
+        self,
+        kind: str,
+        key: str,
+        fetch: Callable[[], Any],
+        encode: Callable[[Any], Any],
+    ) -> None:
+        """Re-fetch a stale cache entry without blocking the caller."""
+        with self._refresh_lock:
+            if (kind, key) in self._refreshing:
+                return
+            self._refreshing.add((kind, key))
+
+        def refresh():
+            try:
+                result = fetch()
+                if result:
+                    self._cache.set(kind, key, encode(result))
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard((kind, key))
 
-    def search_channels(self, query: str, max_results: int = 30) -> list[ChannelInfo]:
-        """Search for YouTube channels by name, sorted by subscriber count."""
+        try:
+            self._executor.submit(refresh)
+        except RuntimeError:
+            # Executor already shut down
+            with self._refresh_lock:
+                self._refreshing.discard((kind, key))
+
+    def _extract_info(self, url: str, opts: dict) -> Optional[dict]:
+        """Extract metadata for a URL, sharing one in-flight request between identical callers."""
+        def extract():
+            with self._pool.acquire(opts) as ydl:
+                return ydl.extract_info(url, download=False)
+
+        return self._flights.do((url, profile_key(opts)), extract)
+
+    def search_channels(
+        self,
+        query: str,
+        max_results: int = 30,
+        max_lookups: int = 10,
+        max_wait: Optional[float] = 3.0,
+        on_update: Optional[Callable[[ChannelInfo], None]] = None,
+    ) -> list[ChannelInfo]:
+        """Search for YouTube channels by name, sorted by subscriber count.
+
+        Channels without a subscriber count in the search page are enriched with
+        up to ``max_lookups`` detail lookups, waiting at most ``max_wait`` seconds.
+        Each finished lookup updates its channel in place and calls ``on_update``
+        from a worker thread, including lookups that outlive the wait.
+        """
+        channels = self.search_channels_flat(query, max_results)
+        futures = self.enrich_channels(channels, max_lookups, on_update)
+        if futures:
+            concurrent.futures.wait(futures, timeout=max_wait)
+        return rank_channels(channels)
+
+    def search_channels_flat(self, query: str, max_results: int = 30) -> list[ChannelInfo]:
+        """Search for channels using only the search results page, ranked by known subscriber counts."""
+        return self._cached(
+            "channel_search",
+            MetadataCache.make_key(query, max_results=max_results),
+            lambda: self._fetch_channel_search(query, max_results),
+            _encode_items,
+            lambda value: [ChannelInfo(**item) for item in value],
+        )
+
+    def _fetch_channel_search(self, query: str, max_results: int) -> list[ChannelInfo]:
+        """Scrape a search results page for distinct channels."""
         # Search for a few more videos than requested to find distinct channels
         search_url = f"ytsearch{max_results + 10}:{query}"
         
-        with yt_dlp.YoutubeDL(self._ydl_opts) as ydl:
+        try:
+            result = self._extract_info(search_url, self._ydl_opts)
+            channels = []
+            seen_channels = set()
+            
+            if result and "entries" in result:
+                for entry in result["entries"]:
+                    if entry and entry.get("channel_id"):
+                        channel_id = entry["channel_id"]
+                        if channel_id not in seen_channels:
+                            seen_channels.add(channel_id)
+                            # Handle different metadata layouts in yt-dlp results
+                            sub_count = (
+                                entry.get("channel_follower_count") or 
+                                entry.get("uploader_follower_count") or 
+                                entry.get("follower_count") or 
+                                entry.get("subscribers")
+                            )
+                            channels.append(ChannelInfo(
+                                id=channel_id,
+                                name=entry.get("channel", entry.get("uploader", "Unknown")),
+                                url=f"https://www.youtube.com/channel/{channel_id}/videos",
+                                subscriber_count=sub_count if isinstance(sub_count, int) else None,
+                                subscriber_count_str=self._format_count(sub_count) if sub_count else None,
+                                description=entry.get("description", "")[:100] if entry.get("description") else None,
+                            ))
+            
+            return rank_channels(channels)[:max_results]
+        except Exception:
+            return []
+
+    def enrich_channels(
+        self,
+        channels: list[ChannelInfo],
+        max_lookups: int = 10,
+        on_update: Optional[Callable[[ChannelInfo], None]] = None,
+    ) -> list[concurrent.futures.Future]:
+        """Look up missing subscriber counts for the top channels in the background.
+
+        Each channel is updated in place as its lookup finishes, then passed to
+        ``on_update`` from a worker thread. Returns the lookup futures.
+        """
+        to_lookup = [c for c in channels[:max_lookups] if c.subscriber_count is None]
+        futures = []
+        for channel in to_lookup:
             try:
-                result = ydl.extract_info(search_url, download=False)
-                channels = []
-                seen_channels = set()
-                
-                if result and "entries" in result:
-                    for entry in result["entries"]:
-                        if entry and entry.get("channel_id"):
-                            channel_id = entry["channel_id"]
-                            if channel_id not in seen_channels:
-                                seen_channels.add(channel_id)
-                                # Handle different metadata layouts in yt-dlp results
-                                sub_count = (
-                                    entry.get("channel_follower_count") or 
-                                    entry.get("uploader_follower_count") or 
-                                    entry.get("follower_count") or 
-                                    entry.get("subscribers")
-                                )
-                                channels.append(ChannelInfo(
-                                    id=channel_id,
-                                    name=entry.get("channel", entry.get("uploader", "Unknown")),
-                                    url=f"https://www.youtube.com/channel/{channel_id}/videos",
-                                    subscriber_count=sub_count if isinstance(sub_count, int) else None,
-                                    subscriber_count_str=self._format_count(sub_count) if sub_count else None,
-                                    description=entry.get("description", "")[:100] if entry.get("description") else None,
-                                ))
-                
-                # Optimization: Fetch detailed sub counts for top 10 results concurrently
-                # to keep search extremely fast (2-3s) instead of sequential
-                to_lookup = [c for c in channels[:10] if c.subscriber_count is None]
-                if to_lookup:
-                    future_to_channel = {
-                        self._executor.submit(self._get_channel_details, c.id): c 
-                        for c in to_lookup
-                    }
-                    for future in concurrent.futures.as_completed(future_to_channel):
-                        channel = future_to_channel[future]
-                        try:
-                            details = future.result()
-                            if details:
-                                channel.subscriber_count = details.get("subs", 0)
-                                channel.subscriber_count_str = self._format_count(details.get("subs"))
-                        except Exception:
-                            pass
-                
-                channels.sort(key=lambda c: c.subscriber_count or 0, reverse=True)
-                return channels[:max_results]
-            except Exception:
-                return []
+                future = self._executor.submit(self._get_channel_details, channel.id)
+            except RuntimeError:
+                # Executor already shut down
+                break
+            future.add_done_callback(
+                lambda f, c=channel: self._apply_channel_details(c, f, on_update)
+            )
+            futures.append(future)
+        return futures
 
     def search_videos(self, query: str, max_results: int = 50) -> list[VideoInfo]:
         """Search for individual YouTube videos by title."""
+        return self._cached(
+            "video_search",
+            MetadataCache.make_key(query, max_results=max_results),
+            lambda: self._fetch_video_search(query, max_results),
+            _encode_items,
+            lambda value: [VideoInfo(**item) for item in value],
+        )
+
+    def _fetch_video_search(self, query: str, max_results: int) -> list[VideoInfo]:
+        """Scrape a search results page for videos."""
         search_url = f"ytsearch{max_results}:{query}"
         
-        with yt_dlp.YoutubeDL(self._ydl_opts) as ydl:
+        try:
+            result = self._extract_info(search_url, self._ydl_opts)
+            videos = []
+            
+            if result and "entries" in result:
+                for entry in result["entries"]:
+                    if entry:
+                        videos.append(VideoInfo(
+                            id=entry.get("id", ""),
+                            title=entry.get("title", "Unknown"),
+                            url=f"https://www.youtube.com/watch?v={entry.get('id', '')}",
+                            duration=entry.get("duration"),
+                            upload_date=entry.get("upload_date"),
+                            thumbnail=entry.get("thumbnail"),
+                            uploader=entry.get("uploader") or entry.get("channel"),
+                        ))
+            
+            return videos
+        except Exception:
+            return []
+
+    def _apply_channel_details(
+        self,
+        channel: ChannelInfo,
+        future: concurrent.futures.Future,
+        on_update: Optional[Callable[[ChannelInfo], None]] = None,
+    ) -> None:
+        """Copy a finished detail lookup onto its channel."""
+        try:
+            details = future.result()
+        except Exception:
+            return
+        if not details:
+            return
+
+        channel.subscriber_count = details.get("subs", 0)
+        channel.subscriber_count_str = self._format_count(details.get("subs"))
+        if on_update:
             try:
-                result = ydl.extract_info(search_url, download=False)
-                videos = []
-                
-                if result and "entries" in result:
-                    for entry in result["entries"]:
-                        if entry:
-                            videos.append(VideoInfo(
-                                id=entry.get("id", ""),
-                                title=entry.get("title", "Unknown"),
-                                url=f"https://www.youtube.com/watch?v={entry.get('id', '')}",
-                                duration=entry.get("duration"),
-                                upload_date=entry.get("upload_date"),
-                                thumbnail=entry.get("thumbnail"),
-                            ))
-                
-                return videos
+                on_update(channel)
             except Exception:
-                return []
+                pass
 
     def _get_channel_details(self, channel_id: str) -> Optional[dict]:
-        """Fetch detailed channel info including subscriber count."""
+        """Fetch detailed channel info including subscriber count, cached across searches."""
+        return self._cached(
+            "channel_details",
+            MetadataCache.make_key(channel_id),
+            lambda: self._fetch_channel_details(channel_id),
+            dict,
+            dict,
+        )
+
+    def get_channel_name(self, channel_id: str) -> Optional[str]:
+        """Get a channel's name by its ID, from the same cache as its subscriber count."""
+        details = self._get_channel_details(channel_id)
+        return details.get("name") if details else None
+
+    def _fetch_channel_details(self, channel_id: str) -> Optional[dict]:
+        """Scrape a channel page for its subscriber count."""
         channel_url = f"https://www.youtube.com/channel/{channel_id}"
         opts = {
             "quiet": True,
@@ -145,13 +324,12 @@ class YouTubeService:
         }
         
         try:
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(channel_url, download=False)
-                if info:
-                    return {
-                        "subs": info.get("channel_follower_count") or info.get("follower_count") or 0,
-                        "name": info.get("channel") or info.get("uploader"),
-                    }
+            info = self._extract_info(channel_url, opts)
+            if info:
+                return {
+                    "subs": info.get("channel_follower_count") or info.get("follower_count") or 0,
+                    "name": info.get("channel") or info.get("uploader"),
+                }
         except Exception:
             pass
         return None
@@ -168,80 +346,217 @@ class YouTubeService:
 
     def get_channel_videos(self, channel_url: str, max_videos: int = 50) -> list[VideoInfo]:
         """Get videos from a YouTube channel, sorted by most recent."""
+        return self._cached(
+            "channel_videos",
+            MetadataCache.make_key(channel_url, max_videos=max_videos),
+            lambda: self._fetch_channel_videos(channel_url, max_videos),
+            _encode_items,
+            lambda value: [VideoInfo(**item) for item in value],
+        )
+
+    def _fetch_channel_videos(self, channel_url: str, max_videos: int) -> list[VideoInfo]:
+        """Scrape a channel's video listing."""
         opts = {
             **self._ydl_opts,
             "playlistend": max_videos,
         }
         
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            try:
-                result = ydl.extract_info(channel_url, download=False)
-                videos = []
-                
-                if result and "entries" in result:
-                    for entry in result["entries"]:
-                        if entry:
-                            videos.append(VideoInfo(
-                                id=entry.get("id", ""),
-                                title=entry.get("title", "Unknown"),
-                                url=entry.get("url", f"https://www.youtube.com/watch?v={entry.get('id', '')}"),
-                                duration=entry.get("duration"),
-                                upload_date=entry.get("upload_date"),
-                                thumbnail=entry.get("thumbnail"),
-                            ))
-                
-                return videos
-            except Exception:
-                return []
+        try:
+            result = self._extract_info(channel_url, opts)
+            videos = []
+            
+            if result and "entries" in result:
+                for entry in result["entries"]:
+                    if entry:
+                        videos.append(self._video_from_entry(entry))
+            
+            return videos
+        except Exception:
+            return []
+
+    def iter_channel_videos(
+        self, channel_url: str, max_videos: int = 50, batch_size: int = 30
+    ) -> Iterator[list[VideoInfo]]:
+        """Yield a channel's videos in batches as listing pages arrive."""
+        yield from self._iter_video_batches(
+            "channel_videos", channel_url, max_videos, batch_size,
+            lambda: self._fetch_channel_videos(channel_url, max_videos),
+        )
+
+    def iter_playlist_videos(
+        self, playlist_url: str, max_videos: int = 100, batch_size: int = 30
+    ) -> Iterator[list[VideoInfo]]:
+        """Yield a playlist's videos in batches as listing pages arrive."""
+        yield from self._iter_video_batches(
+            "playlist_videos", playlist_url, max_videos, batch_size,
+            lambda: self._fetch_playlist_videos(playlist_url, max_videos),
+        )
+
+    def _iter_video_batches(
+        self,
+        kind: str,
+        url: str,
+        max_videos: int,
+        batch_size: int,
+        fetch: Callable[[], list[VideoInfo]],
+    ) -> Iterator[list[VideoInfo]]:
+        """Stream a listing in batches, sharing cache entries with the list-based getters."""
+        key = MetadataCache.make_key(url, max_videos=max_videos)
+        cached = self._cache.get(kind, key)
+        if cached is not None:
+            value, is_stale = cached
+            if is_stale:
+                self._refresh_in_background(kind, key, fetch, _encode_items)
+            videos = [VideoInfo(**item) for item in value]
+            for start in range(0, len(videos), batch_size):
+                yield videos[start:start + batch_size]
+            return
+
+        videos = []
+        batch = []
+        complete = False
+        try:
+            for entry in self._shared_entries(url):
+                if len(videos) >= max_videos:
+                    break
+                video = self._video_from_entry(entry)
+                videos.append(video)
+                batch.append(video)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            complete = True
+        except Exception:
+            pass
+
+        if batch:
+            yield batch
+        # Only cache listings that were enumerated to the end
+        if complete and videos:
+            self._cache.set(kind, key, _encode_items(videos))
+
+    def get_new_channel_videos(
+        self, channel_url: str, known_ids: set[str], max_videos: int = 500
+    ) -> list[VideoInfo]:
+        """Get a channel's uploads newer than the first already-known video ID.
+
+        Entries are listed lazily page by page, so a channel with only a few new
+        uploads costs a single page request instead of a full enumeration.
+        Listing errors are raised, so a failed check isn't taken for no uploads.
+        """
+        videos = []
+        for entry in self._shared_entries(channel_url):
+            if entry.get("id") in known_ids or len(videos) >= max_videos:
+                break
+            videos.append(self._video_from_entry(entry))
+        return videos
+
+    def _shared_entries(self, url: str) -> Iterator[dict]:
+        """Lazily yield a listing's entries, sharing one listing between concurrent callers."""
+        with self._listings_lock:
+            listing = self._listings.get(url)
+            if listing is None or not listing.join():
+                listing = SharedIterator(self._iter_entries(url))
+                listing.join()
+                self._listings[url] = listing
+        try:
+            yield from listing.consume()
+        finally:
+            if listing.leave():
+                with self._listings_lock:
+                    if self._listings.get(url) is listing:
+                        del self._listings[url]
+
+    def _iter_entries(self, url: str) -> Iterator[dict]:
+        """Lazily yield the flat entries of a channel tab or playlist."""
+        with self._pool.acquire(self._ydl_opts) as ydl:
+            result = ydl.extract_info(url, download=False, process=False)
+            # Channel URLs without a tab can resolve to a redirect first
+            for _ in range(3):
+                if not result or result.get("_type") not in ("url", "url_transparent"):
+                    break
+                result = ydl.extract_info(result["url"], download=False, process=False)
+
+            for entry in (result or {}).get("entries") or []:
+                if entry:
+                    yield entry
+
+    def _video_from_entry(self, entry: dict) -> VideoInfo:
+        """Build a VideoInfo from a flat playlist entry.
+
+        Streamed and list-based listings share cache entries, so both build
+        their videos here and cache the same shape.
+        """
+        return VideoInfo(
+            id=entry.get("id", ""),
+            title=entry.get("title", "Unknown"),
+            url=entry.get("url", f"https://www.youtube.com/watch?v={entry.get('id', '')}"),
+            duration=entry.get("duration"),
+            upload_date=entry.get("upload_date"),
+            thumbnail=entry.get("thumbnail"),
+        )
 
     def get_channel_playlists(self, channel_id: str) -> list[PlaylistInfo]:
         """Get playlists from a YouTube channel."""
+        return self._cached(
+            "channel_playlists",
+            MetadataCache.make_key(channel_id),
+            lambda: self._fetch_channel_playlists(channel_id),
+            _encode_items,
+            lambda value: [PlaylistInfo(**item) for item in value],
+        )
+
+    def _fetch_channel_playlists(self, channel_id: str) -> list[PlaylistInfo]:
+        """Scrape a channel's playlists tab."""
         playlist_url = f"https://www.youtube.com/channel/{channel_id}/playlists"
         
-        with yt_dlp.YoutubeDL(self._ydl_opts) as ydl:
-            try:
-                result = ydl.extract_info(playlist_url, download=False)
-                playlists = []
-                
-                if result and "entries" in result:
-                    for entry in result["entries"]:
-                        if entry:
-                            playlists.append(PlaylistInfo(
-                                id=entry.get("id", ""),
-                                title=entry.get("title", "Unknown"),
-                                url=entry.get("url", f"https://www.youtube.com/playlist?list={entry.get('id', '')}"),
-                                video_count=entry.get("playlist_count"),
-                            ))
-                
-                return playlists
-            except Exception:
-                return []
+        try:
+            result = self._extract_info(playlist_url, self._ydl_opts)
+            playlists = []
+            
+            if result and "entries" in result:
+                for entry in result["entries"]:
+                    if entry:
+                        playlists.append(PlaylistInfo(
+                            id=entry.get("id", ""),
+                            title=entry.get("title", "Unknown"),
+                            url=entry.get("url", f"https://www.youtube.com/playlist?list={entry.get('id', '')}"),
+                            video_count=entry.get("playlist_count"),
+                        ))
+            
+            return playlists
+        except Exception:
+            return []
 
     def get_playlist_videos(self, playlist_url: str, max_videos: int = 100) -> list[VideoInfo]:
         """Get videos from a playlist."""
+        return self._cached(
+            "playlist_videos",
+            MetadataCache.make_key(playlist_url, max_videos=max_videos),
+            lambda: self._fetch_playlist_videos(playlist_url, max_videos),
+            _encode_items,
+            lambda value: [VideoInfo(**item) for item in value],
+        )
+
+    def _fetch_playlist_videos(self, playlist_url: str, max_videos: int) -> list[VideoInfo]:
+        """Scrape a playlist's entries."""
         opts = {
             **self._ydl_opts,
             "playlistend": max_videos,
         }
         
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            try:
-                result = ydl.extract_info(playlist_url, download=False)
-                videos = []
-                
-                if result and "entries" in result:
-                    for entry in result["entries"]:
-                        if entry:
-                            videos.append(VideoInfo(
-                                id=entry.get("id", ""),
-                                title=entry.get("title", "Unknown"),
-                                url=f"https://www.youtube.com/watch?v={entry.get('id', '')}",
-                                duration=entry.get("duration"),
-                            ))
-                
-                return videos
-            except Exception:
-                return []
+        try:
+            result = self._extract_info(playlist_url, opts)
+            videos = []
+            
+            if result and "entries" in result:
+                for entry in result["entries"]:
+                    if entry:
+                        videos.append(self._video_from_entry(entry))
+            
+            return videos
+        except Exception:
+            return []
 
     def get_video_info(self, video_url: str) -> Optional[VideoInfo]:
         """Get detailed info for a single video."""
@@ -250,36 +565,65 @@ class YouTubeService:
             "no_warnings": True,
         }
         
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            try:
-                result = ydl.extract_info(video_url, download=False)
-                if result:
-                    return VideoInfo(
-                        id=result.get("id", ""),
-                        title=result.get("title", "Unknown"),
-                        url=video_url,
-                        duration=result.get("duration"),
-                        upload_date=result.get("upload_date"),
-                        thumbnail=result.get("thumbnail"),
-                    )
-            except Exception:
-                pass
+        try:
+            result = self._extract_info(video_url, opts)
+            if result:
+                return VideoInfo(
+                    id=result.get("id", ""),
+                    title=result.get("title", "Unknown"),
+                    url=video_url,
+                    duration=result.get("duration"),
+                    upload_date=result.get("upload_date"),
+                    thumbnail=result.get("thumbnail"),
+                )
+        except Exception:
+            pass
+        return None
+
+    def get_channel_from_url(self, channel_url: str) -> Optional[ChannelInfo]:
+        """Look up the channel a channel URL (handle, /channel/, /c/ or /user/) points to."""
+        opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "extract_flat": True,
+            "playlistend": 1,
+        }
+        try:
+            info = self._extract_info(channel_url, opts)
+            if info and info.get("channel_id"):
+                channel_id = info["channel_id"]
+                return ChannelInfo(
+                    id=channel_id,
+                    name=info.get("channel", info.get("uploader", "Unknown")),
+                    url=f"https://www.youtube.com/channel/{channel_id}/videos",
+                )
+        except Exception:
+            pass
         return None
 
     def get_playlist_metadata(self, playlist_url: str) -> Optional[tuple[str, str]]:
         """Fetch metadata (title, uploader) for a playlist URL."""
+        return self._cached(
+            "playlist_metadata",
+            MetadataCache.make_key(playlist_url),
+            lambda: self._fetch_playlist_metadata(playlist_url),
+            list,
+            tuple,
+        )
+
+    def _fetch_playlist_metadata(self, playlist_url: str) -> Optional[tuple[str, str]]:
+        """Scrape title and uploader for a playlist URL."""
         opts = {
             "quiet": True,
             "no_warnings": True,
             "extract_flat": True,
         }
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            try:
-                info = ydl.extract_info(playlist_url, download=False)
-                if info:
-                    title = info.get("title", "Unknown Playlist")
-                    uploader = info.get("uploader", info.get("channel", "YouTube"))
-                    return title, uploader
-            except Exception:
-                pass
+        try:
+            info = self._extract_info(playlist_url, opts)
+            if info:
+                title = info.get("title", "Unknown Playlist")
+                uploader = info.get("uploader", info.get("channel", "YouTube"))
+                return title, uploader
+        except Exception:
+            pass
         return None
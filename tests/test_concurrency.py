@@ -0,0 +1,182 @@
+import asyncio
+
+from fifu.services.concurrency import ConcurrencyController, PrioritySlots, is_throttled
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def hold(controller: ConcurrencyController, count: int) -> None:
+    for _ in range(count):
+        await controller.acquire()
+
+
+def test_is_throttled():
+    assert is_throttled("HTTP Error 429: Too Many Requests")
+    assert not is_throttled("HTTP Error 403: Forbidden")
+    assert not is_throttled(None)
+
+
+def test_priority_slots_serve_lowest_priority_first():
+    async def scenario():
+        slots = PrioritySlots(1)
+        await slots.acquire()
+        order = []
+
+        async def wait(name, priority):
+            await slots.acquire(priority)
+            order.append(name)
+            await slots.release()
+
+        tasks = [asyncio.create_task(wait(name, priority)) for name, priority in (("c", 3), ("a", 1), ("b", 2))]
+        await asyncio.sleep(0.01)
+        await slots.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert run(scenario()) == ["a", "b", "c"]
+
+
+def test_priority_slots_keep_arrival_order_for_equal_priorities():
+    async def scenario():
+        slots = PrioritySlots(1)
+        await slots.acquire()
+        order = []
+
+        async def wait(name):
+            await slots.acquire((0, 1))
+            order.append(name)
+            await slots.release()
+
+        tasks = [asyncio.create_task(wait(name)) for name in "abc"]
+        await asyncio.sleep(0.01)
+        await slots.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert run(scenario()) == ["a", "b", "c"]
+
+
+def test_priority_slots_cancelled_waiter_does_not_block_others():
+    async def scenario():
+        slots = PrioritySlots(1)
+        await slots.acquire()
+        first = asyncio.create_task(slots.acquire(0))
+        second = asyncio.create_task(slots.acquire(1))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await slots.release()
+        await asyncio.wait_for(second, 1)
+        return slots.active
+
+    assert run(scenario()) == 1
+
+
+def test_priority_slots_raised_limit_admits_waiters():
+    async def scenario():
+        slots = PrioritySlots(1)
+        await slots.acquire()
+        waiter = asyncio.create_task(slots.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await slots.set_limit(2)
+        await asyncio.wait_for(waiter, 1)
+        return slots.active
+
+    assert run(scenario()) == 2
+
+
+def test_controller_clamps_initial_limit():
+    assert ConcurrencyController(min_limit=2, max_limit=4, initial=10).limit == 4
+    assert ConcurrencyController(min_limit=2, max_limit=4, initial=0).limit == 2
+
+
+def test_controller_grows_by_one_when_every_slot_is_busy():
+    async def scenario():
+        controller = ConcurrencyController(max_limit=8, initial=2)
+        await hold(controller, 2)
+        controller.record_progress("a", 1000)
+        return await controller.adjust()
+
+    assert run(scenario()) == 3
+
+
+def test_controller_does_not_grow_with_free_slots():
+    async def scenario():
+        controller = ConcurrencyController(max_limit=8, initial=3)
+        await hold(controller, 1)
+        controller.record_progress("a", 1000)
+        return await controller.adjust()
+
+    assert run(scenario()) == 3
+
+
+def test_controller_halves_on_throttling():
+    async def scenario():
+        controller = ConcurrencyController(max_limit=8, initial=6)
+        controller.record_result("a", False, "HTTP Error 429: Too Many Requests")
+        return await controller.adjust()
+
+    assert run(scenario()) == 3
+
+
+def test_controller_halves_on_high_error_rate_but_not_below_minimum():
+    async def scenario():
+        controller = ConcurrencyController(min_limit=2, max_limit=8, initial=3)
+        controller.record_result("a", False, "HTTP Error 403: Forbidden")
+        controller.record_result("b", True)
+        return await controller.adjust()
+
+    assert run(scenario()) == 2
+
+
+def test_controller_ignores_failures_in_the_window_after_a_decrease():
+    async def scenario():
+        controller = ConcurrencyController(max_limit=8, initial=8)
+        controller.record_result("a", False, "429")
+        first = await controller.adjust()
+        controller.record_result("b", False, "429")
+        second = await controller.adjust()
+        return first, second
+
+    assert run(scenario()) == (4, 4)
+
+
+def test_controller_gives_back_a_slot_that_bought_no_throughput():
+    async def scenario():
+        controller = ConcurrencyController(max_limit=8, initial=2, hold_windows=2)
+        await hold(controller, 2)
+        controller._window_start -= 1
+        controller.record_progress("a", 1000)
+        grown = await controller.adjust()
+        # The new download settles for a window, then throughput stays flat
+        for total in (2000, 3000):
+            controller._window_start -= 1
+            controller.record_progress("a", total)
+            settled = await controller.adjust()
+        # Held at the lower target for hold_windows windows
+        held = []
+        for total in (4000, 5000):
+            controller._window_start -= 1
+            controller.record_progress("a", total)
+            held.append(await controller.adjust())
+        return grown, settled, held
+
+    grown, settled, held = run(scenario())
+    assert grown == 3
+    assert settled == 2
+    assert held == [2, 2]
+
+
+def test_controller_counts_bytes_across_files_of_one_download():
+    async def scenario():
+        controller = ConcurrencyController()
+        controller._window_start -= 1
+        controller.record_progress("a", 1000)
+        # The audio stream starts from zero after the video stream
+        controller.record_progress("a", 400)
+        await controller.adjust()
+        return controller.throughput
+
+    assert 1300 < run(scenario()) <= 1400
@@ -0,0 +1,138 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from fifu.services.journal import DownloadQueue, ItemState
+from fifu.services.youtube import VideoInfo
+
+
+def videos(*video_ids: str) -> list[VideoInfo]:
+    return [VideoInfo(id=v, title=v, url=f"https://www.youtube.com/watch?v={v}") for v in video_ids]
+
+
+@pytest.fixture
+def queue_path(tmp_path) -> Path:
+    return tmp_path / "queue.db"
+
+
+@pytest.fixture
+def queue(queue_path):
+    queue = DownloadQueue(queue_path)
+    yield queue
+    queue.close()
+
+
+def shared_job(queue: DownloadQueue, *video_ids: str, channel: str = "UC1") -> int:
+    job_id = queue.create_job(channel, channel, f"https://www.youtube.com/channel/{channel}",
+                              Path("/downloads") / channel, "best", shared=True)
+    queue.add_items(job_id, videos(*video_ids))
+    queue.mark_listing_complete(job_id)
+    return job_id
+
+
+def claimed_ids(claims) -> list[str]:
+    return [video.id for _, video in claims]
+
+
+def test_claims_items_of_shared_jobs_oldest_job_first(queue):
+    private = queue.create_job("UC0", "UC0", "url", Path("/downloads/UC0"), "best")
+    queue.add_items(private, videos("private"))
+    first = shared_job(queue, "a", "b")
+    second = shared_job(queue, "c", channel="UC2")
+    claims = queue.claim_items("worker-1", limit=3)
+    assert claims[0][0] == first
+    assert claims[2][0] == second
+    assert claimed_ids(claims) == ["a", "b", "c"]
+
+
+def test_claim_respects_the_limit_and_never_hands_out_an_item_twice(queue):
+    shared_job(queue, "a", "b", "c")
+    assert claimed_ids(queue.claim_items("worker-1", limit=2)) == ["a", "b"]
+    assert claimed_ids(queue.claim_items("worker-2", limit=2)) == ["c"]
+    assert queue.claim_items("worker-3", limit=2) == []
+    assert queue.shared_unfinished() == 3
+
+
+def test_workers_on_separate_connections_split_the_items(queue_path, queue):
+    shared_job(queue, *(f"v{i}" for i in range(10)))
+    other = DownloadQueue(queue_path)
+    try:
+        mine = claimed_ids(queue.claim_items("worker-1", limit=4))
+        theirs = claimed_ids(other.claim_items("worker-2", limit=10))
+    finally:
+        other.close()
+    assert len(mine) == 4
+    assert len(theirs) == 6
+    assert not set(mine) & set(theirs)
+
+
+def test_expired_lease_is_claimed_by_another_worker_only(queue):
+    job_id = shared_job(queue, "a")
+    queue.claim_items("worker-1", lease=-1)
+    # Its own worker gave up on it; a fresh worker should get it
+    assert queue.claim_items("worker-1") == []
+    assert claimed_ids(queue.claim_items("worker-2")) == ["a"]
+    # The first worker's lease is gone, so its late results are rejected
+    assert queue.renew_leases("worker-1") == set()
+    assert not queue.set_state(job_id, "a", ItemState.DONE, owner="worker-1")
+    assert queue.renew_leases("worker-2") == {(job_id, "a")}
+    assert queue.set_state(job_id, "a", ItemState.DONE, owner="worker-2")
+
+
+def test_renewed_lease_is_not_claimed_again(queue):
+    job_id = shared_job(queue, "a")
+    queue.claim_items("worker-1", lease=-1)
+    assert queue.renew_leases("worker-1", lease=60) == {(job_id, "a")}
+    assert queue.claim_items("worker-2") == []
+
+
+def test_finished_items_are_neither_renewed_nor_claimed(queue):
+    job_id = shared_job(queue, "a", "b")
+    queue.claim_items("worker-1", limit=2, lease=-1)
+    queue.set_state(job_id, "a", ItemState.DONE, owner="worker-1")
+    queue.set_state(job_id, "b", ItemState.FAILED, "boom", owner="worker-1")
+    assert queue.renew_leases("worker-1") == set()
+    assert queue.claim_items("worker-2", limit=2) == []
+    assert queue.shared_unfinished() == 0
+    assert queue.finish_job_if_done(job_id)
+    assert queue.get_job(job_id) is None
+
+
+def test_job_is_kept_until_listed_and_worked_through(queue):
+    job_id = queue.create_job("UC1", "UC1", "url", Path("/downloads/UC1"), "best", shared=True)
+    queue.add_items(job_id, videos("a"))
+    queue.claim_items("worker-1")
+    queue.set_state(job_id, "a", ItemState.DONE, owner="worker-1")
+    assert not queue.finish_job_if_done(job_id)
+    queue.mark_listing_complete(job_id)
+    assert queue.finish_job_if_done(job_id)
+
+
+def test_shared_unfinished_ids_are_per_output_folder(queue):
+    job_id = shared_job(queue, "a", "b")
+    shared_job(queue, "c", channel="UC2")
+    queue.claim_items("worker-1")
+    queue.set_state(job_id, "a", ItemState.DONE, owner="worker-1")
+    assert queue.shared_unfinished_ids(Path("/downloads/UC1")) == {"b"}
+    assert queue.shared_unfinished_ids(Path("/downloads/UC2")) == {"c"}
+
+
+def test_claim_on_a_locked_queue_raises_and_leaves_it_usable(queue_path, queue):
+    shared_job(queue, "a")
+    queue._conn.execute("PRAGMA busy_timeout = 50")
+    blocker = sqlite3.connect(str(queue_path))
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.Error):
+            queue.claim_items("worker-1")
+    finally:
+        blocker.rollback()
+        blocker.close()
+    assert claimed_ids(queue.claim_items("worker-1")) == ["a"]
+
+
+def test_unusable_shared_queue_raises(tmp_path):
+    (tmp_path / "file").write_text("")
+    with pytest.raises((sqlite3.Error, OSError)):
+        DownloadQueue(tmp_path / "file" / "queue.db")
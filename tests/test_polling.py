@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from fifu.services.polling import PollSchedule
+
+
+def schedule(**options) -> PollSchedule:
+    return PollSchedule(rng=random.Random(1), **options)
+
+
+def test_empty_schedule_has_nothing_due():
+    assert schedule(interval=60).next_due() is None
+
+
+def test_first_checks_are_spread_over_one_interval():
+    polls = schedule(interval=100, min_gap=0)
+    polls.sync([f"c{i}" for i in range(4)], now=0)
+    due = []
+    for _ in range(4):
+        key, when = polls.next_due()
+        due.append(when)
+        polls.polled(key, now=when)
+    # One channel in each quarter of the interval
+    assert [int(when // 25) for when in due] == [0, 1, 2, 3]
+
+
+def test_next_check_is_an_interval_later_within_the_jitter():
+    polls = schedule(interval=100, jitter=0.1, min_gap=0)
+    polls.sync(["a"], now=0)
+    for poll in range(20):
+        now = 1000.0 * poll
+        polls.polled("a", now=now)
+        _, when = polls.next_due()
+        assert 90 <= when - now <= 110
+
+
+def test_jitter_spreads_channels_polled_together():
+    polls = schedule(interval=100, jitter=0.1, min_gap=0)
+    polls.sync(["a", "b", "c"], now=0)
+    for key in ("a", "b", "c"):
+        polls.polled(key, now=50)
+    assert len(set(polls._due.values())) == 3
+
+
+def test_checks_are_at_least_min_gap_apart():
+    polls = schedule(interval=10, jitter=0, min_gap=5)
+    polls.sync(["a", "b"], now=0)
+    key, _ = polls.next_due()
+    polls.polled(key, now=3)
+    _, when = polls.next_due()
+    assert when >= 8
+
+
+def test_sync_drops_removed_channels_and_keeps_existing_ones():
+    polls = schedule(interval=100, min_gap=0)
+    polls.sync(["a", "b"], now=0)
+    due_a = polls._due["a"]
+    polls.sync(["a", "c", "c"], now=10)
+    assert len(polls) == 2
+    assert polls._due["a"] == due_a
+    assert 10 <= polls._due["c"] <= 110
+    assert "b" not in polls._due
+
+
+def test_polled_channel_removed_meanwhile_is_not_rescheduled():
+    polls = schedule(interval=100, min_gap=0)
+    polls.sync(["a"], now=0)
+    polls.sync([], now=1)
+    polls.polled("a", now=2)
+    assert polls.next_due() is None
+
+
+@pytest.mark.parametrize("jitter", [0.0, 0.5])
+def test_next_due_is_the_earliest_channel(jitter):
+    polls = schedule(interval=100, jitter=jitter, min_gap=0)
+    polls.sync(["a", "b", "c"], now=0)
+    key, when = polls.next_due()
+    assert when == min(polls._due.values())
+    assert polls._due[key] == when
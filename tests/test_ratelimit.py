@@ -0,0 +1,59 @@
+import pytest
+
+from fifu.services import ratelimit
+from fifu.services.ratelimit import TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+
+def test_unlimited_bucket_never_waits(clock):
+    bucket = TokenBucket()
+    assert bucket.rate is None
+    assert bucket.reserve(10**9) == 0.0
+
+
+def test_burst_defaults_to_one_second_of_traffic(clock):
+    bucket = TokenBucket(rate=1000)
+    # Starts empty, so the first second's bytes wait for their tokens
+    assert bucket.reserve(500) == pytest.approx(0.5)
+    clock.now += 10
+    # Refilled to the burst only, not ten seconds' worth
+    assert bucket.reserve(1000) == 0.0
+    assert bucket.reserve(1000) == pytest.approx(1.0)
+
+
+def test_waits_keep_several_callers_at_the_rate(clock):
+    bucket = TokenBucket(rate=1000)
+    delays = [bucket.reserve(250) for _ in range(8)]
+    # 2000 bytes at 1000 B/s: the last caller waits two seconds
+    assert delays[-1] == pytest.approx(2.0)
+    assert delays == sorted(delays)
+
+
+def test_set_rate_to_none_or_zero_removes_the_limit(clock):
+    bucket = TokenBucket(rate=1000)
+    bucket.set_rate(0)
+    assert bucket.rate is None
+    assert bucket.reserve(10**6) == 0.0
+
+
+def test_lower_rate_caps_saved_tokens(clock):
+    bucket = TokenBucket(rate=1000)
+    clock.now += 5
+    bucket.reserve(0)
+    bucket.set_rate(100)
+    assert bucket.reserve(100) == 0.0
+    assert bucket.reserve(100) == pytest.approx(1.0)
@@ -0,0 +1,44 @@
+from fifu.services.runner import SyncWatermark
+
+
+def listed(*video_ids: str) -> SyncWatermark:
+    watermark = SyncWatermark()
+    for video_id in video_ids:
+        watermark.listed(video_id)
+    return watermark
+
+
+def test_nothing_is_remembered_before_the_listing_completes():
+    watermark = listed("new", "old")
+    assert watermark.finished("old") == []
+    assert watermark.finished("new") == []
+    assert watermark.complete() == ["new", "old"]
+
+
+def test_videos_are_remembered_oldest_first_as_they_finish():
+    watermark = listed("c", "b", "a")
+    assert watermark.complete() == []
+    assert watermark.finished("a") == ["a"]
+    assert watermark.finished("b") == ["b"]
+    assert watermark.finished("c") == ["c"]
+
+
+def test_unfinished_older_video_holds_back_newer_ones():
+    watermark = listed("c", "b", "a")
+    watermark.complete()
+    assert watermark.finished("c") == []
+    assert watermark.finished("b") == []
+    # Newest first, the order remembered IDs are kept in
+    assert watermark.finished("a") == ["c", "b", "a"]
+
+
+def test_failed_video_keeps_everything_newer_unremembered():
+    watermark = listed("c", "b", "a")
+    watermark.finished("a")
+    watermark.finished("c")
+    # "b" failed and never finishes
+    assert watermark.complete() == ["a"]
+
+
+def test_empty_listing_remembers_nothing():
+    assert SyncWatermark().complete() == []
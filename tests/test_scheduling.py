@@ -0,0 +1,99 @@
+import asyncio
+import math
+
+from fifu.services.concurrency import PrioritySlots
+from fifu.services.scheduling import (
+    BYTES_PER_SECOND,
+    LARGEST,
+    LISTING,
+    NEWEST,
+    SHORTEST,
+    RoundRobin,
+    download_priority,
+    estimated_size,
+)
+from fifu.services.youtube import VideoInfo
+
+
+def video(video_id: str, **fields) -> VideoInfo:
+    return VideoInfo(id=video_id, title=video_id, url=f"https://www.youtube.com/watch?v={video_id}", **fields)
+
+
+def ordered(videos: list[VideoInfo], ordering: str) -> list[str]:
+    # Sorting is stable, as the slots keep arrival order for equal priorities
+    return [v.id for v in sorted(videos, key=lambda v: download_priority(v, ordering))]
+
+
+def test_estimated_size_prefers_resolved_filesize():
+    assert estimated_size(video("a", duration=10, filesize=123)) == 123
+    assert estimated_size(video("a", duration=10)) == 10 * BYTES_PER_SECOND
+    assert estimated_size(video("a")) is None
+
+
+def test_listing_order_keeps_queue_order():
+    videos = [video("a", duration=300), video("b", duration=10), video("c")]
+    assert ordered(videos, LISTING) == ["a", "b", "c"]
+
+
+def test_shortest_first_puts_unknown_sizes_last():
+    videos = [video("unknown"), video("long", duration=600), video("short", duration=30)]
+    assert ordered(videos, SHORTEST) == ["short", "long", "unknown"]
+
+
+def test_largest_first_puts_unknown_sizes_last():
+    videos = [video("unknown"), video("short", duration=30), video("big", filesize=10**10)]
+    assert ordered(videos, LARGEST) == ["big", "short", "unknown"]
+
+
+def test_newest_first_puts_unknown_dates_last():
+    videos = [video("old", upload_date="20200101"), video("undated"), video("new", upload_date="20240601")]
+    assert ordered(videos, NEWEST) == ["new", "old", "undated"]
+    assert download_priority(video("bad", upload_date="soon"), NEWEST) == math.inf
+
+
+def test_round_robin_queues_take_turns():
+    rounds = RoundRobin()
+    big = [rounds.next_round("big") for _ in range(3)]
+    small = [rounds.next_round("small") for _ in range(2)]
+    assert big == [0, 1, 2]
+    assert small == [0, 1]
+
+
+def test_round_robin_late_queue_joins_at_the_round_being_served():
+    rounds = RoundRobin()
+    for _ in range(10):
+        rounds.served(rounds.next_round("early"))
+    assert rounds.next_round("late") == 9
+    assert rounds.next_round("late") == 10
+
+
+def test_round_robin_served_never_goes_backwards():
+    rounds = RoundRobin()
+    rounds.served(5)
+    rounds.served(2)
+    assert rounds.next_round("queue") == 5
+
+
+def test_round_robin_rounds_interleave_shared_slots():
+    async def scenario():
+        slots = PrioritySlots(1)
+        rounds = RoundRobin()
+        await slots.acquire()
+        order = []
+
+        async def download(name, priority):
+            await slots.acquire(priority)
+            order.append(name)
+            await slots.release()
+
+        tasks = []
+        for queue, names in (("big", ["b1", "b2", "b3"]), ("small", ["s1", "s2"])):
+            for name in names:
+                priority = (rounds.next_round(queue), 0.0)
+                tasks.append(asyncio.create_task(download(name, priority)))
+        await asyncio.sleep(0.01)
+        await slots.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["b1", "s1", "b2", "s2", "b3"]
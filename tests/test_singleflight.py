@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from fifu.services.singleflight import SharedIterator
+
+
+class Source:
+    """Iterator that counts the items pulled from it and whether it was closed."""
+
+    def __init__(self, items, error=None):
+        self._items = iter(items)
+        self._error = error
+        self.pulled = 0
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            item = next(self._items)
+        except StopIteration:
+            if self._error:
+                raise self._error
+            raise
+        self.pulled += 1
+        return item
+
+    def close(self):
+        self.closed = True
+
+
+def joined(listing: SharedIterator):
+    assert listing.join()
+    return listing.consume()
+
+
+def test_every_consumer_sees_every_item_pulled_once():
+    source = Source(range(5))
+    listing = SharedIterator(source)
+    first, second = joined(listing), joined(listing)
+    assert next(first) == 0
+    assert list(second) == [0, 1, 2, 3, 4]
+    assert list(first) == [1, 2, 3, 4]
+    assert source.pulled == 5
+
+
+def test_consumer_joining_late_starts_from_the_first_item():
+    listing = SharedIterator(Source("abc"))
+    first = joined(listing)
+    assert next(first) == "a"
+    assert next(first) == "b"
+    assert list(joined(listing)) == ["a", "b", "c"]
+
+
+def test_consumer_stopping_early_does_not_stall_the_others():
+    source = Source(range(3))
+    listing = SharedIterator(source)
+    early, late = joined(listing), joined(listing)
+    assert next(early) == 0
+    assert not listing.leave()
+    assert list(late) == [0, 1, 2]
+    assert listing.leave()
+
+
+def test_source_is_closed_when_the_last_consumer_leaves_early():
+    source = Source(range(10))
+    listing = SharedIterator(source)
+    first, second = joined(listing), joined(listing)
+    next(first)
+    next(second)
+    assert not listing.leave()
+    assert not source.closed
+    assert listing.leave()
+    assert source.closed
+    # A closed listing takes no new consumers; callers start a fresh one
+    assert not listing.join()
+
+
+def test_exhausted_source_is_not_closed():
+    source = Source(range(2))
+    listing = SharedIterator(source)
+    assert list(joined(listing)) == [0, 1]
+    assert listing.leave()
+    assert not source.closed
+
+
+def test_error_reaches_every_consumer_after_the_items_before_it():
+    listing = SharedIterator(Source(range(2), error=RuntimeError("listing failed")))
+    first, second = joined(listing), joined(listing)
+    with pytest.raises(RuntimeError):
+        list(first)
+    assert next(second) == 0
+    assert next(second) == 1
+    with pytest.raises(RuntimeError):
+        next(second)
+
+
+def test_concurrent_consumers_share_one_pull_per_item():
+    source = Source(range(200))
+    listing = SharedIterator(source)
+    consumers = [joined(listing) for _ in range(4)]
+    results = [None] * len(consumers)
+
+    def consume(index):
+        results[index] = list(consumers[index])
+
+    threads = [threading.Thread(target=consume, args=(i,)) for i in range(len(consumers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [list(range(200))] * 4
+    assert source.pulled == 200